@@ -22,6 +22,9 @@ import app.models.video  # noqa: F401
 import app.models.category  # noqa: F401
 import app.models.rec_event  # noqa: F401
 import app.models.channel  # noqa: F401
+import app.models.video_label  # noqa: F401
+import app.models.api_quota_ledger  # noqa: F401
+import app.models.video_fetch_claim  # noqa: F401
 config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
@@ -0,0 +1,132 @@
+"""add video_labels table and exposure materialized views
+
+Revision ID: 5c1e7d9a2b44
+Revises: abacc17498c3
+Create Date: 2026-10-19 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e7d9a2b44'
+down_revision: Union[str, None] = 'abacc17498c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Every view is grouped by signal_count so any min_signals threshold can be
+# derived at read time without refreshing. signal_count is a per-video value,
+# so distinct-video counts can be summed across signal_count groups.
+EXPOSURE_VIEWS = {
+    'mv_exposure_overall': (
+        """
+        SELECT COALESCE(l.signal_count, 0) AS signal_count,
+               COUNT(*) AS recommendations,
+               COUNT(DISTINCT r.video_id) AS unique_videos
+        FROM rec_events r
+        LEFT JOIN video_labels l ON l.video_id = r.video_id
+        GROUP BY 1
+        """,
+        ['signal_count'],
+    ),
+    'mv_exposure_by_iteration': (
+        """
+        SELECT r.iteration,
+               COALESCE(l.signal_count, 0) AS signal_count,
+               COUNT(*) AS recommendations,
+               COUNT(DISTINCT r.video_id) AS unique_videos
+        FROM rec_events r
+        LEFT JOIN video_labels l ON l.video_id = r.video_id
+        GROUP BY 1, 2
+        """,
+        ['iteration', 'signal_count'],
+    ),
+    'mv_exposure_by_position': (
+        """
+        SELECT r.position,
+               COALESCE(l.signal_count, 0) AS signal_count,
+               COUNT(*) AS recommendations,
+               COUNT(DISTINCT r.video_id) AS unique_videos
+        FROM rec_events r
+        LEFT JOIN video_labels l ON l.video_id = r.video_id
+        WHERE r.position IS NOT NULL
+        GROUP BY 1, 2
+        """,
+        ['position', 'signal_count'],
+    ),
+    'mv_exposure_by_run': (
+        """
+        SELECT r.run_id,
+               COALESCE(l.signal_count, 0) AS signal_count,
+               COUNT(*) AS recommendations,
+               COUNT(DISTINCT r.video_id) AS unique_videos,
+               MAX(r.iteration) AS max_iteration
+        FROM rec_events r
+        LEFT JOIN video_labels l ON l.video_id = r.video_id
+        GROUP BY 1, 2
+        """,
+        ['run_id', 'signal_count'],
+    ),
+    'mv_exposure_by_video': (
+        """
+        SELECT r.video_id,
+               COALESCE(l.signal_count, 0) AS signal_count,
+               v.title,
+               v.channel_title,
+               v.view_count,
+               c.name AS category_name,
+               COUNT(*) AS recommendations,
+               SUM(r.iteration) AS iteration_sum,
+               SUM(r.position) AS position_sum,
+               COUNT(r.position) AS position_count
+        FROM rec_events r
+        JOIN videos v ON v.video_id = r.video_id
+        LEFT JOIN categories c ON c.id = v.category_id
+        LEFT JOIN video_labels l ON l.video_id = r.video_id
+        WHERE v.channel_title IS NOT NULL
+        GROUP BY 1, 2, 3, 4, 5, 6
+        """,
+        ['video_id'],
+    ),
+    'mv_exposure_by_channel': (
+        """
+        SELECT v.channel_id,
+               v.channel_title,
+               COALESCE(l.signal_count, 0) AS signal_count,
+               COUNT(*) AS recommendations,
+               COUNT(DISTINCT r.video_id) AS unique_videos,
+               SUM(r.iteration) AS iteration_sum
+        FROM rec_events r
+        JOIN videos v ON v.video_id = r.video_id
+        LEFT JOIN video_labels l ON l.video_id = r.video_id
+        WHERE v.channel_title IS NOT NULL
+        GROUP BY 1, 2, 3
+        """,
+        ['channel_id', 'channel_title', 'signal_count'],
+    ),
+}
+
+
+def upgrade() -> None:
+    op.create_table('video_labels',
+    sa.Column('video_id', sa.String(length=32), nullable=False),
+    sa.Column('signal_count', sa.SmallInteger(), nullable=False),
+    sa.Column('labeled_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['video_id'], ['videos.video_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('video_id')
+    )
+
+    # REFRESH ... CONCURRENTLY needs a unique index on every view
+    for name, (query, unique_columns) in EXPOSURE_VIEWS.items():
+        op.execute(f"CREATE MATERIALIZED VIEW {name} AS {query} WITH DATA")
+        op.execute(f"CREATE UNIQUE INDEX ux_{name} ON {name} ({', '.join(unique_columns)})")
+
+
+def downgrade() -> None:
+    for name in reversed(list(EXPOSURE_VIEWS)):
+        op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {name}")
+    op.drop_table('video_labels')
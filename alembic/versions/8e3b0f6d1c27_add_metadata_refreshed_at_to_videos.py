@@ -0,0 +1,30 @@
+"""add metadata_refreshed_at to videos table
+
+Revision ID: 8e3b0f6d1c27
+Revises: 5c1e7d9a2b44
+Create Date: 2026-10-19 13:41:07.552913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3b0f6d1c27'
+down_revision: Union[str, None] = '5c1e7d9a2b44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows stay NULL so the refresh job treats them as the stalest
+    op.add_column('videos', sa.Column('metadata_refreshed_at', sa.DateTime(timezone=True), nullable=True))
+    op.alter_column('videos', 'metadata_refreshed_at', server_default=sa.text('now()'))
+    op.create_index('ix_videos_metadata_refreshed_at', 'videos', ['metadata_refreshed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_videos_metadata_refreshed_at', table_name='videos')
+    op.drop_column('videos', 'metadata_refreshed_at')
@@ -0,0 +1,38 @@
+"""add worker coordination tables
+
+Revision ID: b47d2e9c8a15
+Revises: 8e3b0f6d1c27
+Create Date: 2026-10-19 16:02:55.104387
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b47d2e9c8a15'
+down_revision: Union[str, None] = '8e3b0f6d1c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('api_quota_ledger',
+    sa.Column('quota_day', sa.Date(), nullable=False),
+    sa.Column('units_spent', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('quota_day')
+    )
+    op.create_table('video_fetch_claims',
+    sa.Column('video_id', sa.String(length=32), nullable=False),
+    sa.Column('worker_id', sa.String(length=128), nullable=False),
+    sa.Column('claimed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('video_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('video_fetch_claims')
+    op.drop_table('api_quota_ledger')
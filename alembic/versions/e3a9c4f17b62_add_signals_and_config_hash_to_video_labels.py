@@ -0,0 +1,36 @@
+"""add signals and config_hash to video_labels table
+
+Revision ID: e3a9c4f17b62
+Revises: b47d2e9c8a15
+Create Date: 2026-10-19 18:27:34.610952
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9c4f17b62'
+down_revision: Union[str, None] = 'b47d2e9c8a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SIGNAL_COLUMNS = ['signal_category', 'signal_topic', 'signal_channel_topic',
+                  'signal_title', 'signal_description', 'signal_tags']
+
+
+def upgrade() -> None:
+    for column in SIGNAL_COLUMNS:
+        op.add_column('video_labels', sa.Column(column, sa.Boolean(), server_default=sa.false(), nullable=False))
+    # Existing rows stay NULL so the next sync relabels them with per-signal values
+    op.add_column('video_labels', sa.Column('config_hash', sa.String(length=16), nullable=True))
+    op.create_index('ix_video_labels_config_hash', 'video_labels', ['config_hash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_video_labels_config_hash', table_name='video_labels')
+    op.drop_column('video_labels', 'config_hash')
+    for column in reversed(SIGNAL_COLUMNS):
+        op.drop_column('video_labels', column)
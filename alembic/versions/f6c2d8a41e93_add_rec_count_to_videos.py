@@ -0,0 +1,32 @@
+"""add rec_count to videos table
+
+Revision ID: f6c2d8a41e93
+Revises: e3a9c4f17b62
+Create Date: 2026-10-20 09:12:48.203517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6c2d8a41e93'
+down_revision: Union[str, None] = 'e3a9c4f17b62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('videos', sa.Column('rec_count', sa.BigInteger(), server_default='0', nullable=False))
+    # Backfill once; from here on insert_rec_events keeps the count
+    op.execute("""
+        UPDATE videos v SET rec_count = c.n
+        FROM (SELECT video_id, COUNT(*) AS n FROM rec_events GROUP BY video_id) c
+        WHERE c.video_id = v.video_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('videos', 'rec_count')
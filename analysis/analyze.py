@@ -1,15 +1,9 @@
 import sys
 import logging
-import pandas as pd
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from analysis.load_data import get_labeled_dataset
-from analysis.political_labeling import add_custom_political_labels
-from analysis.metrics import compute_exposure_summary
-from analysis.visualizations import generate_all_visualizations
-
 logger = logging.getLogger(__name__)
 
 
@@ -17,8 +11,32 @@ def run_analysis(
     output_dir: str = "analysis/outputs",
     custom_political_channels: list = None,
     custom_political_videos: list = None,
-    min_signals: int = 2
+    min_signals: int = 2,
+    streaming: bool = False,
+    snapshot_dir: str = None
 ):
+    """
+    Label, summarize and plot the dataset. With streaming, the summary is
+    computed from rec_events chunk by chunk (see analysis.streaming), labels
+    come from the video_labels table, and no labeled dataset files are written.
+    With snapshot_dir, the summary is computed by DuckDB over the Parquet
+    snapshot written by analysis.snapshot, without touching the database.
+    """
+    if snapshot_dir:
+        return run_snapshot_analysis(
+            output_dir, custom_political_channels, custom_political_videos, min_signals, snapshot_dir
+        )
+    if streaming:
+        return run_streaming_analysis(output_dir, custom_political_channels, custom_political_videos, min_signals)
+
+    # pandas, matplotlib and seaborn are only loaded once an analysis actually runs
+    from analysis.labeled_cache import read_video_text
+    from analysis.load_data import get_labeled_dataset
+    from analysis.political_labeling import add_custom_political_labels
+    from analysis.metrics import compute_exposure_summary
+    from analysis.sensitivity import add_uncertainty
+    from analysis.visualizations import generate_all_visualizations
+
     logger.info("=" * 80)
     logger.info("YOUTUBE RECOMMENDATION POLITICAL CONTENT ANALYSIS")
     logger.info("=" * 80)
@@ -38,6 +56,7 @@ def run_analysis(
 
     logger.info("\n[Step 3/5] Computing exposure metrics...")
     summary = compute_exposure_summary(df)
+    add_uncertainty(summary, df)
 
     logger.info("\n[Step 4/5] Generating visualizations and tables...")
     generate_all_visualizations(summary, output_dir=output_dir)
@@ -46,7 +65,11 @@ def run_analysis(
     output_path = Path(output_dir)
     df.to_csv(output_path / 'labeled_dataset.csv', index=False)
     df.to_parquet(output_path / 'labeled_dataset.parquet', index=False)
-    logger.info(f"Saved: labeled_dataset.csv and labeled_dataset.parquet")
+    # The compact frame has no per-video text; it is written once per video instead
+    video_text = read_video_text(df['video_id'])
+    video_text.to_csv(output_path / 'labeled_videos.csv', index=False)
+    video_text.to_parquet(output_path / 'labeled_videos.parquet', index=False)
+    logger.info(f"Saved: labeled_dataset.csv/.parquet and labeled_videos.csv/.parquet")
 
     logger.info("\n" + "=" * 80)
     logger.info("ANALYSIS COMPLETE!")
@@ -55,12 +78,83 @@ def run_analysis(
     logger.info("\nGenerated files:")
     logger.info("  - Figures: overall_exposure.png, exposure_by_iteration.png, etc.")
     logger.info("  - Tables: table_*.csv files ready for LaTeX/papers")
-    logger.info("  - Data: labeled_dataset.csv and labeled_dataset.parquet")
+    logger.info("  - Data: labeled_dataset.csv/.parquet (events), labeled_videos.csv/.parquet (per-video text)")
 
     return df, summary
 
 
+def run_streaming_analysis(
+    output_dir: str = "analysis/outputs",
+    custom_political_channels: list = None,
+    custom_political_videos: list = None,
+    min_signals: int = 2
+):
+    from sqlalchemy import create_engine
+    from analysis.load_data import get_database_url
+    from analysis.materialized_views import sync_video_labels
+    from analysis.metrics import log_exposure_summary
+    from analysis.streaming import compute_streaming_exposure_summary
+    from analysis.visualizations import generate_all_visualizations
+
+    logger.info("=" * 80)
+    logger.info("YOUTUBE RECOMMENDATION POLITICAL CONTENT ANALYSIS (STREAMING)")
+    logger.info("=" * 80)
+    engine = create_engine(get_database_url())
+
+    logger.info("\n[Step 1/3] Labeling new and changed videos...")
+    sync_video_labels(engine)
+
+    logger.info("\n[Step 2/3] Computing exposure metrics from streamed events...")
+    summary = compute_streaming_exposure_summary(
+        engine,
+        min_signals=min_signals,
+        custom_political_channels=custom_political_channels,
+        custom_political_videos=custom_political_videos,
+    )
+    log_exposure_summary(summary)
+
+    logger.info("\n[Step 3/3] Generating visualizations and tables...")
+    generate_all_visualizations(summary, output_dir=output_dir)
+
+    logger.info(f"\nAll outputs saved to: {Path(output_dir).absolute()}")
+    return None, summary
+
+
+def run_snapshot_analysis(
+    output_dir: str = "analysis/outputs",
+    custom_political_channels: list = None,
+    custom_political_videos: list = None,
+    min_signals: int = 2,
+    snapshot_dir: str = None
+):
+    from analysis.duckdb_backend import compute_duckdb_exposure_summary
+    from analysis.metrics import log_exposure_summary
+    from analysis.visualizations import generate_all_visualizations
+
+    logger.info("=" * 80)
+    logger.info("YOUTUBE RECOMMENDATION POLITICAL CONTENT ANALYSIS (PARQUET SNAPSHOT)")
+    logger.info("=" * 80)
+
+    logger.info("\n[Step 1/2] Computing exposure metrics with DuckDB...")
+    summary = compute_duckdb_exposure_summary(
+        snapshot_dir,
+        min_signals=min_signals,
+        custom_political_channels=custom_political_channels,
+        custom_political_videos=custom_political_videos,
+    )
+    log_exposure_summary(summary)
+
+    logger.info("\n[Step 2/2] Generating visualizations and tables...")
+    generate_all_visualizations(summary, output_dir=output_dir)
+
+    logger.info(f"\nAll outputs saved to: {Path(output_dir).absolute()}")
+    return None, summary
+
+
 if __name__ == "__main__":
+    import pandas as pd
+    from analysis.snapshot import SNAPSHOT_DIR
+
     logging.basicConfig(level=logging.INFO, format='%(message)s')
 
 
@@ -72,7 +166,11 @@ if __name__ == "__main__":
     df, summary = run_analysis(
         output_dir="analysis/outputs",
         min_signals=2,  # Adjust this based on your validation results
-        custom_political_channels=political_channels if political_channels else None
+        custom_political_channels=political_channels if political_channels else None,
+        # --streaming: for datasets that don't fit in memory
+        streaming='--streaming' in sys.argv[1:],
+        # --snapshot: summarize the Parquet snapshot from python -m analysis.snapshot
+        snapshot_dir=SNAPSHOT_DIR if '--snapshot' in sys.argv[1:] else None
     )
 
     # Optional: Additional custom analysis
@@ -81,7 +179,7 @@ if __name__ == "__main__":
     logger.info("=" * 80)
 
     # Example: Check if there are trends over time
-    if 'collected_at' in df.columns:
+    if df is not None and 'collected_at' in df.columns:
         logger.info("\nRecommendations over time:")
         df['date'] = pd.to_datetime(df['collected_at']).dt.date
         daily_stats = df.groupby('date')['is_political'].agg(['sum', 'count', 'mean'])
@@ -0,0 +1,194 @@
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from analysis.snapshot import SNAPSHOT_DIR, read_snapshot_manifest
+
+logger = logging.getLogger(__name__)
+
+# Passed to DuckDB's memory_limit; past it, joins and aggregations spill to disk
+DUCKDB_MEMORY_LIMIT = os.getenv("ANALYSIS_DUCKDB_MEMORY_LIMIT", "")
+# 0 lets DuckDB use every core
+DUCKDB_THREADS = int(os.getenv("ANALYSIS_DUCKDB_THREADS", "0"))
+
+# One row per video with what the summaries need from videos, categories and video_labels
+VIDEO_FLAGS_SQL = """
+CREATE TEMP TABLE video_flags AS
+SELECT
+    v.video_id,
+    v.title,
+    v.channel_id,
+    v.channel_title,
+    v.view_count,
+    c.name AS category_name,
+    coalesce(
+        coalesce(l.signal_count, 0) >= $min_signals
+        OR list_contains($channel_ids::VARCHAR[], v.channel_id)
+        OR list_contains($video_ids::VARCHAR[], v.video_id),
+        false
+    ) AS is_political
+FROM videos v
+LEFT JOIN categories c ON c.id = v.category_id
+LEFT JOIN video_labels l ON l.video_id = v.video_id
+"""
+
+# Every event with its video's flags; events whose video is missing count as not political
+EVENTS_SQL = """
+CREATE TEMP VIEW events AS
+SELECT
+    e.id,
+    e.run_id,
+    e.iteration,
+    e.video_id,
+    e.position,
+    f.title,
+    f.channel_id,
+    f.channel_title,
+    f.view_count,
+    f.category_name,
+    coalesce(f.is_political, false) AS is_political
+FROM rec_events e
+LEFT JOIN video_flags f ON f.video_id = e.video_id
+"""
+
+OVERALL_SQL = """
+SELECT
+    count(*) AS total_recommendations,
+    coalesce(sum(is_political::INTEGER), 0) AS political_recommendations,
+    count(DISTINCT video_id) AS unique_videos,
+    count(DISTINCT video_id) FILTER (WHERE is_political) AS unique_political_videos,
+    coalesce(median(iteration) FILTER (WHERE is_political), 0) AS median_political_depth,
+    coalesce(avg(iteration) FILTER (WHERE is_political), 0) AS mean_political_depth
+FROM events
+"""
+
+GROUPED_SQL = """
+SELECT
+    {key},
+    sum(is_political::INTEGER) AS political_count,
+    avg(is_political::INTEGER) AS political_rate,
+    count(*) AS total_recommendations,
+    count(DISTINCT video_id) AS unique_videos{extra},
+    avg(is_political::INTEGER) * 100 AS political_percentage
+FROM events
+{where}
+GROUP BY {key}
+ORDER BY {key}
+"""
+
+TOP_VIDEOS_SQL = """
+SELECT
+    video_id,
+    title,
+    channel_title,
+    count(*) AS recommendation_count,
+    avg(iteration) AS avg_iteration,
+    avg(position) AS avg_position,
+    any_value(view_count) AS view_count,
+    any_value(category_name) AS category
+FROM events
+WHERE is_political AND title IS NOT NULL AND channel_title IS NOT NULL
+GROUP BY video_id, title, channel_title
+ORDER BY recommendation_count DESC, video_id
+LIMIT $top_n
+"""
+
+TOP_CHANNELS_SQL = """
+SELECT
+    channel_id,
+    channel_title,
+    count(DISTINCT video_id) AS unique_videos,
+    count(*) AS total_recommendations,
+    avg(iteration) AS avg_iteration
+FROM events
+WHERE is_political AND channel_id IS NOT NULL AND channel_title IS NOT NULL
+GROUP BY channel_id, channel_title
+ORDER BY total_recommendations DESC, channel_id
+LIMIT $top_n
+"""
+
+
+def _parquet(path: Path, hive: bool = False) -> str:
+    pattern = str(path / ("**/*.parquet" if hive else "*.parquet")).replace("'", "''")
+    return f"read_parquet('{pattern}'{', hive_partitioning = true' if hive else ''})"
+
+
+def connect_snapshot(snapshot_dir: Optional[Path] = None):
+    """
+    In-memory DuckDB connection with one view per table of the Parquet
+    snapshot written by analysis.snapshot.export_snapshot.
+    """
+    import duckdb
+
+    root = Path(snapshot_dir or SNAPSHOT_DIR)
+    manifest = read_snapshot_manifest(root)
+    if manifest is None:
+        raise FileNotFoundError(f"No Parquet snapshot in {root}; run python -m analysis.snapshot first")
+    logger.info(f"Querying Parquet snapshot exported at {manifest['exported_at']}")
+
+    conn = duckdb.connect()
+    if DUCKDB_MEMORY_LIMIT:
+        conn.execute(f"SET memory_limit = '{DUCKDB_MEMORY_LIMIT}'")
+    if DUCKDB_THREADS:
+        conn.execute(f"SET threads = {DUCKDB_THREADS}")
+    conn.execute(f"CREATE VIEW rec_events AS SELECT * FROM {_parquet(root / 'rec_events', hive=True)}")
+    for table in ('videos', 'channels', 'categories', 'video_labels'):
+        conn.execute(f"CREATE VIEW {table} AS SELECT * FROM {_parquet(root / table)}")
+    return conn
+
+
+def compute_duckdb_exposure_summary(
+    snapshot_dir: Optional[Path] = None,
+    min_signals: int = 2,
+    custom_political_channels: Optional[List[str]] = None,
+    custom_political_videos: Optional[List[str]] = None,
+    max_position: int = 20,
+    top_n: int = 20
+) -> Dict:
+    """
+    compute_exposure_summary as SQL over a Parquet snapshot: DuckDB scans the
+    files in parallel and out of core, and Postgres is never queried. Labels
+    come from the snapshot's video_labels; custom labels match
+    add_custom_political_labels.
+    """
+    conn = connect_snapshot(snapshot_dir)
+    try:
+        conn.execute(VIDEO_FLAGS_SQL, {
+            'min_signals': min_signals,
+            'channel_ids': list(custom_political_channels or []),
+            'video_ids': list(custom_political_videos or []),
+        })
+        conn.execute(EVENTS_SQL)
+
+        overall = conn.execute(OVERALL_SQL).df().iloc[0].to_dict()
+        overall = {
+            'total_recommendations': int(overall['total_recommendations']),
+            'political_recommendations': int(overall['political_recommendations']),
+            'political_percentage': (
+                overall['political_recommendations'] / overall['total_recommendations'] * 100
+                if overall['total_recommendations'] > 0 else 0
+            ),
+            'unique_videos': int(overall['unique_videos']),
+            'unique_political_videos': int(overall['unique_political_videos']),
+            'median_political_depth': float(overall['median_political_depth']),
+            'mean_political_depth': float(overall['mean_political_depth']),
+        }
+
+        grouped = {
+            'by_iteration': GROUPED_SQL.format(key='iteration', extra='', where=''),
+            'by_position': GROUPED_SQL.format(
+                key='position', extra='', where=f"WHERE position IS NOT NULL AND position < {int(max_position)}"
+            ),
+            'by_run': GROUPED_SQL.format(key='run_id', extra=',\n    max(iteration) AS max_iteration', where=''),
+        }
+        summary = {'overall': overall}
+        for key, sql in grouped.items():
+            summary[key] = conn.execute(sql).df()
+        summary['top_videos'] = conn.execute(TOP_VIDEOS_SQL, {'top_n': top_n}).df()
+        summary['top_channels'] = conn.execute(TOP_CHANNELS_SQL, {'top_n': top_n}).df()
+    finally:
+        conn.close()
+
+    logger.info(f"Summarized {overall['total_recommendations']:,} recommendation events with DuckDB")
+    return summary
@@ -0,0 +1,80 @@
+import re
+import unicodedata
+from typing import Iterable, List
+
+# A token is a run of word characters, including combining marks so that
+# scripts like Devanagari (vowel signs, virama) aren't split mid-word.
+TOKEN_PATTERN = re.compile(
+    r"[\w\u0300-\u036f\u0900-\u0903\u093a-\u094f\u0951-\u0957\u0962\u0963]+"
+)
+
+
+def tokenize(text: str) -> List[str]:
+    # NFC so precomposed and decomposed accents (elección) yield the same token
+    return TOKEN_PATTERN.findall(unicodedata.normalize('NFC', text).lower())
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over word tokens.
+
+    Keywords are tokenized the same way as the text, so single- and
+    multi-word keywords (and hyphenated ones, e.g. "anti-semitism") only match
+    whole tokens, and every keyword is found in one pass over the text.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self._goto: List[dict] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[tuple] = [()]
+        for keyword in keywords:
+            self._add(keyword)
+        self._link()
+
+    def _add(self, keyword: str):
+        tokens = tokenize(keyword)
+        if not tokens:
+            return
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        if keyword not in self._output[state]:
+            self._output[state] += (keyword,)
+
+    def _link(self):
+        # Breadth-first, so each state's failure target is finished before its children
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] += self._output[self._fail[child]]
+
+    def find_all(self, text) -> List[str]:
+        """Distinct keywords found in text, in order of first occurrence."""
+        if not isinstance(text, str) or not text:
+            return []
+        goto, fail, output = self._goto, self._fail, self._output
+        found = {}
+        state = 0
+        for token in tokenize(text):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for keyword in output[state]:
+                found.setdefault(keyword, None)
+        return list(found)
+
+    def matches(self, text) -> bool:
+        return bool(self.find_all(text))
@@ -0,0 +1,390 @@
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Optional
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+from analysis.load_data import (
+    TEXT_COLUMNS,
+    compact_dataset,
+    get_cache_dir,
+    get_database_url,
+    load_categories,
+    load_channels,
+    load_rec_events,
+    load_videos,
+    merge_dataset,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rows committed late (e.g. a slow collector transaction that took an id below
+# the watermark) are picked up by re-scanning this window on every update
+WATERMARK_LAG = timedelta(minutes=30)
+# Label entries for old configurations are evicted least-recently-used first
+# once CACHE_DIR grows past this size
+CACHE_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+
+EVENTS_DIR = "events"
+# Bumped when the layout of EVENTS_DIR changes; an older store is rebuilt
+CACHE_FORMAT = 2
+LABELS_PREFIX = "labels-"
+MANIFEST_FILE = "manifest.json"
+VIDEO_LABELS_FILE = "video_labels.parquet"
+# Per-video metadata next to the event partitions, joined in at read time
+VIDEOS_FILE = "videos.parquet"
+CHANNELS_FILE = "channels.parquet"
+CATEGORIES_FILE = "categories.parquet"
+
+
+def now_iso() -> str:
+    """The current UTC time as an ISO string, as manifests store it."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+def events_path() -> Path:
+    return get_cache_dir() / EVENTS_DIR
+
+
+def labels_path(config_hash: str) -> Path:
+    return get_cache_dir() / f"{LABELS_PREFIX}{config_hash}"
+
+
+def read_manifest(path: Path) -> Optional[dict]:
+    manifest_file = path / MANIFEST_FILE
+    if not manifest_file.exists():
+        return None
+    return json.loads(manifest_file.read_text(encoding="utf-8"))
+
+
+def write_atomic(path: Path, write):
+    """Call write(tmp) on a sibling temporary file, then move it over path."""
+    tmp = path.with_name(path.name + ".tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def write_manifest(path: Path, manifest: dict):
+    write_atomic(path / MANIFEST_FILE, lambda tmp: tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8"))
+
+
+def cache_age_hours() -> Optional[float]:
+    """Hours since the events cache was last brought up to date, or None if there is none."""
+    manifest = read_manifest(events_path())
+    if manifest is None:
+        return None
+    updated_at = datetime.fromisoformat(manifest["updated_at"])
+    return (datetime.now(timezone.utc) - updated_at).total_seconds() / 3600
+
+
+def _empty_events_manifest() -> dict:
+    return {
+        "format": CACHE_FORMAT, "max_id": None, "max_collected_at": None, "rows": 0, "partitions": [],
+        "videos_refreshed_at": None, "updated_at": None,
+    }
+
+
+def _cached_ids_since(path: Path, manifest: dict, cutoff: pd.Timestamp) -> set:
+    """IDs already cached from partitions that overlap the re-scan window."""
+    ids = set()
+    for partition in manifest["partitions"]:
+        if partition["max_collected_at"] and pd.Timestamp(partition["max_collected_at"]) >= cutoff:
+            ids.update(pd.read_parquet(path / partition["file"], columns=["id"])["id"].tolist())
+    return ids
+
+
+def load_new_events(engine, path: Path, manifest: dict) -> pd.DataFrame:
+    """rec_events past the manifest watermark that aren't cached yet."""
+    if manifest["max_id"] is None:
+        return load_rec_events(engine)
+
+    cutoff = pd.Timestamp(manifest["max_collected_at"]) - WATERMARK_LAG
+    events = load_rec_events(engine, newer_than_id=manifest["max_id"], collected_since=cutoff.to_pydatetime())
+    late = events["id"] <= manifest["max_id"]
+    if late.any():
+        cached = _cached_ids_since(path, manifest, cutoff)
+        events = events[~(late & events["id"].isin(cached))].reset_index(drop=True)
+    return events
+
+
+def _read_table(path: Path, name: str, exclude: Iterable[str] = (), columns: Optional[list] = None) -> pd.DataFrame:
+    import pyarrow.parquet as pq
+
+    file = path / name
+    if not file.exists():
+        return pd.DataFrame(columns=columns)
+    if exclude:
+        columns = [column for column in pq.read_schema(file).names if column not in exclude]
+    return pd.read_parquet(file, columns=columns)
+
+
+def _write_table(path: Path, name: str, frame: pd.DataFrame):
+    write_atomic(path / name, lambda tmp: frame.to_parquet(tmp, index=False))
+
+
+def _upsert(cached: pd.DataFrame, rows: pd.DataFrame, key: str) -> pd.DataFrame:
+    if cached.empty:
+        return rows.reset_index(drop=True)
+    if rows.empty:
+        return cached
+    kept = cached[~cached[key].isin(rows[key])]
+    return pd.concat([kept, rows], ignore_index=True)
+
+
+def update_video_metadata(engine, path: Path, manifest: dict, video_ids: Iterable[str]) -> int:
+    """
+    Bring the cached video, channel and category tables up to date: load the
+    video_ids not cached yet and re-load cached videos whose
+    metadata_refreshed_at moved past the manifest watermark, with their
+    channels. Returns the number of video rows loaded.
+    """
+    videos = _read_table(path, VIDEOS_FILE)
+    cached_ids = videos['video_id'] if not videos.empty else pd.Series([], dtype=object)
+    new_ids = pd.Index(pd.unique(pd.Series(video_ids).dropna())).difference(cached_ids)
+
+    loaded = [load_videos(engine, video_ids=new_ids.tolist())] if len(new_ids) else []
+    if manifest["videos_refreshed_at"] is not None and not videos.empty:
+        cutoff = pd.Timestamp(manifest["videos_refreshed_at"]) - WATERMARK_LAG
+        refreshed = load_videos(engine, refreshed_after=cutoff.to_pydatetime())
+        loaded.append(refreshed[refreshed['video_id'].isin(cached_ids)])
+    loaded = [frame for frame in loaded if not frame.empty]
+    if not loaded:
+        return 0
+
+    delta = pd.concat(loaded, ignore_index=True).drop_duplicates('video_id', keep='last')
+    videos = _upsert(videos, delta, 'video_id')
+    channels = load_channels(engine, channel_ids=delta['channel_id'].dropna().unique())
+    _write_table(path, VIDEOS_FILE, videos)
+    _write_table(path, CHANNELS_FILE, _upsert(_read_table(path, CHANNELS_FILE), channels, 'channel_id'))
+    _write_table(path, CATEGORIES_FILE, load_categories(engine))
+
+    refreshed_at = videos['metadata_refreshed_at'].max()
+    if pd.notna(refreshed_at):
+        manifest["videos_refreshed_at"] = refreshed_at.isoformat()
+    return len(delta)
+
+
+def update_events_cache(engine=None) -> dict:
+    """
+    Append rec_events past the watermark as a new Parquet partition, and bring
+    the per-video metadata they are joined with at read time up to date.
+    Unlabeled, so it is shared by every labeling configuration. Returns the
+    updated manifest.
+    """
+    if engine is None:
+        engine = create_engine(get_database_url())
+
+    path = events_path()
+    path.mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(path)
+    if manifest is not None and manifest.get("format") != CACHE_FORMAT:
+        logger.info("Events cache was written by an older version, rebuilding it...")
+        shutil.rmtree(path)
+        path.mkdir()
+        manifest = None
+    manifest = manifest or _empty_events_manifest()
+
+    logger.info(f"Loading recommendation events after id {manifest['max_id']}...")
+    delta = load_new_events(engine, path, manifest)
+
+    if not delta.empty:
+        file_name = f"part-{len(manifest['partitions']):05d}.parquet"
+        _write_table(path, file_name, delta)
+
+        max_collected_at = delta['collected_at'].max()
+        manifest["partitions"].append({
+            "file": file_name,
+            "rows": len(delta),
+            "max_id": int(delta['id'].max()),
+            "max_collected_at": max_collected_at.isoformat(),
+        })
+        manifest["rows"] += len(delta)
+        manifest["max_id"] = max(manifest["max_id"] or 0, int(delta['id'].max()))
+        if manifest["max_collected_at"] is None or max_collected_at > pd.Timestamp(manifest["max_collected_at"]):
+            manifest["max_collected_at"] = max_collected_at.isoformat()
+        logger.info(f"✓ Appended {len(delta):,} events to {path / file_name}")
+    else:
+        logger.info("No new recommendation events since the last update.")
+
+    video_ids = delta['video_id'] if not delta.empty else []
+    loaded = update_video_metadata(engine, path, manifest, video_ids)
+    if loaded:
+        logger.info(f"✓ Loaded metadata for {loaded:,} new or refreshed videos")
+
+    manifest["updated_at"] = now_iso()
+    write_manifest(path, manifest)
+    return manifest
+
+
+def read_events_cache() -> pd.DataFrame:
+    """All cached (unlabeled) events, partitions in watermark order, without any video columns."""
+    path = events_path()
+    manifest = read_manifest(path)
+    if manifest is None or not manifest["partitions"]:
+        return pd.DataFrame()
+    frames = [pd.read_parquet(path / partition["file"]) for partition in manifest["partitions"]]
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def read_video_metadata(exclude: Iterable[str] = ()) -> tuple:
+    """
+    The cached (videos, channels, categories) tables. Columns that would be
+    named in exclude after merge_dataset are never read.
+    """
+    path = events_path()
+    exclude = set(exclude)
+    channel_exclude = {name[:-len('_channel')] for name in exclude if name.endswith('_channel')}
+    return (
+        _read_table(path, VIDEOS_FILE, exclude),
+        _read_table(path, CHANNELS_FILE, channel_exclude),
+        _read_table(path, CATEGORIES_FILE),
+    )
+
+
+def join_video_metadata(frame: pd.DataFrame, exclude: Iterable[str] = ()) -> pd.DataFrame:
+    """frame (events or bare video_ids) joined with the current cached video, channel and category rows."""
+    videos, channels, categories = read_video_metadata(exclude)
+    return merge_dataset(frame, videos, channels, categories)
+
+
+def ensure_video_labels(video_ids: Iterable[str]) -> pd.DataFrame:
+    """
+    Per-video signals for the current labeling configuration. Stored under a
+    key derived from labeling_config_hash(); video_ids the entry hasn't
+    labeled yet, or whose metadata_refreshed_at changed since they were
+    labeled, are labeled from the cached metadata and replace their old rows.
+    """
+    from analysis.political_labeling import (
+        SIGNAL_COLUMNS,
+        label_political_content,
+        labeling_config,
+        labeling_config_hash,
+    )
+
+    config = labeling_config()
+    config_hash = labeling_config_hash(config)
+    path = labels_path(config_hash)
+    path.mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(path) or {"config_hash": config_hash, "config": config, "videos": 0, "created_at": now_iso()}
+    labels_file = path / VIDEO_LABELS_FILE
+    video_labels = pd.read_parquet(labels_file) if labels_file.exists() else pd.DataFrame(
+        {'video_id': pd.Series([], dtype=object), 'metadata_refreshed_at': pd.Series([], dtype='datetime64[us, UTC]')}
+    )
+
+    wanted = pd.DataFrame({'video_id': pd.unique(pd.Series(video_ids).dropna())})
+    refreshed = _read_table(events_path(), VIDEOS_FILE, columns=['video_id', 'metadata_refreshed_at'])
+    current = wanted.merge(refreshed, on='video_id', how='left')
+    known = current.merge(video_labels[['video_id', 'metadata_refreshed_at']], on='video_id', how='left',
+                          suffixes=('', '_labeled'), indicator=True)
+    # NaT == NaT counts as unchanged; videos refreshed since labeling are labeled again
+    unchanged = (known['metadata_refreshed_at'] == known['metadata_refreshed_at_labeled']) | (
+        known['metadata_refreshed_at'].isna() & known['metadata_refreshed_at_labeled'].isna()
+    )
+    stale_ids = known.loc[(known['_merge'] == 'left_only') | ~unchanged, 'video_id']
+
+    if len(stale_ids):
+        logger.info(f"Labeling {len(stale_ids):,} new or refreshed videos for labeling config {config_hash}...")
+        stale = join_video_metadata(pd.DataFrame({'video_id': stale_ids.to_numpy()}))
+        labeled = label_political_content(stale)[
+            ['video_id', 'metadata_refreshed_at'] + SIGNAL_COLUMNS + ['signal_count', 'matched_keywords']
+        ]
+        video_labels = _upsert(video_labels, labeled, 'video_id')
+        write_atomic(labels_file, lambda tmp: video_labels.to_parquet(tmp, index=False))
+        manifest["videos"] = len(video_labels)
+
+    manifest["last_used_at"] = now_iso()
+    write_manifest(path, manifest)
+    return video_labels.drop(columns='metadata_refreshed_at')
+
+
+def read_labeled_cache(min_signals: int = 2, compact: bool = False) -> pd.DataFrame:
+    """
+    Cached events joined with their current video metadata, the current
+    configuration's signals and is_political for min_signals. With compact,
+    TEXT_COLUMNS are never read from the cache and the result goes through
+    compact_dataset.
+    """
+    events = read_events_cache()
+    if events.empty:
+        return events
+    labels = ensure_video_labels(events['video_id'])
+    if compact:
+        labels = labels.drop(columns='matched_keywords', errors='ignore')
+    df = join_video_metadata(events, exclude=TEXT_COLUMNS if compact else ())
+    df = df.merge(labels, on='video_id', how='left')
+    df['is_political'] = df['signal_count'] >= min_signals
+    return compact_dataset(df) if compact else df
+
+
+def read_video_text(video_ids: Iterable[str]) -> pd.DataFrame:
+    """
+    One row per video with the TEXT_COLUMNS a compact read leaves out,
+    matched_keywords included, for joining back on video_id.
+    """
+    wanted = pd.DataFrame({'video_id': pd.unique(pd.Series(video_ids, dtype=object).dropna())})
+    labels = ensure_video_labels(wanted['video_id'])[['video_id', 'matched_keywords']]
+    videos = join_video_metadata(wanted).merge(labels, on='video_id', how='left')
+    return videos[['video_id'] + [column for column in TEXT_COLUMNS if column in videos.columns]]
+
+
+def _entry_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob('*') if f.is_file()) if path.is_dir() else path.stat().st_size
+
+
+def _last_used(path: Path) -> float:
+    manifest = read_manifest(path) if path.is_dir() else None
+    if manifest and manifest.get("last_used_at"):
+        return datetime.fromisoformat(manifest["last_used_at"]).timestamp()
+    return path.stat().st_mtime
+
+
+def evict_cache(max_bytes: int = CACHE_MAX_BYTES, keep: tuple = ()) -> list:
+    """
+    Remove least-recently-used entries from CACHE_DIR until it fits in
+    max_bytes. The events store and the entries in keep are never removed.
+    Returns the names of the evicted entries.
+    """
+    cache_dir = get_cache_dir()
+    entries = [path for path in cache_dir.iterdir() if path.name != EVENTS_DIR]
+    total = sum(_entry_size(path) for path in cache_dir.iterdir())
+    evicted = []
+    for path in sorted(entries, key=_last_used):
+        if total <= max_bytes:
+            break
+        if path.name in keep:
+            continue
+        total -= _entry_size(path)
+        shutil.rmtree(path) if path.is_dir() else path.unlink()
+        evicted.append(path.name)
+        logger.info(f"Evicted cache entry {path.name}")
+    if total > max_bytes:
+        logger.warning(f"Analysis cache is {total / 2**20:.0f} MB, above the {max_bytes / 2**20:.0f} MB budget")
+    return evicted
+
+
+def get_cached_labeled_dataset(
+    min_signals: int = 2,
+    max_age_hours: int = 24,
+    engine=None,
+    compact: bool = False
+) -> pd.DataFrame:
+    """
+    Bring the events cache up to date if it is older than max_age_hours, label
+    any videos the current configuration hasn't seen, then evict old entries.
+    """
+    from analysis.political_labeling import labeling_config_hash
+
+    age = cache_age_hours()
+    if age is not None and age <= max_age_hours:
+        logger.info(f"✓ Loading labeled dataset from cache ({age:.1f}h old)...")
+    else:
+        update_events_cache(engine=engine)
+
+    df = read_labeled_cache(min_signals, compact=compact)
+    evict_cache(keep=(labels_path(labeling_config_hash()).name,))
+    return df
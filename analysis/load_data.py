@@ -1,23 +1,45 @@
+import numpy as np
 import pandas as pd
 import logging
-from sqlalchemy import create_engine, select
-from sqlalchemy.orm import Session
+from sqlalchemy import Text, cast, create_engine, false, or_, select
 import os
-from typing import Optional
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, Optional, Sequence
 from pathlib import Path
 from dotenv import load_dotenv
 
-from app.models.rec_event import RecEvent
-from app.models.video import Video
-from app.models.channel import Channel
-from app.models.category import Category
-
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
 CACHE_DIR = Path(__file__).parent / "cache"
-CACHE_DIR.mkdir(exist_ok=True)
+# Rows fetched per server-side cursor round trip by the columnar loader
+STREAM_CHUNK_ROWS = 100_000
+# IDs per IN (...) query when loading a subset of videos or channels
+ID_BATCH_SIZE = 10_000
+
+# Per-video text that only labeling reads; compact_dataset keeps it out of the event frame
+TEXT_COLUMNS = [
+    'description', 'tags', 'topic_categories', 'title_channel', 'description_channel',
+    'topic_categories_channel', 'matched_keywords',
+]
+# Values repeated on every event of a video/channel/run, stored once per distinct value
+CATEGORICAL_COLUMNS = [
+    'run_id', 'video_id', 'source_video_id', 'channel_id', 'channel_title', 'title', 'category_name',
+    'language', 'country', 'duration_iso',
+]
+# Narrowest integer type for each column, used when every value fits
+INTEGER_DTYPES = {
+    'iteration_rec': 'int16', 'iteration_video': 'int16', 'position': 'Int16',
+    'category_id': 'Int16', 'id_cat': 'Int16', 'signal_count': 'int8',
+}
+LIST_COLUMNS = ['tags', 'topic_categories', 'topic_categories_channel', 'matched_keywords']
+
+
+def get_cache_dir() -> Path:
+    """Return CACHE_DIR, creating it on first use rather than at import."""
+    CACHE_DIR.mkdir(exist_ok=True)
+    return CACHE_DIR
 
 
 def get_database_url() -> str:
@@ -27,119 +49,277 @@ def get_database_url() -> str:
     return db_url
 
 
+def _to_series(values: Sequence, dtype: Optional[str]) -> pd.Series:
+    if dtype == "datetime":
+        return pd.to_datetime(pd.Series(values, dtype=object), utc=True)
+    if dtype is None:
+        return pd.Series(values, dtype=object if not values else None)
+    return pd.Series(pd.array(values, dtype=dtype))
+
+
+def read_columns(
+    engine,
+    query,
+    dtypes: Optional[Dict[str, Optional[str]]] = None,
+    chunk_rows: int = STREAM_CHUNK_ROWS
+) -> pd.DataFrame:
+    """
+    Stream a Core select through a server-side cursor into typed DataFrame
+    columns, chunk_rows rows at a time. Only plain tuples of the current chunk
+    are ever held as Python objects; dtypes maps column names to a pandas
+    dtype, "datetime" (tz-aware UTC) or None to let pandas infer.
+    """
+    dtypes = dtypes or {}
+    chunks: Dict[str, list] = {}
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_rows).execute(query)
+        columns = list(result.keys())
+        for name in columns:
+            chunks[name] = []
+        for partition in result.partitions():
+            for name, values in zip(columns, zip(*partition)):
+                chunks[name].append(_to_series(values, dtypes.get(name)))
+
+    # Concatenate one column at a time so peak memory stays near one copy of the frame
+    frame = {}
+    for name in columns:
+        parts = chunks.pop(name) or [_to_series((), dtypes.get(name))]
+        frame[name] = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+    return pd.DataFrame(frame, columns=columns, copy=False)
+
+
+def iter_columns(
+    engine,
+    query,
+    dtypes: Optional[Dict[str, Optional[str]]] = None,
+    chunk_rows: int = STREAM_CHUNK_ROWS
+) -> Iterator[pd.DataFrame]:
+    """Like read_columns, but yield each chunk of chunk_rows rows as its own DataFrame."""
+    dtypes = dtypes or {}
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_rows).execute(query)
+        columns = list(result.keys())
+        for partition in result.partitions():
+            yield pd.DataFrame(
+                {name: _to_series(values, dtypes.get(name)) for name, values in zip(columns, zip(*partition))},
+                columns=columns,
+                copy=False,
+            )
+
+
+def project_columns(table_columns: Dict[str, tuple], columns: Optional[Sequence[str]]):
+    """
+    Labeled select columns and read_columns dtypes for columns (every column
+    when None) of a table map from rec_event_columns(), video_columns() etc.,
+    which map each name to (SQL column, dtype).
+    """
+    names = list(columns) if columns is not None else list(table_columns)
+    unknown = set(names) - set(table_columns)
+    if unknown:
+        raise ValueError(f"Unknown columns: {sorted(unknown)}")
+    return [table_columns[name][0].label(name) for name in names], {name: table_columns[name][1] for name in names}
+
+
+def rec_event_columns() -> Dict[str, tuple]:
+    from app.models.rec_event import RecEvent
+
+    return {
+        'id': (RecEvent.id, 'int64'),
+        # Cast in SQL so the driver never builds uuid.UUID objects
+        'run_id': (cast(RecEvent.run_id, Text), None),
+        'iteration': (RecEvent.iteration, 'int32'),
+        'source_video_id': (RecEvent.source_video_id, None),
+        'video_id': (RecEvent.video_id, None),
+        'position': (RecEvent.position, 'Int32'),
+        'collected_at': (RecEvent.collected_at, 'datetime'),
+    }
+
+
+def video_columns() -> Dict[str, tuple]:
+    from app.models.video import Video
+
+    return {
+        'video_id': (Video.video_id, None),
+        'title': (Video.title, None),
+        'description': (Video.description, None),
+        'iteration': (Video.iteration, 'int32'),
+        'channel_id': (Video.channel_id, None),
+        'channel_title': (Video.channel_title, None),
+        'tags': (Video.tags, None),
+        'topic_categories': (Video.topic_categories, None),
+        'category_id': (Video.category_id, 'Int32'),
+        'published_at': (Video.published_at, 'datetime'),
+        'language': (Video.language, None),
+        'duration_iso': (Video.duration_iso, None),
+        'view_count': (Video.view_count, 'Int64'),
+        'like_count': (Video.like_count, 'Int64'),
+        'comment_count': (Video.comment_count, 'Int64'),
+        'metadata_refreshed_at': (Video.metadata_refreshed_at, 'datetime'),
+    }
+
+
+def channel_columns() -> Dict[str, tuple]:
+    from app.models.channel import Channel
+
+    return {
+        'channel_id': (Channel.channel_id, None),
+        'title': (Channel.title, None),
+        'description': (Channel.description, None),
+        'topic_categories': (Channel.topic_categories, None),
+        'country': (Channel.country, None),
+    }
+
+
+def category_columns() -> Dict[str, tuple]:
+    from app.models.category import Category
+
+    return {
+        'id': (Category.id, 'int32'),
+        'name': (Category.name, None),
+    }
+
+
+def video_label_columns() -> Dict[str, tuple]:
+    from app.models.video_label import VideoLabel
+
+    return {
+        'video_id': (VideoLabel.video_id, None),
+        **{name: (getattr(VideoLabel, name), 'bool') for name in (
+            'signal_category', 'signal_topic', 'signal_channel_topic',
+            'signal_title', 'signal_description', 'signal_tags',
+        )},
+        'signal_count': (VideoLabel.signal_count, 'int16'),
+        'config_hash': (VideoLabel.config_hash, None),
+        'labeled_at': (VideoLabel.labeled_at, 'datetime'),
+    }
+
+
 def load_rec_events(
     engine=None,
     run_id: Optional[str] = None,
-    iteration: Optional[int] = None
+    iteration: Optional[int] = None,
+    columns: Optional[Sequence[str]] = None,
+    newer_than_id: Optional[int] = None,
+    collected_since: Optional[datetime] = None
 ) -> pd.DataFrame:
+    """
+    Load recommendation events. With newer_than_id and/or collected_since,
+    only rows past either watermark are returned (for incremental loads).
+    """
+    from app.models.rec_event import RecEvent
+
     if engine is None:
         engine = create_engine(get_database_url())
 
-    query = select(RecEvent)
+    selected, dtypes = project_columns(rec_event_columns(), columns)
+    query = select(*selected)
 
     if run_id:
         query = query.where(RecEvent.run_id == run_id)
     if iteration is not None:
         query = query.where(RecEvent.iteration == iteration)
 
-    with Session(engine) as session:
-        result = session.execute(query)
-        events = result.scalars().all()
+    watermarks = []
+    if newer_than_id is not None:
+        watermarks.append(RecEvent.id > newer_than_id)
+    if collected_since is not None:
+        watermarks.append(RecEvent.collected_at >= collected_since)
+    if watermarks:
+        query = query.where(or_(*watermarks))
 
-    data = [{
-        'id': e.id,
-        'run_id': str(e.run_id),
-        'iteration': e.iteration,
-        'source_video_id': e.source_video_id,
-        'video_id': e.video_id,
-        'position': e.position,
-        'collected_at': e.collected_at
-    } for e in events]
+    return read_columns(engine, query, dtypes)
 
-    return pd.DataFrame(data)
 
+def iter_rec_events(
+    engine=None,
+    columns: Optional[Sequence[str]] = None,
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+    newer_than_id: Optional[int] = None,
+    collected_since: Optional[datetime] = None,
+    order_by_run: bool = False
+) -> Iterator[pd.DataFrame]:
+    """
+    Recommendation events in id order (or by run_id, then id, with
+    order_by_run), chunk_rows at a time. The watermarks work as in
+    load_rec_events.
+    """
+    from app.models.rec_event import RecEvent
 
-def load_videos(engine=None) -> pd.DataFrame:
     if engine is None:
         engine = create_engine(get_database_url())
 
-    with Session(engine) as session:
-        result = session.execute(select(Video))
-        videos = result.scalars().all()
-
-    data = [{
-        'video_id': v.video_id,
-        'title': v.title,
-        'description': v.description,
-        'iteration': v.iteration,
-        'channel_id': v.channel_id,
-        'channel_title': v.channel_title,
-        'tags': v.tags,
-        'topic_categories': v.topic_categories,
-        'category_id': v.category_id,
-        'published_at': v.published_at,
-        'language': v.language,
-        'duration_iso': v.duration_iso,
-        'view_count': v.view_count,
-        'like_count': v.like_count,
-        'comment_count': v.comment_count
-    } for v in videos]
-
-    return pd.DataFrame(data)
-
-
-def load_channels(engine=None) -> pd.DataFrame:
+    selected, dtypes = project_columns(rec_event_columns(), columns)
+    order = (RecEvent.run_id, RecEvent.id) if order_by_run else (RecEvent.id,)
+    query = select(*selected).order_by(*order)
+    watermarks = []
+    if newer_than_id is not None:
+        watermarks.append(RecEvent.id > newer_than_id)
+    if collected_since is not None:
+        watermarks.append(RecEvent.collected_at >= collected_since)
+    if watermarks:
+        query = query.where(or_(*watermarks))
+    yield from iter_columns(engine, query, dtypes, chunk_rows)
+
+
+def _read_by_ids(engine, table_columns: Dict[str, tuple], key: str, ids, columns, where=None) -> pd.DataFrame:
+    selected, dtypes = project_columns(table_columns, columns)
+    query = select(*selected)
+    if where is not None:
+        query = query.where(where)
+    if ids is None:
+        return read_columns(engine, query, dtypes)
+
+    # Batched so large ID lists stay under driver parameter limits
+    ids = sorted(set(ids))
+    key_column = table_columns[key][0]
+    frames = [
+        read_columns(engine, query.where(key_column.in_(ids[i:i + ID_BATCH_SIZE])), dtypes)
+        for i in range(0, len(ids), ID_BATCH_SIZE)
+    ] or [read_columns(engine, query.where(false()), dtypes)]
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def load_videos(
+    engine=None,
+    columns: Optional[Sequence[str]] = None,
+    video_ids: Optional[Iterable[str]] = None,
+    refreshed_after: Optional[datetime] = None
+) -> pd.DataFrame:
+    """Load videos, optionally only video_ids and/or those whose metadata was refreshed after refreshed_after."""
     if engine is None:
         engine = create_engine(get_database_url())
 
-    with Session(engine) as session:
-        result = session.execute(select(Channel))
-        channels = result.scalars().all()
-
-    data = [{
-        'channel_id': c.channel_id,
-        'title': c.title,
-        'description': c.description,
-        'topic_categories': c.topic_categories,
-        'country': c.country
-    } for c in channels]
+    table_columns = video_columns()
+    where = table_columns['metadata_refreshed_at'][0] > refreshed_after if refreshed_after is not None else None
+    return _read_by_ids(engine, table_columns, 'video_id', video_ids, columns, where)
 
-    return pd.DataFrame(data)
 
-
-def load_categories(engine=None) -> pd.DataFrame:
+def load_channels(
+    engine=None,
+    columns: Optional[Sequence[str]] = None,
+    channel_ids: Optional[Iterable[str]] = None
+) -> pd.DataFrame:
     if engine is None:
         engine = create_engine(get_database_url())
 
-    with Session(engine) as session:
-        result = session.execute(select(Category))
-        categories = result.scalars().all()
-
-    data = [{
-        'id': c.id,
-        'name': c.name
-    } for c in categories]
+    return _read_by_ids(engine, channel_columns(), 'channel_id', channel_ids, columns)
 
-    return pd.DataFrame(data)
 
-
-def load_full_dataset(engine=None) -> pd.DataFrame:
+def load_categories(engine=None) -> pd.DataFrame:
     if engine is None:
         engine = create_engine(get_database_url())
 
-    logger.info("Loading recommendation events...")
-    rec_events = load_rec_events(engine)
-
-    logger.info("Loading videos...")
-    videos = load_videos(engine)
-
-    logger.info("Loading channels...")
-    channels = load_channels(engine)
+    selected, dtypes = project_columns(category_columns(), None)
+    return read_columns(engine, select(*selected), dtypes)
 
-    logger.info("Loading categories...")
-    categories = load_categories(engine)
 
-    logger.info("Merging data...")
+def merge_dataset(
+    rec_events: pd.DataFrame,
+    videos: pd.DataFrame,
+    channels: pd.DataFrame,
+    categories: pd.DataFrame
+) -> pd.DataFrame:
+    """Join events with their video, channel and category rows (one row per event)."""
     df = rec_events.merge(
         videos,
         on='video_id',
@@ -165,40 +345,87 @@ def load_full_dataset(engine=None) -> pd.DataFrame:
     if 'name' in df.columns:
         df.rename(columns={'name': 'category_name'}, inplace=True)
 
-    logger.info(f"Loaded {len(df)} recommendation events")
-    logger.info(f"Unique videos: {df['video_id'].nunique()}")
-    logger.info(f"Unique channels: {df['channel_id'].nunique()}")
-    logger.info(f"Run IDs: {df['run_id'].nunique()}")
-
     return df
 
 
-def save_labeled_dataset(df: pd.DataFrame, min_signals: int = 2):
-    cache_file = CACHE_DIR / f"labeled_dataset_min{min_signals}.parquet"
-    df.to_parquet(cache_file, index=False)
-    logger.info(f"✓ Cached labeled dataset to: {cache_file}")
-    return cache_file
+def frame_memory_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 2**20
 
 
-def load_labeled_dataset(min_signals: int = 2, max_age_hours: int = 24) -> Optional[pd.DataFrame]:
-    cache_file = CACHE_DIR / f"labeled_dataset_min{min_signals}.parquet"
+def _downcast(values: pd.Series, dtype: str) -> pd.Series:
+    if dtype.islower() and values.hasnans:
+        return values
+    info = np.iinfo(dtype.lower())
+    present = values.dropna()
+    if present.empty or (present.min() >= info.min and present.max() <= info.max):
+        return values.astype(dtype)
+    return values
 
-    if not cache_file.exists():
-        return None
 
-    import time
-    cache_age_seconds = time.time() - cache_file.stat().st_mtime
-    cache_age_hours = cache_age_seconds / 3600
+def _to_arrow_list(values: pd.Series) -> pd.Series:
+    import pyarrow as pa
 
-    if cache_age_hours > max_age_hours:
-        logger.warning(f"Cache is {cache_age_hours:.1f} hours old (max: {max_age_hours}h), reloading from database...")
-        return None
+    if isinstance(values.dtype, pd.ArrowDtype):
+        return values
+    items = [list(value) if isinstance(value, (list, tuple, np.ndarray)) else None for value in values]
+    list_type = pa.list_(pa.string())
+    return pd.Series(pa.array(items, type=list_type), index=values.index, dtype=pd.ArrowDtype(list_type))
 
-    logger.info(f"✓ Loading labeled dataset from cache ({cache_age_hours:.1f}h old)...")
-    df = pd.read_parquet(cache_file)
-    logger.info(f"  Loaded {len(df):,} recommendation events")
-    logger.info(f"  Political: {df['is_political'].sum():,} ({df['is_political'].mean()*100:.1f}%)")
-    return df
+
+def compact_dataset(df: pd.DataFrame, drop_text: bool = True) -> pd.DataFrame:
+    """
+    Memory-compact copy of a merged (and optionally labeled) dataset: IDs and
+    other per-video/channel/run strings become categoricals, small integers
+    are downcast, and tag/topic lists become Arrow list columns. With
+    drop_text, TEXT_COLUMNS are left out entirely; they are only needed to
+    label, and the cache and load_videos still have them.
+    """
+    columns = {}
+    for name in df.columns:
+        if drop_text and name in TEXT_COLUMNS:
+            continue
+        values = df[name]
+        if name in CATEGORICAL_COLUMNS:
+            values = values.astype('category')
+        elif name in INTEGER_DTYPES:
+            values = _downcast(values, INTEGER_DTYPES[name])
+        elif name in LIST_COLUMNS:
+            values = _to_arrow_list(values)
+        columns[name] = values
+    compact = pd.DataFrame(columns, copy=False)
+
+    logger.info(
+        f"Compacted {len(df):,} events from {frame_memory_mb(df):,.0f} MB to {frame_memory_mb(compact):,.0f} MB"
+    )
+    return compact
+
+
+def load_full_dataset(engine=None, compact: bool = False) -> pd.DataFrame:
+    if engine is None:
+        engine = create_engine(get_database_url())
+
+    logger.info("Loading recommendation events...")
+    rec_events = load_rec_events(engine)
+
+    logger.info("Loading videos...")
+    videos = load_videos(engine)
+
+    logger.info("Loading channels...")
+    channels = load_channels(engine)
+
+    logger.info("Loading categories...")
+    categories = load_categories(engine)
+
+    logger.info("Merging data...")
+    df = merge_dataset(rec_events, videos, channels, categories)
+
+    logger.info(f"Loaded {len(df)} recommendation events")
+    logger.info(f"Unique videos: {df['video_id'].nunique()}")
+    logger.info(f"Unique channels: {df['channel_id'].nunique()}")
+    logger.info(f"Run IDs: {df['run_id'].nunique()}")
+
+    # Text stays: the full dataset is what gets labeled
+    return compact_dataset(df, drop_text=False) if compact else df
 
 
 def clear_cache():
@@ -209,23 +436,26 @@ def clear_cache():
         logger.info("✓ Cache cleared")
 
 
-def get_labeled_dataset(min_signals: int = 2, max_age_hours: int = 24) -> pd.DataFrame:
+def get_labeled_dataset(
+    min_signals: int = 2,
+    max_age_hours: int = 24,
+    engine=None,
+    compact: bool = True
+) -> pd.DataFrame:
     """
-    Get labeled dataset - loads from cache if available, otherwise loads from DB and labels.s
+    Get labeled dataset from the incremental cache (see analysis.labeled_cache).
+    Only events newer than the cache watermark are loaded, and only videos the
+    current labeling configuration hasn't labeled yet are labeled. With
+    compact (the default) the frame is built by compact_dataset, without TEXT_COLUMNS.
     """
-    df = load_labeled_dataset(min_signals=min_signals, max_age_hours=max_age_hours)
-
-    if df is not None:
-        return df
-
-    logger.info("Loading from database and applying political labeling...")
-    from analysis.political_labeling import label_political_content
-
-    df = load_full_dataset()
-    df = label_political_content(df, min_signals=min_signals)
-
-    save_labeled_dataset(df, min_signals=min_signals)
+    from analysis.labeled_cache import get_cached_labeled_dataset
 
+    df = get_cached_labeled_dataset(
+        min_signals=min_signals, max_age_hours=max_age_hours, engine=engine, compact=compact
+    )
+    logger.info(f"  Loaded {len(df):,} recommendation events")
+    if len(df):
+        logger.info(f"  Political: {df['is_political'].sum():,} ({df['is_political'].mean()*100:.1f}%)")
     return df
 
 
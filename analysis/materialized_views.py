@@ -0,0 +1,297 @@
+import pandas as pd
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from analysis.load_data import get_database_url, load_channels, load_videos
+from analysis.political_labeling import (
+    LABEL_WORKERS,
+    SIGNAL_COLUMNS,
+    compute_signals_parallel,
+    get_keywords_by_language,
+    get_political_keywords,
+    labeling_config_hash,
+)
+from app.models.video import Video
+from app.models.video_label import VideoLabel
+
+logger = logging.getLogger(__name__)
+
+# Created by alembic revision 5c1e7d9a2b44
+EXPOSURE_VIEWS = [
+    'mv_exposure_overall',
+    'mv_exposure_by_iteration',
+    'mv_exposure_by_position',
+    'mv_exposure_by_run',
+    'mv_exposure_by_video',
+    'mv_exposure_by_channel',
+]
+
+LABEL_UPSERT_CHUNK_SIZE = 5000
+# Videos loaded and labeled per round trip by sync_video_labels
+LABEL_SYNC_BATCH_SIZE = 50_000
+_LABEL_VIDEO_COLUMNS = [
+    'video_id', 'title', 'description', 'tags', 'topic_categories', 'category_id', 'channel_id', 'language',
+]
+
+
+def persist_video_labels(
+    df: pd.DataFrame,
+    engine=None,
+    config_hash: Optional[str] = None,
+    labeled_at: Optional[datetime] = None
+) -> int:
+    """
+    Upsert one row of signals, signal_count and config_hash per video from a
+    labeled dataset into video_labels. labeled_at defaults to the database's now().
+    """
+    if engine is None:
+        engine = create_engine(get_database_url())
+    if config_hash is None:
+        config_hash = labeling_config_hash()
+
+    labels = df[['video_id'] + SIGNAL_COLUMNS + ['signal_count']]
+    labels = labels.dropna(subset=['video_id']).drop_duplicates('video_id')
+    rows = [
+        {
+            'video_id': video_id,
+            **{column: bool(value) for column, value in zip(SIGNAL_COLUMNS, signals)},
+            'signal_count': int(signal_count),
+            'config_hash': config_hash,
+        }
+        for video_id, *signals, signal_count in labels.itertuples(index=False)
+    ]
+    if labeled_at is not None:
+        for row in rows:
+            row['labeled_at'] = labeled_at
+
+    with engine.begin() as conn:
+        for i in range(0, len(rows), LABEL_UPSERT_CHUNK_SIZE):
+            stmt = insert(VideoLabel).values(rows[i:i + LABEL_UPSERT_CHUNK_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[VideoLabel.video_id],
+                set_={
+                    **{column: stmt.excluded[column] for column in SIGNAL_COLUMNS + ['signal_count', 'config_hash']},
+                    'labeled_at': stmt.excluded.labeled_at if labeled_at is not None else text('now()'),
+                },
+            )
+            conn.execute(stmt)
+
+    logger.info(f"Persisted labels for {len(rows):,} videos")
+    return len(rows)
+
+
+def stale_video_ids(conn, config_hash: str) -> List[str]:
+    """
+    Videos without a label from config_hash: never labeled, labeled under
+    another configuration, or whose metadata was refreshed after labeling.
+    """
+    stmt = (
+        select(Video.video_id)
+        .outerjoin(VideoLabel, VideoLabel.video_id == Video.video_id)
+        .where(
+            (VideoLabel.video_id.is_(None))
+            | VideoLabel.config_hash.is_distinct_from(config_hash)
+            | (Video.metadata_refreshed_at > VideoLabel.labeled_at)
+        )
+        .order_by(Video.video_id)
+    )
+    return list(conn.execute(stmt).scalars())
+
+
+def _videos_to_label(engine, video_ids: List[str]) -> pd.DataFrame:
+    videos = load_videos(engine, columns=_LABEL_VIDEO_COLUMNS, video_ids=video_ids)
+    channels = load_channels(
+        engine, columns=['channel_id', 'topic_categories'], channel_ids=videos['channel_id'].dropna().unique()
+    )
+    return videos.merge(channels, on='channel_id', how='left', suffixes=('', '_channel'))
+
+
+def sync_video_labels(engine=None, batch_size: int = LABEL_SYNC_BATCH_SIZE, workers: int = LABEL_WORKERS) -> int:
+    """
+    Label the videos whose row in video_labels is missing or stale (see
+    stale_video_ids) and upsert them, batch_size videos at a time, so only
+    new or changed videos are read and labeled. Returns the number labeled.
+
+    labeled_at is the database time at which the sync started, so a metadata
+    refresh that lands while a batch is being labeled is picked up next time.
+    Changes to a channel's topics alone don't mark its videos stale.
+    """
+    if engine is None:
+        engine = create_engine(get_database_url())
+
+    config_hash = labeling_config_hash()
+    with engine.connect() as conn:
+        started_at = conn.execute(select(func.now())).scalar_one()
+        video_ids = stale_video_ids(conn, config_hash)
+    logger.info(f"{len(video_ids):,} videos need labels for labeling config {config_hash}")
+
+    keywords, keywords_by_language = get_political_keywords(), get_keywords_by_language()
+    for i in range(0, len(video_ids), batch_size):
+        videos = _videos_to_label(engine, video_ids[i:i + batch_size])
+        signals = compute_signals_parallel(videos, keywords, keywords_by_language, workers=workers)
+        labels = pd.concat([videos[['video_id']], signals[SIGNAL_COLUMNS]], axis=1)
+        labels['signal_count'] = labels[SIGNAL_COLUMNS].sum(axis=1)
+        persist_video_labels(labels, engine=engine, config_hash=config_hash, labeled_at=started_at)
+
+    return len(video_ids)
+
+
+def refresh_exposure_views(engine=None, concurrently: bool = True):
+    """
+    Refresh the exposure materialized views.
+
+    CONCURRENTLY keeps the views readable while they rebuild. Postgres only
+    allows it on views that are already populated, so unpopulated views fall
+    back to a blocking refresh.
+    """
+    if engine is None:
+        engine = create_engine(get_database_url())
+
+    with engine.connect() as conn:
+        populated = dict(conn.execute(
+            text("SELECT matviewname, ispopulated FROM pg_matviews WHERE matviewname = ANY(:names)"),
+            {'names': EXPOSURE_VIEWS},
+        ).all())
+
+    for name in EXPOSURE_VIEWS:
+        if name not in populated:
+            logger.warning(f"Materialized view {name} does not exist, run 'alembic upgrade head'")
+            continue
+        mode = "CONCURRENTLY " if concurrently and populated[name] else ""
+        with engine.begin() as conn:
+            conn.execute(text(f"REFRESH MATERIALIZED VIEW {mode}{name}"))
+        logger.info(f"Refreshed {name}{' (concurrently)' if mode else ''}")
+
+
+def _read_view(conn, name: str) -> pd.DataFrame:
+    return pd.read_sql(text(f"SELECT * FROM {name}"), conn)
+
+
+def _rollup(view: pd.DataFrame, key: str, min_signals: int) -> pd.DataFrame:
+    view = view.assign(
+        political_count=view['recommendations'].where(view['signal_count'] >= min_signals, 0)
+    )
+    stats = view.groupby(key).agg(
+        political_count=('political_count', 'sum'),
+        total_recommendations=('recommendations', 'sum'),
+        unique_videos=('unique_videos', 'sum'),
+    ).reset_index()
+    stats.insert(2, 'political_rate', stats['political_count'] / stats['total_recommendations'])
+    stats['political_percentage'] = stats['political_rate'] * 100
+    return stats
+
+
+def _weighted_median(values: pd.Series, weights: pd.Series) -> float:
+    order = values.argsort()
+    values, weights = values.iloc[order].to_numpy(), weights.iloc[order].to_numpy()
+    cumulative = weights.cumsum()
+    total = cumulative[-1]
+    lower = values[(cumulative >= total / 2).argmax()]
+    if total % 2:
+        return float(lower)
+    upper = values[(cumulative >= total / 2 + 1).argmax()]
+    return (lower + upper) / 2
+
+
+def load_exposure_summary_from_views(
+    engine=None,
+    min_signals: int = 2,
+    max_position: int = 20,
+    top_n: int = 20
+) -> Dict:
+    """
+    Build the same summary dict as compute_exposure_summary from the
+    materialized views, without pulling rec_events into pandas.
+
+    Labels come from video_labels, so custom labels added with
+    add_custom_political_labels are not reflected here.
+    """
+    if engine is None:
+        engine = create_engine(get_database_url())
+
+    with engine.connect() as conn:
+        views = {name: _read_view(conn, name) for name in EXPOSURE_VIEWS}
+
+    overall_view = views['mv_exposure_overall']
+    is_political = overall_view['signal_count'] >= min_signals
+    total_recs = int(overall_view['recommendations'].sum())
+    political_recs = int(overall_view.loc[is_political, 'recommendations'].sum())
+
+    iteration_view = views['mv_exposure_by_iteration']
+    political_depth = iteration_view[iteration_view['signal_count'] >= min_signals]
+    political_depth = political_depth.groupby('iteration')['recommendations'].sum().reset_index()
+    has_depth = political_depth['recommendations'].sum() > 0
+
+    overall = {
+        'total_recommendations': total_recs,
+        'political_recommendations': political_recs,
+        'political_percentage': (political_recs / total_recs * 100) if total_recs > 0 else 0,
+        'unique_videos': int(overall_view['unique_videos'].sum()),
+        'unique_political_videos': int(overall_view.loc[is_political, 'unique_videos'].sum()),
+        'median_political_depth': _weighted_median(
+            political_depth['iteration'], political_depth['recommendations']
+        ) if has_depth else 0,
+        'mean_political_depth': (
+            (political_depth['iteration'] * political_depth['recommendations']).sum()
+            / political_depth['recommendations'].sum()
+        ) if has_depth else 0,
+    }
+
+    by_iteration = _rollup(iteration_view, 'iteration', min_signals)
+
+    position_view = views['mv_exposure_by_position']
+    position_view = position_view[position_view['position'] < max_position]
+    by_position = _rollup(position_view, 'position', min_signals)
+
+    run_view = views['mv_exposure_by_run']
+    by_run = _rollup(run_view, 'run_id', min_signals)
+    max_iteration = run_view.groupby('run_id')['max_iteration'].max().rename('max_iteration')
+    by_run = by_run.merge(max_iteration, left_on='run_id', right_index=True)
+    by_run = by_run[[
+        'run_id', 'political_count', 'political_rate', 'total_recommendations',
+        'unique_videos', 'max_iteration', 'political_percentage'
+    ]].assign(run_id=by_run['run_id'].astype(str))
+
+    video_view = views['mv_exposure_by_video']
+    video_view = video_view[video_view['signal_count'] >= min_signals]
+    top_videos = pd.DataFrame({
+        'video_id': video_view['video_id'],
+        'title': video_view['title'],
+        'channel_title': video_view['channel_title'],
+        'recommendation_count': video_view['recommendations'],
+        'avg_iteration': video_view['iteration_sum'] / video_view['recommendations'],
+        'avg_position': video_view['position_sum'] / video_view['position_count'],
+        'view_count': video_view['view_count'],
+        'category': video_view['category_name'],
+    }).sort_values('recommendation_count', ascending=False).head(top_n)
+
+    channel_view = views['mv_exposure_by_channel']
+    channel_view = channel_view[channel_view['signal_count'] >= min_signals]
+    top_channels = channel_view.groupby(['channel_id', 'channel_title']).agg(
+        unique_videos=('unique_videos', 'sum'),
+        total_recommendations=('recommendations', 'sum'),
+        iteration_sum=('iteration_sum', 'sum'),
+    ).reset_index()
+    top_channels['avg_iteration'] = top_channels['iteration_sum'] / top_channels['total_recommendations']
+    top_channels = top_channels.drop(columns='iteration_sum')
+    top_channels = top_channels.sort_values('total_recommendations', ascending=False).head(top_n)
+
+    return {
+        'overall': overall,
+        'by_iteration': by_iteration,
+        'by_position': by_position,
+        'by_run': by_run,
+        'top_videos': top_videos.reset_index(drop=True),
+        'top_channels': top_channels.reset_index(drop=True),
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    engine = create_engine(get_database_url())
+    sync_video_labels(engine)
+    refresh_exposure_views(engine)
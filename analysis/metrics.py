@@ -1,6 +1,7 @@
+import numpy as np
 import pandas as pd
 import logging
-from typing import Dict
+from typing import Dict, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -128,18 +129,200 @@ def compute_top_political_channels(df: pd.DataFrame, top_n: int = 20) -> pd.Data
     return channel_counts
 
 
-def compute_exposure_summary(df: pd.DataFrame) -> Dict:
-    logger.info("Computing exposure metrics...\n")
+def _codes(keys: pd.Series) -> tuple:
+    """
+    Integer code per row (-1 where the key is missing) and the sorted groups
+    the codes index, without hashing where the keys already are codes: a
+    categorical's own codes, or offsets into a small integer range. Groups
+    may include values no row has; _group_stats drops them.
+    """
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        return keys.cat.codes.to_numpy(), keys.cat.categories
+    if pd.api.types.is_integer_dtype(keys.dtype) and len(keys) and not keys.hasnans:
+        low, high = int(keys.min()), int(keys.max())
+        if high - low < len(keys):
+            values = keys.to_numpy(dtype=getattr(keys.dtype, 'numpy_dtype', keys.dtype))
+            return np.subtract(values, low, dtype=np.int64), pd.Index(np.arange(low, high + 1)).astype(keys.dtype)
+    return pd.factorize(keys, sort=True)
+
+
+def _distinct_counts(codes: np.ndarray, n_groups: int, video_codes: np.ndarray, n_videos: int) -> np.ndarray:
+    """Number of distinct videos per group code."""
+    pairs = codes.astype(np.int64) * n_videos + video_codes
+    if n_groups * n_videos <= 8 * len(pairs):
+        # A group x video bitmap costs no more than the pair keys themselves
+        seen = np.zeros(n_groups * n_videos, dtype=bool)
+        seen[pairs] = True
+        return seen.reshape(n_groups, n_videos).sum(axis=1)
+    # Sorted in place, so distinct pairs cost no memory beyond the keys
+    pairs.sort()
+    distinct = np.ones(len(pairs), dtype=bool)
+    np.not_equal(pairs[1:], pairs[:-1], out=distinct[1:])
+    return np.bincount(pairs[distinct] // n_videos, minlength=n_groups)
+
+
+def _group_stats(keys: pd.Series, political: np.ndarray, video_codes: np.ndarray, n_videos: int, name: str) -> tuple:
+    """
+    Per-group political_count, political_rate, total_recommendations and
+    unique_videos for keys, as the groupby in compute_exposure_by_iteration
+    builds them. Also returns each row's group code and which codes have
+    rows, for further per-group aggregates.
+    """
+    codes, groups = _codes(keys)
+    codes_present = codes
+    present = codes >= 0
+    if not present.all():
+        codes_present, political, video_codes = codes[present], political[present], video_codes[present]
+    n_groups = len(groups)
+    total = np.bincount(codes_present, minlength=n_groups)
+    political_count = np.bincount(codes_present[political], minlength=n_groups)
+    has_video = video_codes >= 0
+    if not has_video.all():
+        codes_present, video_codes = codes_present[has_video], video_codes[has_video]
+    unique_videos = _distinct_counts(codes_present, n_groups, video_codes, n_videos)
+
+    observed = total > 0
+    stats = pd.DataFrame({
+        name: groups[observed],
+        'political_count': political_count[observed],
+        'political_rate': political_count[observed] / total[observed],
+        'total_recommendations': total[observed],
+        'unique_videos': unique_videos[observed],
+    })
+    return stats, codes, observed
+
+
+def summarize_exposure(df: pd.DataFrame, max_position: int = 20, top_n: int = 20) -> Dict:
+    """
+    The compute_exposure_summary dict in one pass over df: every table is
+    built from the same integer video codes (a categorical's own codes need no
+    factorizing), with a single political mask and per-video aggregates
+    shared by the top video and channel tables. Nothing is copied from df.
+    Among videos or channels with equal counts, the top tables keep ID order.
+    """
+    political = df['is_political'].to_numpy(dtype=bool, na_value=False)
+    iteration = df['iteration_rec'].to_numpy(dtype=np.int64)
+    video_codes, video_ids = _codes(df['video_id'])
+    n_videos = max(len(video_ids), 1)
+
+    by_iteration, _, _ = _group_stats(df['iteration_rec'], political, video_codes, n_videos, 'iteration')
+
+    position = df['position'].to_numpy(dtype=np.float64, na_value=np.nan)
+    in_range = np.flatnonzero(position < max_position)
+    by_position, _, _ = _group_stats(
+        df['position'].take(in_range), political[in_range], video_codes[in_range], n_videos, 'position'
+    )
+
+    by_run, run_codes, observed = _group_stats(df['run_id'], political, video_codes, n_videos, 'run_id')
+    has_run = run_codes >= 0
+    max_iteration = np.full(len(observed), np.iinfo(np.int64).min)
+    np.maximum.at(max_iteration, run_codes[has_run], iteration[has_run])
+    by_run['max_iteration'] = max_iteration[observed]
+    for stats in (by_iteration, by_position, by_run):
+        stats['political_percentage'] = stats['political_rate'] * 100
+
+    # Per-video aggregates over political events, shared by both top tables
+    rows = np.flatnonzero(political & (video_codes >= 0))
+    codes = video_codes[rows]
+    recommendations = np.bincount(codes, minlength=n_videos)
+    seen = np.flatnonzero(recommendations)
+    recommendations = recommendations[seen]
+    first = np.full(n_videos, len(rows))
+    np.minimum.at(first, codes, np.arange(len(rows)))
+    first = rows[first[seen]]
+    iteration_sum = np.bincount(codes, weights=iteration[rows], minlength=n_videos)[seen]
+    has_position = ~np.isnan(position[rows])
+    position_sum = np.bincount(codes[has_position], weights=position[rows][has_position], minlength=n_videos)[seen]
+    position_count = np.bincount(codes[has_position], minlength=n_videos)[seen]
+
+    def at_first(column: str) -> np.ndarray:
+        return df[column].take(first).to_numpy()
+
+    videos = pd.DataFrame({
+        'video_id': video_ids.take(seen),
+        'title': at_first('title'),
+        'channel_id': at_first('channel_id'),
+        'channel_title': at_first('channel_title'),
+        'recommendation_count': recommendations,
+        'avg_iteration': iteration_sum / recommendations,
+        'avg_position': position_sum / np.where(position_count > 0, position_count, np.nan),
+        'view_count': at_first('view_count'),
+        'category': at_first('category_name'),
+        'iteration_sum': iteration_sum,
+    })
+
+    top_videos = videos[videos['title'].notna() & videos['channel_title'].notna()]
+    top_videos = top_videos.sort_values('recommendation_count', ascending=False, kind='stable').head(top_n)
+    top_videos = top_videos[[
+        'video_id', 'title', 'channel_title', 'recommendation_count',
+        'avg_iteration', 'avg_position', 'view_count', 'category'
+    ]]
+
+    top_channels = videos.groupby(['channel_id', 'channel_title'], observed=True).agg(
+        unique_videos=('video_id', 'size'),
+        total_recommendations=('recommendation_count', 'sum'),
+        iteration_sum=('iteration_sum', 'sum'),
+    ).reset_index()
+    top_channels['avg_iteration'] = top_channels.pop('iteration_sum') / top_channels['total_recommendations']
+    top_channels = top_channels.sort_values('total_recommendations', ascending=False, kind='stable').head(top_n)
+
+    political_iterations = iteration[political]
+    total_recs = len(df)
+    political_recs = len(political_iterations)
+    overall = {
+        'total_recommendations': total_recs,
+        'political_recommendations': political_recs,
+        'political_percentage': (political_recs / total_recs * 100) if total_recs > 0 else 0,
+        'unique_videos': int(np.count_nonzero(np.bincount(video_codes[video_codes >= 0], minlength=n_videos))),
+        'unique_political_videos': len(seen),
+        'median_political_depth': np.median(political_iterations) if political_recs > 0 else 0,
+        'mean_political_depth': political_iterations.mean() if political_recs > 0 else 0,
+    }
 
-    summary = {
-        'overall': compute_overall_exposure(df),
-        'by_iteration': compute_exposure_by_iteration(df),
-        'by_position': compute_exposure_by_position(df),
-        'by_run': compute_exposure_by_run(df),
-        'top_videos': compute_top_political_videos(df),
-        'top_channels': compute_top_political_channels(df)
+    return {
+        'overall': overall,
+        'by_iteration': by_iteration,
+        'by_position': by_position,
+        'by_run': by_run,
+        'top_videos': top_videos.reset_index(drop=True),
+        'top_channels': top_channels.reset_index(drop=True),
     }
 
+
+def compute_exposure_summary(
+    df: Optional[pd.DataFrame] = None,
+    engine=None,
+    min_signals: int = 2,
+    snapshot_dir=None
+) -> Dict:
+    """
+    Compute exposure metrics from a labeled dataset.
+
+    Without a dataframe the summary is read from the exposure materialized
+    views instead (see analysis.materialized_views), using min_signals as the
+    political threshold; with snapshot_dir it is computed by DuckDB over that
+    Parquet snapshot (see analysis.duckdb_backend). For the same summary
+    computed from rec_events in bounded memory, see analysis.streaming.
+    """
+    if df is None and snapshot_dir is not None:
+        from analysis.duckdb_backend import compute_duckdb_exposure_summary
+
+        logger.info("Computing exposure metrics with DuckDB over the Parquet snapshot...\n")
+        summary = compute_duckdb_exposure_summary(snapshot_dir, min_signals=min_signals)
+    elif df is None:
+        from analysis.materialized_views import load_exposure_summary_from_views
+
+        logger.info("Reading exposure metrics from materialized views...\n")
+        summary = load_exposure_summary_from_views(engine, min_signals=min_signals)
+    else:
+        logger.info("Computing exposure metrics...\n")
+        summary = summarize_exposure(df)
+
+    log_exposure_summary(summary)
+    return summary
+
+
+def log_exposure_summary(summary: Dict):
     logger.info("=" * 60)
     logger.info("OVERALL EXPOSURE METRICS")
     logger.info("=" * 60)
@@ -158,5 +341,3 @@ def compute_exposure_summary(df: pd.DataFrame) -> Dict:
     logger.info("TOP 10 POLITICAL VIDEOS")
     logger.info("=" * 60)
     logger.info(f"\n{summary['top_videos'].head(10)[['title', 'recommendation_count', 'channel_title']].to_string(index=False)}")
-
-    return summary
@@ -1,18 +1,42 @@
+import numpy as np
 import pandas as pd
+import hashlib
+import json
 import logging
-import re
+import multiprocessing
+import os
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Set
+from typing import Dict, List, Optional, Set
+
+from analysis import keyword_matcher
+from analysis.keyword_matcher import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
 _POLITICAL_KEYWORDS = None
-
-
-def load_political_keywords_from_xml(xml_path: str = None) -> Set[str]:
+_KEYWORDS_BY_LANGUAGE = None
+# id(keywords) -> (keywords, matcher); holding keywords keeps the id from being reused
+_KEYWORD_MATCHERS: Dict[int, tuple] = {}
+_MAX_KEYWORD_MATCHERS = 64
+# Keywords and (keywords_by_language) of the labeling run, set in each worker process
+_WORKER_KEYWORDS = None
+
+# Processes used to label unique videos; 1 labels in this process
+LABEL_WORKERS = int(os.getenv("ANALYSIS_LABEL_WORKERS", "1"))
+# Videos per chunk sent to a worker; bounds the memory of each task
+LABEL_CHUNK_ROWS = int(os.getenv("ANALYSIS_LABEL_CHUNK_ROWS", "20000"))
+# Only what compute_signals reads is shipped to workers
+_SIGNAL_INPUT_COLUMNS = ['category_id', 'topic_categories', 'topic_categories_channel', 'title', 'description', 'tags',
+                         'language']
+# videos.language values that name the same keyword set
+LANGUAGE_ALIASES = {'nb': 'no', 'nn': 'no'}
+
+
+def load_political_keywords_by_language(xml_path: str = None) -> Dict[str, Set[str]]:
     """
-    Load political keywords from XML file.
+    Load political keywords from XML file, keyed by each <Language> block's code.
     """
     if xml_path is None:
         xml_path = Path(__file__).parent / 'politcal_keywords.xml'
@@ -20,15 +44,24 @@ def load_political_keywords_from_xml(xml_path: str = None) -> Set[str]:
     tree = ET.parse(xml_path)
     root = tree.getroot()
 
-    keywords = set()
+    keywords_by_language = {}
 
     for language in root.findall('Language'):
+        keywords = keywords_by_language.setdefault(language.get('code', '').lower(), set())
         for keyword_elem in language.findall('Keyword'):
             keyword = keyword_elem.text
             if keyword:
                 keywords.add(keyword.lower().strip())
 
-    logger.info(f"Loaded {len(keywords)} political keywords from {xml_path}")
+    return keywords_by_language
+
+
+def load_political_keywords_from_xml(xml_path: str = None) -> Set[str]:
+    """
+    Load political keywords from XML file, all languages combined.
+    """
+    keywords = set().union(*load_political_keywords_by_language(xml_path).values())
+    logger.info(f"Loaded {len(keywords)} political keywords from {xml_path or 'politcal_keywords.xml'}")
     return keywords
 
 
@@ -40,6 +73,22 @@ def get_political_keywords() -> Set[str]:
     return _POLITICAL_KEYWORDS
 
 
+def get_keywords_by_language() -> Dict[str, Set[str]]:
+    """Get political keywords per language code, loading them if not already loaded."""
+    global _KEYWORDS_BY_LANGUAGE
+    if _KEYWORDS_BY_LANGUAGE is None:
+        _KEYWORDS_BY_LANGUAGE = load_political_keywords_by_language()
+    return _KEYWORDS_BY_LANGUAGE
+
+
+def normalize_language(language) -> Optional[str]:
+    """Keyword-set code for a videos.language value ('en-US' -> 'en', 'nb' -> 'no'), or None."""
+    if not isinstance(language, str) or not language:
+        return None
+    code = language.replace('_', '-').split('-')[0].lower()
+    return LANGUAGE_ALIASES.get(code, code)
+
+
 POLITICAL_TOPIC_URLS = {
     'https://en.wikipedia.org/wiki/Politics',
     'https://en.wikipedia.org/wiki/Political_science',
@@ -50,26 +99,50 @@ POLITICAL_TOPIC_URLS = {
 
 POLITICAL_CATEGORY_IDS = {25}
 
+SIGNAL_COLUMNS = ['signal_category', 'signal_topic', 'signal_channel_topic',
+                  'signal_title', 'signal_description', 'signal_tags']
 
-def contains_political_keywords(text: str, keywords: Set[str]) -> bool:
-    if pd.isna(text) or not text:
-        return False
 
-    text_lower = text.lower()
+def labeling_config() -> dict:
+    """Everything the per-video signals depend on: keywords, topic URLs, category IDs and the labeling code."""
+    keywords = sorted(
+        f"{code}:{keyword}" for code, words in get_keywords_by_language().items() for keyword in words
+    )
+    return {
+        'keywords_sha256': hashlib.sha256('\n'.join(keywords).encode('utf-8')).hexdigest(),
+        'keyword_count': len(keywords),
+        'language_aliases': LANGUAGE_ALIASES,
+        'topic_urls': sorted(POLITICAL_TOPIC_URLS),
+        'category_ids': sorted(POLITICAL_CATEGORY_IDS),
+        'code_sha256': hashlib.sha256(
+            Path(__file__).read_bytes() + Path(keyword_matcher.__file__).read_bytes()
+        ).hexdigest(),
+    }
+
 
-    words = set(re.findall(r'\b\w+\b', text_lower))
+def labeling_config_hash(config: dict = None) -> str:
+    """Short content hash of labeling_config(), used to key cached labels."""
+    config = config or labeling_config()
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()[:16]
 
-    for keyword in keywords:
-        if ' ' in keyword:
-            if keyword in text_lower:
-                pattern = r'\b' + re.escape(keyword) + r'\b'
-                if re.search(pattern, text_lower):
-                    return True
-        else:
-            if keyword in words:
-                return True
 
-    return False
+def get_keyword_matcher(keywords: Set[str]) -> KeywordMatcher:
+    """Compiled matcher for keywords, built once per keyword set object."""
+    cached = _KEYWORD_MATCHERS.get(id(keywords))
+    if cached is None or cached[0] is not keywords:
+        if len(_KEYWORD_MATCHERS) >= _MAX_KEYWORD_MATCHERS:
+            _KEYWORD_MATCHERS.clear()
+        cached = _KEYWORD_MATCHERS[id(keywords)] = (keywords, KeywordMatcher(keywords))
+    return cached[1]
+
+
+def find_political_keywords(text, keywords: Set[str]) -> List[str]:
+    """Keywords (single- or multi-word, whole tokens only) that occur in text."""
+    return get_keyword_matcher(keywords).find_all(text)
+
+
+def contains_political_keywords(text: str, keywords: Set[str]) -> bool:
+    return bool(find_political_keywords(text, keywords))
 
 
 def has_political_topic(topic_categories) -> bool:
@@ -92,56 +165,135 @@ def has_political_topic(topic_categories) -> bool:
     return False
 
 
-def label_political_content(df: pd.DataFrame, min_signals: int = 2) -> pd.DataFrame:
-    df = df.copy()
+def _as_text(value) -> str:
+    """Title/description as-is; tag lists (list, tuple or array from Parquet) joined with spaces."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return ' '.join(str(item) for item in value)
+    return ''
 
-    # Get keywords (lazy load)
-    keywords = get_political_keywords()
+
+def compute_signals(
+    videos: pd.DataFrame,
+    keywords: Set[str],
+    keywords_by_language: Optional[Dict[str, Set[str]]] = None
+) -> pd.DataFrame:
+    """
+    The six boolean signals for each row of videos (one row per video), plus
+    matched_keywords: the sorted keywords found in its title, description or tags.
+
+    With keywords_by_language, a video whose language has its own keyword set
+    is only matched against that set; other videos (no language, or one
+    without keywords) are matched against keywords.
+    """
+    signals = pd.DataFrame(index=videos.index)
 
     # Signal 1: Category ID (News & Politics)
-    df['signal_category'] = df['category_id'].isin(POLITICAL_CATEGORY_IDS)
+    signals['signal_category'] = videos['category_id'].isin(POLITICAL_CATEGORY_IDS)
 
     # Signal 2: Topic categories from YouTube API
-    df['signal_topic'] = df['topic_categories'].apply(has_political_topic)
+    signals['signal_topic'] = videos['topic_categories'].apply(has_political_topic)
 
     # Signal 3: Channel topic categories
-    if 'topic_categories_channel' in df.columns:
-        df['signal_channel_topic'] = df['topic_categories_channel'].apply(has_political_topic)
+    if 'topic_categories_channel' in videos.columns:
+        signals['signal_channel_topic'] = videos['topic_categories_channel'].apply(has_political_topic)
     else:
-        df['signal_channel_topic'] = False
+        signals['signal_channel_topic'] = False
 
-    # Signal 4: Keywords in title
-    df['signal_title'] = df['title'].apply(
-        lambda x: contains_political_keywords(x, keywords)
-    )
+    # Signals 4-6: Keywords in title, description and tags
+    fallback = get_keyword_matcher(keywords)
+    if keywords_by_language and 'language' in videos.columns:
+        by_language = {code: get_keyword_matcher(words) for code, words in keywords_by_language.items()}
+        matchers = [by_language.get(normalize_language(language), fallback) for language in videos['language']]
+    else:
+        matchers = [fallback] * len(videos)
+    matched = {}
+    for signal, column in (('signal_title', 'title'), ('signal_description', 'description'), ('signal_tags', 'tags')):
+        matched[signal] = [matcher.find_all(_as_text(value)) for matcher, value in zip(matchers, videos[column])]
+        signals[signal] = [bool(found) for found in matched[signal]]
 
-    # Signal 5: Keywords in description
-    df['signal_description'] = df['description'].apply(
-        lambda x: contains_political_keywords(x, keywords)
-    )
+    signals = signals.astype(bool)
+    # Which keywords fired, so a keyword signal can be explained
+    signals['matched_keywords'] = [
+        sorted(set(title) | set(description) | set(tags))
+        for title, description, tags in zip(*matched.values())
+    ]
+    return signals
 
-    # Signal 6: Keywords in tags
-    def check_tags(tags):
-        if tags is None:
-            return False
-        if isinstance(tags, float):
-            return False
-        if isinstance(tags, list):
-            if len(tags) == 0:
-                return False
-            tags_text = ' '.join(tags)
-        else:
-            tags_text = str(tags)
-            if not tags_text:
-                return False
-        return contains_political_keywords(tags_text, keywords)
-
-    df['signal_tags'] = df['tags'].apply(check_tags)
+
+def _init_label_worker(keywords: Set[str], keywords_by_language: Optional[Dict[str, Set[str]]], matchers: list):
+    # Matchers are built once in the parent and pickled once per worker
+    global _WORKER_KEYWORDS
+    _WORKER_KEYWORDS = (keywords, keywords_by_language)
+    for words, matcher in matchers:
+        _KEYWORD_MATCHERS[id(words)] = (words, matcher)
+
+
+def _compute_signals_chunk(videos: pd.DataFrame) -> pd.DataFrame:
+    return compute_signals(videos, *_WORKER_KEYWORDS)
+
+
+def compute_signals_parallel(videos: pd.DataFrame, keywords: Set[str],
+                             keywords_by_language: Optional[Dict[str, Set[str]]] = None,
+                             workers: int = LABEL_WORKERS, chunk_rows: int = LABEL_CHUNK_ROWS) -> pd.DataFrame:
+    """
+    compute_signals over chunks of chunk_rows videos in worker processes, with
+    the same result as the serial call. At most two chunks per worker are in
+    flight, so memory stays bounded however many videos there are.
+    """
+    if workers <= 1 or len(videos) <= chunk_rows:
+        return compute_signals(videos, keywords, keywords_by_language)
+
+    columns = [column for column in _SIGNAL_INPUT_COLUMNS if column in videos.columns]
+    inputs = videos[columns]
+    starts = range(0, len(videos), chunk_rows)
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_label_worker,
+        initargs=(keywords, keywords_by_language, [
+            (words, get_keyword_matcher(words)) for words in [keywords, *(keywords_by_language or {}).values()]
+        ]),
+    ) as pool:
+        pending = []
+        for start in starts:
+            pending.append(pool.submit(_compute_signals_chunk, inputs.iloc[start:start + chunk_rows]))
+            if len(pending) >= 2 * workers:
+                results.append(pending.pop(0).result())
+        results.extend(future.result() for future in pending)
+    logger.info(f"Labeled {len(videos):,} videos in {len(starts)} chunks across {workers} processes")
+    return pd.concat(results)
+
+
+def label_political_content(df: pd.DataFrame, min_signals: int = 2, workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Add signal_* columns, matched_keywords, signal_count and is_political to df.
+
+    Signals only depend on the video (and its channel), so they are computed
+    once per unique video_id and broadcast to every event of that video.
+    Keywords are matched per video language where politcal_keywords.xml has
+    a set for it (see compute_signals). With workers > 1 (default
+    ANALYSIS_LABEL_WORKERS) the unique videos are labeled in chunks across
+    that many processes.
+    """
+    df = df.copy()
+
+    # Get keywords (lazy load)
+    keywords = get_political_keywords()
+
+    codes, _ = pd.factorize(df['video_id'], use_na_sentinel=False)
+    # factorize numbers videos in order of first appearance, matching the first-occurrence rows
+    videos = df.loc[~df['video_id'].duplicated()]
+    signals = compute_signals_parallel(
+        videos, keywords, get_keywords_by_language(), workers=LABEL_WORKERS if workers is None else workers
+    )
+    for column in SIGNAL_COLUMNS + ['matched_keywords']:
+        df[column] = signals[column].to_numpy()[codes]
 
     # Combine signals into a score (0-6)
-    signal_cols = ['signal_category', 'signal_topic', 'signal_channel_topic',
-                  'signal_title', 'signal_description', 'signal_tags']
-    df['signal_count'] = df[signal_cols].sum(axis=1)
+    df['signal_count'] = df[SIGNAL_COLUMNS].sum(axis=1)
 
     # Apply threshold: political if signal_count >= min_signals
     df['is_political'] = df['signal_count'] >= min_signals
@@ -190,21 +342,12 @@ def compare_thresholds(df: pd.DataFrame, max_threshold: int = 4) -> pd.DataFrame
     """
     Compare political content detection across different threshold values.
 
-    Useful for sensitivity analysis and choosing the optimal threshold.
+    Useful for sensitivity analysis and choosing the optimal threshold. All
+    thresholds come from one signal_count histogram (see analysis.sensitivity).
     """
-    results = []
-
-    for threshold in range(1, max_threshold + 1):
-        is_political = df['signal_count'] >= threshold
-
-        results.append({
-            'threshold': threshold,
-            'political_count': is_political.sum(),
-            'political_percentage': is_political.mean() * 100,
-            'unique_videos': df[is_political]['video_id'].nunique(),
-        })
+    from analysis.sensitivity import threshold_sensitivity
 
-    comparison_df = pd.DataFrame(results)
+    comparison_df = threshold_sensitivity(df, max_threshold=max_threshold)
 
     logger.info("\nThreshold Comparison:")
     logger.info(f"\n{comparison_df.to_string(index=False)}")
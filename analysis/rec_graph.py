@@ -0,0 +1,253 @@
+import logging
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from sqlalchemy import create_engine
+
+from analysis.labeled_cache import WATERMARK_LAG, now_iso, read_manifest, write_atomic, write_manifest
+from analysis.load_data import STREAM_CHUNK_ROWS, get_cache_dir, get_database_url, iter_rec_events
+
+logger = logging.getLogger(__name__)
+
+GRAPH_DIR = "rec_graph"
+ADJACENCY_FILE = "adjacency.npz"
+NODES_FILE = "nodes.parquet"
+# Events inside the watermark lag window, so a re-scan never counts an edge twice
+RECENT_EVENTS_FILE = "recent_events.parquet"
+_EDGE_COLUMNS = ['id', 'source_video_id', 'video_id', 'collected_at']
+
+
+def graph_path() -> Path:
+    return get_cache_dir() / GRAPH_DIR
+
+
+class RecommendationGraph:
+    """
+    Directed graph of recommendations: an edge source_video_id -> video_id
+    weighted by how many events recommended it. Video IDs are coded as
+    integers in order of first appearance, and edges are kept in a scipy CSR
+    matrix. New edges are buffered as code arrays and merged into the matrix
+    in one sparse addition when it is next read.
+    """
+
+    def __init__(self, node_ids: Optional[Iterable[str]] = None, adjacency: Optional[sparse.csr_matrix] = None):
+        self.nodes = pd.Index(list(node_ids) if node_ids is not None else [], dtype=object)
+        size = len(self.nodes)
+        self._matrix = adjacency.tocsr() if adjacency is not None else sparse.csr_matrix((size, size))
+        self._pending: List[tuple] = []
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def codes(self, video_ids, add: bool = False) -> np.ndarray:
+        """
+        Node code per video ID (-1 for missing IDs, or for unknown ones unless
+        add). The IDs are hashed once, so only their distinct values are
+        looked up among the nodes.
+        """
+        local, distinct = pd.factorize(pd.Series(video_ids))
+        node_codes = self.nodes.get_indexer(pd.Index(distinct, dtype=object))
+        if add:
+            unknown = node_codes < 0
+            if unknown.any():
+                node_codes[unknown] = np.arange(len(self.nodes), len(self.nodes) + unknown.sum())
+                self.nodes = self.nodes.append(pd.Index(distinct[unknown], dtype=object))
+        return np.where(local >= 0, node_codes[local], -1) if len(node_codes) else np.full(len(local), -1)
+
+    def add_edges(self, sources, targets, weights=None):
+        """Add one edge per (source, target) pair. Targets become nodes even without a source (seed videos)."""
+        targets = self.codes(targets, add=True)
+        sources = self.codes(sources, add=True)
+        weights = np.ones(len(targets)) if weights is None else np.asarray(weights, dtype=np.float64)
+        keep = (sources >= 0) & (targets >= 0)
+        self._pending.append((sources[keep], targets[keep], weights[keep]))
+
+    @property
+    def adjacency(self) -> sparse.csr_matrix:
+        size = len(self.nodes)
+        if self._matrix.shape != (size, size):
+            self._matrix.resize((size, size))
+        if self._pending:
+            sources, targets, weights = (np.concatenate(parts) for parts in zip(*self._pending))
+            self._pending = []
+            # Duplicate pairs are summed by the COO -> CSR conversion
+            delta = sparse.coo_matrix((weights, (sources, targets)), shape=(size, size)).tocsr()
+            self._matrix = (self._matrix + delta).tocsr()
+        return self._matrix
+
+    def degrees(self) -> pd.DataFrame:
+        """Distinct and total (event-weighted) in/out edges per video."""
+        matrix = self.adjacency
+        return pd.DataFrame({
+            'video_id': self.nodes,
+            'in_degree': np.bincount(matrix.indices, minlength=len(self.nodes)),
+            'out_degree': np.diff(matrix.indptr),
+            'recommended': np.asarray(matrix.sum(axis=0)).ravel(),
+            'recommends': np.asarray(matrix.sum(axis=1)).ravel(),
+        })
+
+    def pagerank(self, damping: float = 0.85, tol: float = 1e-10, max_iter: int = 100) -> pd.Series:
+        """
+        PageRank by power iteration over the event-weighted edges. Dangling
+        videos (never a source) spread their rank uniformly.
+        """
+        size = len(self.nodes)
+        if size == 0:
+            return pd.Series(dtype=np.float64, index=self.nodes)
+        matrix = self.adjacency
+        out_weight = np.asarray(matrix.sum(axis=1)).ravel()
+        dangling = out_weight == 0
+        inverse_out = np.divide(1.0, out_weight, out=np.zeros(size), where=~dangling)
+        transposed = matrix.T.tocsr()
+
+        rank = np.full(size, 1.0 / size)
+        for _ in range(max_iter):
+            spread = transposed @ (rank * inverse_out)
+            updated = damping * (spread + rank[dangling].sum() / size) + (1 - damping) / size
+            change = np.abs(updated - rank).sum()
+            rank = updated
+            if change < tol:
+                break
+        else:
+            logger.warning(f"PageRank did not converge in {max_iter} iterations (change {change:.2e})")
+        return pd.Series(rank, index=self.nodes, name='pagerank')
+
+    def hops_to(self, targets: Iterable[str], max_hops: int = 3) -> pd.Series:
+        """
+        Fewest recommendation hops from each video to any of targets (0 for
+        the targets themselves), or <NA> if none is within max_hops. Each hop
+        is one sparse matrix-vector product over the whole frontier.
+        """
+        matrix = self.adjacency
+        codes = self.codes(list(targets))
+        hops = np.full(len(self.nodes), -1, dtype=np.int64)
+        frontier = np.zeros(len(self.nodes), dtype=bool)
+        frontier[codes[codes >= 0]] = True
+        hops[frontier] = 0
+        for hop in range(1, max_hops + 1):
+            reached = (matrix @ frontier.astype(np.float64) > 0) & (hops < 0)
+            if not reached.any():
+                break
+            hops[reached] = hop
+            frontier = reached
+        return pd.Series(pd.array(np.where(hops >= 0, hops, None), dtype='Int64'), index=self.nodes, name='hops')
+
+    def strongly_connected_components(self) -> pd.DataFrame:
+        """Component label and component size per video."""
+        count, labels = connected_components(self.adjacency, directed=True, connection='strong')
+        sizes = np.bincount(labels, minlength=count)
+        return pd.DataFrame({'video_id': self.nodes, 'component': labels, 'component_size': sizes[labels]})
+
+    def save(self, path: Path):
+        path.mkdir(parents=True, exist_ok=True)
+        matrix = self.adjacency
+
+        def write_adjacency(tmp: Path):
+            with tmp.open('wb') as f:
+                sparse.save_npz(f, matrix)
+
+        write_atomic(path / ADJACENCY_FILE, write_adjacency)
+        nodes = pd.DataFrame({'video_id': self.nodes.to_numpy()})
+        write_atomic(path / NODES_FILE, lambda tmp: nodes.to_parquet(tmp, index=False))
+
+    @classmethod
+    def load(cls, path: Path) -> "RecommendationGraph":
+        nodes = pd.read_parquet(path / NODES_FILE)['video_id']
+        return cls(nodes.to_numpy(dtype=object), sparse.load_npz(path / ADJACENCY_FILE))
+
+
+def reach_summary(hops: pd.Series, max_hops: int = 3) -> pd.DataFrame:
+    """Number and share of videos within 0..max_hops hops of a target (cumulative)."""
+    counts = hops.value_counts().reindex(range(max_hops + 1), fill_value=0).cumsum()
+    return pd.DataFrame({
+        'hops': range(max_hops + 1),
+        'videos': counts.to_numpy(),
+        'share': counts.to_numpy() / len(hops) if len(hops) else np.nan,
+    })
+
+
+def update_recommendation_graph(
+    engine=None,
+    path: Optional[Path] = None,
+    chunk_rows: int = STREAM_CHUNK_ROWS
+) -> RecommendationGraph:
+    """
+    Load the cached graph and add the edges of rec_events past its watermark,
+    streamed chunk_rows at a time. As in the events cache, the last
+    WATERMARK_LAG of collection time is re-scanned for late-committed rows,
+    skipping events that were already counted.
+    """
+    if engine is None:
+        engine = create_engine(get_database_url())
+
+    path = Path(path or graph_path())
+    manifest = read_manifest(path)
+    if manifest is None:
+        graph, recent = RecommendationGraph(), pd.DataFrame({'id': pd.Series(dtype='int64')})
+        max_id, cutoff = None, None
+    else:
+        graph = RecommendationGraph.load(path)
+        recent = pd.read_parquet(path / RECENT_EVENTS_FILE)
+        max_id = manifest["max_id"]
+        cutoff = pd.Timestamp(manifest["max_collected_at"]) - WATERMARK_LAG if manifest["max_collected_at"] else None
+
+    added = []
+    for chunk in iter_rec_events(
+        engine, columns=_EDGE_COLUMNS, chunk_rows=chunk_rows,
+        newer_than_id=max_id, collected_since=cutoff.to_pydatetime() if cutoff is not None else None,
+    ):
+        if max_id is not None:
+            chunk = chunk[~((chunk['id'] <= max_id) & chunk['id'].isin(recent['id']))]
+        graph.add_edges(chunk['source_video_id'], chunk['video_id'])
+        added.append(chunk[['id', 'collected_at']])
+
+    added = pd.concat(added, ignore_index=True) if added else None
+    if added is not None and len(added):
+        events = (manifest or {}).get("events", 0) + len(added)
+        max_id = max(max_id or 0, int(added['id'].max()))
+        max_collected_at = added['collected_at'].max()
+        if manifest and manifest["max_collected_at"]:
+            max_collected_at = max(max_collected_at, pd.Timestamp(manifest["max_collected_at"]))
+        recent = pd.concat([recent, added], ignore_index=True)
+        recent = recent[recent['collected_at'] >= max_collected_at - WATERMARK_LAG].reset_index(drop=True)
+        logger.info(f"Added {len(added):,} recommendation events to the graph")
+    else:
+        events = (manifest or {}).get("events", 0)
+        max_collected_at = pd.Timestamp(manifest["max_collected_at"]) if manifest and manifest["max_collected_at"] else None
+        logger.info("No new recommendation events since the last graph update.")
+
+    graph.save(path)
+    write_atomic(path / RECENT_EVENTS_FILE, lambda tmp: recent.to_parquet(tmp, index=False))
+    write_manifest(path, {
+        "max_id": max_id,
+        "max_collected_at": max_collected_at.isoformat() if max_collected_at is not None else None,
+        "events": events,
+        "nodes": len(graph),
+        "edges": int(graph.adjacency.nnz),
+        "updated_at": now_iso(),
+    })
+    return graph
+
+
+if __name__ == "__main__":
+    from analysis.streaming import load_video_flags
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    engine = create_engine(get_database_url())
+    graph = update_recommendation_graph(engine)
+    logger.info(f"{len(graph):,} videos, {graph.adjacency.nnz:,} distinct recommendation edges")
+
+    ranks = graph.pagerank().sort_values(ascending=False)
+    logger.info(f"\nTop videos by PageRank:\n{ranks.head(10).to_string()}")
+
+    components = graph.strongly_connected_components()
+    logger.info(f"\n{components['component'].nunique():,} strongly connected components, "
+                f"largest has {components['component_size'].max():,} videos")
+
+    flags = load_video_flags(engine)
+    hops = graph.hops_to(flags.loc[flags['is_political'], 'video_id'], max_hops=3)
+    logger.info(f"\nVideos within k hops of political content:\n{reach_summary(hops).to_string(index=False)}")
@@ -0,0 +1,127 @@
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from analysis.metrics import _codes
+from analysis.political_labeling import SIGNAL_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+BOOTSTRAP_REPLICATES = 2000
+# Replicates are drawn this many at a time, bounding the weight matrix to batch x runs
+BOOTSTRAP_BATCH = 256
+
+
+def threshold_sensitivity(df: pd.DataFrame, max_threshold: int = len(SIGNAL_COLUMNS)) -> pd.DataFrame:
+    """
+    compare_thresholds for every threshold at once: political counts for
+    min_signals = 1..max_threshold are suffix sums of one histogram of
+    signal_count over events, and unique videos come from a histogram of each
+    video's signal_count. Events without a signal_count count as 0.
+    """
+    counts = df['signal_count'].to_numpy(dtype=np.float64, na_value=0).astype(np.int64)
+    size = max(max_threshold, int(counts.max()) if len(counts) else 0) + 1
+    at_least = np.bincount(counts, minlength=size)[::-1].cumsum()[::-1]
+
+    video_codes, video_ids = _codes(df['video_id'])
+    has_video = video_codes >= 0
+    video_counts = np.full(len(video_ids), -1, dtype=np.int64)
+    np.maximum.at(video_counts, video_codes[has_video], counts[has_video])
+    videos_at_least = np.bincount(video_counts[video_counts >= 0], minlength=size)[::-1].cumsum()[::-1]
+
+    thresholds = np.arange(1, max_threshold + 1)
+    return pd.DataFrame({
+        'threshold': thresholds,
+        'political_count': at_least[thresholds],
+        'political_percentage': at_least[thresholds] / len(counts) * 100 if len(counts) else np.nan,
+        'unique_videos': videos_at_least[thresholds],
+    })
+
+
+def cluster_bootstrap(
+    df: pd.DataFrame,
+    key: str,
+    name: Optional[str] = None,
+    replicates: int = BOOTSTRAP_REPLICATES,
+    confidence: float = 0.95,
+    seed: int = 0
+) -> pd.DataFrame:
+    """
+    Political share per value of key with percentile confidence intervals
+    from a run-level cluster bootstrap. Runs are resampled with replacement,
+    as crawl runs rather than single recommendations are the independent
+    units. Events are reduced once to a runs x groups table of political and
+    total counts, so each replicate is a matrix product of multinomial run
+    weights with that table.
+    """
+    run_codes, runs = _codes(df['run_id'])
+    key_codes, groups = _codes(df[key])
+    political = df['is_political'].to_numpy(dtype=bool, na_value=False)
+    valid = (run_codes >= 0) & (key_codes >= 0)
+    if not valid.all():
+        run_codes, key_codes, political = run_codes[valid], key_codes[valid], political[valid]
+
+    n_runs, n_groups = len(runs), len(groups)
+    cells = run_codes.astype(np.int64) * n_groups + key_codes
+    total = np.bincount(cells, minlength=n_runs * n_groups).reshape(n_runs, n_groups).astype(np.float64)
+    political_total = np.bincount(cells[political], minlength=n_runs * n_groups).reshape(n_runs, n_groups)
+    political_total = political_total.astype(np.float64)
+
+    observed = total.sum(axis=0) > 0
+    sampled = total.any(axis=1)
+    total, political_total = total[sampled][:, observed], political_total[sampled][:, observed]
+    n_runs = len(total)
+
+    rng = np.random.default_rng(seed)
+    shares = np.empty((replicates, total.shape[1]))
+    for start in range(0, replicates, BOOTSTRAP_BATCH):
+        batch = min(BOOTSTRAP_BATCH, replicates - start)
+        weights = rng.multinomial(n_runs, np.full(n_runs, 1 / n_runs), size=batch).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # A replicate that draws no run with events in a group has no share there
+            shares[start:start + batch] = (weights @ political_total) / (weights @ total)
+
+    alpha = (1 - confidence) / 2
+    with np.errstate(invalid='ignore'):
+        low, high = np.nanquantile(shares, [alpha, 1 - alpha], axis=0) if replicates else (np.nan, np.nan)
+    return pd.DataFrame({
+        name or key: groups[observed],
+        'political_percentage': political_total.sum(axis=0) / total.sum(axis=0) * 100,
+        'ci_low': low * 100,
+        'ci_high': high * 100,
+        'std_error': np.nanstd(shares, axis=0) * 100 if replicates else np.nan,
+        'runs': (total > 0).sum(axis=0),
+    })
+
+
+def add_uncertainty(
+    summary: Dict,
+    df: pd.DataFrame,
+    replicates: int = BOOTSTRAP_REPLICATES,
+    confidence: float = 0.95,
+    max_position: int = 20,
+    seed: int = 0
+) -> Dict:
+    """
+    Add threshold sensitivity ('thresholds') and bootstrap confidence
+    intervals for the political share by iteration and by position
+    ('by_iteration_ci', 'by_position_ci') to a compute_exposure_summary dict.
+    """
+    logger.info(f"Bootstrapping political share over runs ({replicates:,} replicates)...")
+    summary['thresholds'] = threshold_sensitivity(df)
+    summary['by_iteration_ci'] = cluster_bootstrap(
+        df, 'iteration_rec', 'iteration', replicates=replicates, confidence=confidence, seed=seed
+    )
+    in_range = np.flatnonzero(df['position'].to_numpy(dtype=np.float64, na_value=np.nan) < max_position)
+    positions = df[['run_id', 'position', 'is_political']].take(in_range)
+    summary['by_position_ci'] = cluster_bootstrap(
+        positions, 'position', replicates=replicates, confidence=confidence, seed=seed
+    )
+
+    logger.info("\nThreshold sensitivity:")
+    logger.info(f"\n{summary['thresholds'].to_string(index=False)}")
+    logger.info(f"\nPolitical share by iteration ({confidence:.0%} CI, run-level bootstrap):")
+    logger.info(f"\n{summary['by_iteration_ci'].to_string(index=False)}")
+    return summary
@@ -0,0 +1,158 @@
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+from sqlalchemy import BigInteger, Boolean, DateTime, Integer, SmallInteger, create_engine, select
+from sqlalchemy.types import ARRAY
+
+from analysis.load_data import (
+    STREAM_CHUNK_ROWS,
+    category_columns,
+    channel_columns,
+    get_database_url,
+    iter_columns,
+    project_columns,
+    rec_event_columns,
+    video_columns,
+    video_label_columns,
+)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = Path(os.getenv("ANALYSIS_SNAPSHOT_DIR", str(Path(__file__).parent / "snapshot")))
+MANIFEST_FILE = "manifest.json"
+# rec_events are written as rec_events/collected_date=YYYY-MM-DD/part-*.parquet
+PARTITION_COLUMN = "collected_date"
+
+
+def snapshot_tables() -> Dict[str, Dict[str, tuple]]:
+    return {
+        'rec_events': rec_event_columns(),
+        'videos': video_columns(),
+        'channels': channel_columns(),
+        'categories': category_columns(),
+        'video_labels': video_label_columns(),
+    }
+
+
+def _arrow_type(sql_type):
+    import pyarrow as pa
+
+    if isinstance(sql_type, ARRAY):
+        return pa.list_(pa.string())
+    if isinstance(sql_type, Boolean):
+        return pa.bool_()
+    if isinstance(sql_type, DateTime):
+        return pa.timestamp('us', tz='UTC')
+    if isinstance(sql_type, SmallInteger):
+        return pa.int16()
+    if isinstance(sql_type, BigInteger):
+        return pa.int64()
+    if isinstance(sql_type, Integer):
+        return pa.int32()
+    return pa.string()
+
+
+def arrow_schema(table_columns: Dict[str, tuple]):
+    """Parquet schema for a table, from its column types, so every part file agrees even on all-NULL chunks."""
+    import pyarrow as pa
+
+    return pa.schema([(name, _arrow_type(column.type)) for name, (column, _) in table_columns.items()])
+
+
+def write_parts(chunks: Iterable[pd.DataFrame], directory: Path, schema, partitioned: bool = False) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    directory.mkdir(parents=True)
+    rows = 0
+    for i, chunk in enumerate(chunks):
+        table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+        if partitioned:
+            dates = pa.array(chunk['collected_at'].dt.strftime('%Y-%m-%d'), type=pa.string())
+            pq.write_to_dataset(
+                table.append_column(PARTITION_COLUMN, dates),
+                directory,
+                partition_cols=[PARTITION_COLUMN],
+                basename_template=f"part-{i:05d}-{{i}}.parquet",
+            )
+        else:
+            pq.write_table(table, directory / f"part-{i:05d}.parquet")
+        rows += len(chunk)
+
+    if rows == 0:
+        # Readers glob part files, so an empty table still gets one (empty) file
+        if partitioned:
+            schema = schema.append(pa.field(PARTITION_COLUMN, pa.string()))
+        pq.write_table(schema.empty_table(), directory / "part-00000.parquet")
+    return rows
+
+
+def export_snapshot(
+    engine=None,
+    snapshot_dir: Optional[Path] = None,
+    chunk_rows: int = STREAM_CHUNK_ROWS
+) -> dict:
+    """
+    Export rec_events, videos, channels, categories and video_labels to
+    Parquet under snapshot_dir (SNAPSHOT_DIR by default), one directory per
+    table. rec_events are hive-partitioned by collection date. Every table is
+    streamed chunk_rows rows at a time, and the snapshot is written to a
+    temporary directory that replaces the previous one only once complete.
+    """
+    from app.models.rec_event import RecEvent
+
+    if engine is None:
+        engine = create_engine(get_database_url())
+
+    target = Path(snapshot_dir or SNAPSHOT_DIR)
+    tmp = target.with_name(target.name + ".tmp")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+
+    manifest = {"exported_at": datetime.now(timezone.utc).isoformat(), "tables": {}}
+    for name, table_columns in snapshot_tables().items():
+        selected, dtypes = project_columns(table_columns, None)
+        query = select(*selected)
+        if name == 'rec_events':
+            query = query.order_by(RecEvent.id)
+        chunks = iter_columns(engine, query, dtypes, chunk_rows)
+        rows = write_parts(chunks, tmp / name, arrow_schema(table_columns), partitioned=name == 'rec_events')
+        manifest["tables"][name] = rows
+        logger.info(f"  {name}: {rows:,} rows")
+    (tmp / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    previous = target.with_name(target.name + ".old")
+    if previous.exists():
+        shutil.rmtree(previous)
+    if target.exists():
+        os.replace(target, previous)
+    os.replace(tmp, target)
+    if previous.exists():
+        shutil.rmtree(previous)
+
+    logger.info(f"Exported snapshot to {target}")
+    return manifest
+
+
+def read_snapshot_manifest(snapshot_dir: Optional[Path] = None) -> Optional[dict]:
+    manifest_file = Path(snapshot_dir or SNAPSHOT_DIR) / MANIFEST_FILE
+    if not manifest_file.exists():
+        return None
+    return json.loads(manifest_file.read_text(encoding="utf-8"))
+
+
+if __name__ == "__main__":
+    from analysis.materialized_views import sync_video_labels
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    engine = create_engine(get_database_url())
+    logger.info("Labeling new and changed videos...")
+    sync_video_labels(engine)
+    logger.info("Exporting Parquet snapshot...")
+    export_snapshot(engine)
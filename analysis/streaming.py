@@ -0,0 +1,338 @@
+import logging
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, func, select
+
+from analysis.load_data import STREAM_CHUNK_ROWS, get_database_url, iter_rec_events, load_categories, load_videos, read_columns
+
+logger = logging.getLogger(__name__)
+
+# Partial aggregates are folded together once this many have piled up
+COLLAPSE_EVERY = 16
+_EVENT_COLUMNS = ['run_id', 'iteration', 'video_id', 'position']
+
+
+class GroupTotals:
+    """Per-group sums (and maxima for max_columns) accumulated chunk by chunk."""
+
+    def __init__(self, max_columns: tuple = ()):
+        self.max_columns = set(max_columns)
+        self._parts: List[pd.DataFrame] = []
+
+    def add(self, partial: pd.DataFrame):
+        self._parts.append(partial)
+        if len(self._parts) >= COLLAPSE_EVERY:
+            self._parts = [self.result()]
+
+    def result(self) -> pd.DataFrame:
+        if not self._parts:
+            return pd.DataFrame()
+        combined = pd.concat(self._parts)
+        return combined.groupby(level=0).agg(
+            {column: 'max' if column in self.max_columns else 'sum' for column in combined.columns}
+        )
+
+
+class GroupVideoSets:
+    """
+    Exact set of distinct videos per group for small integer groups
+    (iterations, positions): one boolean row over all videos per group, so
+    memory is one byte per (group, video) whatever the number of events.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._seen: Dict[int, np.ndarray] = {}
+
+    def add(self, groups: np.ndarray, videos: np.ndarray):
+        for group in np.unique(groups):
+            seen = self._seen.get(int(group))
+            if seen is None:
+                seen = self._seen[int(group)] = np.zeros(self.size, bool)
+            seen[videos[groups == group]] = True
+
+    def counts(self) -> pd.Series:
+        return pd.Series({group: int(seen.sum()) for group, seen in self._seen.items()}, dtype=np.int64)
+
+
+class RunVideoCounts:
+    """
+    Exact distinct videos per run for events that arrive ordered by run (as
+    iter_rec_events(order_by_run=True) returns them). One boolean row over
+    all videos is reused for the current run and cleared when the next run
+    starts, so memory is one byte per video plus one count per run.
+    """
+
+    def __init__(self, size: int):
+        self._seen = np.zeros(size, bool)
+        self._touched: List[np.ndarray] = []
+        self._current: Optional[int] = None
+        self._counts: Dict[int, int] = {}
+
+    def add(self, runs: np.ndarray, videos: np.ndarray):
+        starts = np.flatnonzero(np.diff(runs)) + 1
+        for run_codes, run_videos in zip(np.split(runs, starts), np.split(videos, starts)):
+            if not len(run_codes):
+                continue
+            run = int(run_codes[0])
+            if run != self._current:
+                self._finish_run()
+                if run in self._counts:
+                    raise ValueError("rec_events must arrive ordered by run_id to count distinct videos per run")
+                self._current = run
+                self._counts[run] = 0
+            fresh = np.unique(run_videos[~self._seen[run_videos]])
+            self._seen[fresh] = True
+            self._touched.append(fresh)
+            self._counts[run] += len(fresh)
+
+    def _finish_run(self):
+        if self._touched:
+            self._seen[np.concatenate(self._touched)] = False
+            self._touched = []
+
+    def counts(self) -> pd.Series:
+        return pd.Series(self._counts, dtype=np.int64)
+
+
+def histogram_median(histogram: np.ndarray) -> float:
+    """Median of the values whose counts are histogram[value], as pandas computes it."""
+    cumulative = histogram.cumsum()
+    total = cumulative[-1]
+    lower = np.searchsorted(cumulative, (total - 1) // 2, side='right')
+    upper = np.searchsorted(cumulative, total // 2, side='right')
+    return (lower + upper) / 2
+
+
+class ExposureAccumulator:
+    """
+    Running state for the metrics of analysis.metrics over rec_events chunks.
+
+    videos has one row per video (video_id, channel_id, channel_title,
+    is_political); per-video state is kept in arrays indexed like it. Counts,
+    sums, maxima, means and nunique are exact; the political-depth median
+    comes from an exact histogram of iterations. Chunks must arrive ordered
+    by run. Memory is one byte per video for each iteration and position
+    seen plus a count per run, and does not grow with events.
+    """
+
+    def __init__(self, videos: pd.DataFrame, max_position: int = 20):
+        self.videos = videos.reset_index(drop=True)
+        self.max_position = max_position
+        self._index = pd.Index(self.videos['video_id'])
+        self._political = self.videos['is_political'].to_numpy(dtype=bool)
+        size = len(self.videos)
+        self.video_recommendations = np.zeros(size, np.int64)
+        self.video_iteration_sum = np.zeros(size, np.float64)
+        self.video_position_sum = np.zeros(size, np.float64)
+        self.video_position_count = np.zeros(size, np.int64)
+        self.political_depth = np.zeros(1, np.int64)
+        self.total = 0
+        self.unknown = 0
+        self.by_iteration = GroupTotals()
+        self.by_position = GroupTotals()
+        self.by_run = GroupTotals(max_columns=('max_iteration',))
+        self.iteration_videos = GroupVideoSets(size)
+        self.position_videos = GroupVideoSets(size)
+        self.run_videos = RunVideoCounts(size)
+        self._run_codes: Dict[str, int] = {}
+
+    def _run_code_array(self, run_ids: pd.Series) -> np.ndarray:
+        inverse, uniques = pd.factorize(run_ids)
+        mapping = np.array([self._run_codes.setdefault(str(run), len(self._run_codes)) for run in uniques], np.int64)
+        return mapping[inverse]
+
+    def add(self, chunk: pd.DataFrame):
+        codes = self._index.get_indexer(chunk['video_id'])
+        known = codes >= 0
+        if not known.all():
+            # rec_events.video_id references videos, so this only happens if rows race a delete
+            self.unknown += int((~known).sum())
+            chunk, codes = chunk[known], codes[known]
+
+        size = len(self._political)
+        political = self._political[codes]
+        iteration = chunk['iteration'].to_numpy(dtype=np.int64)
+        position = chunk['position']
+        has_position = position.notna().to_numpy()
+        position = position.to_numpy(dtype=np.float64, na_value=np.nan)
+
+        self.total += len(chunk)
+        self.video_recommendations += np.bincount(codes, minlength=size)
+        self.video_iteration_sum += np.bincount(codes, weights=iteration, minlength=size)
+        self.video_position_sum += np.bincount(codes[has_position], weights=position[has_position], minlength=size)
+        self.video_position_count += np.bincount(codes[has_position], minlength=size)
+
+        depth = np.bincount(iteration[political])
+        if len(depth) > len(self.political_depth):
+            self.political_depth = np.pad(self.political_depth, (0, len(depth) - len(self.political_depth)))
+        self.political_depth[:len(depth)] += depth
+
+        events = pd.DataFrame({'political_count': political.astype(np.int64), 'total_recommendations': 1})
+        self.by_iteration.add(events.groupby(iteration).sum())
+        self.iteration_videos.add(iteration, codes)
+
+        in_range = has_position & (position < self.max_position)
+        self.by_position.add(events[in_range].groupby(position[in_range].astype(np.int64)).sum())
+        self.position_videos.add(position[in_range].astype(np.int64), codes[in_range])
+
+        runs = self._run_code_array(chunk['run_id'])
+        self.by_run.add(events.assign(max_iteration=iteration).groupby(runs).agg(
+            {'political_count': 'sum', 'total_recommendations': 'sum', 'max_iteration': 'max'}
+        ))
+        self.run_videos.add(runs, codes)
+
+    def _overall(self) -> Dict[str, float]:
+        seen = self.video_recommendations > 0
+        political_recs = int(self.political_depth.sum())
+        has_depth = political_recs > 0
+        depth_values = np.arange(len(self.political_depth))
+        return {
+            'total_recommendations': self.total,
+            'political_recommendations': political_recs,
+            'political_percentage': (political_recs / self.total * 100) if self.total > 0 else 0,
+            'unique_videos': int(seen.sum()),
+            'unique_political_videos': int((seen & self._political).sum()),
+            'median_political_depth': histogram_median(self.political_depth) if has_depth else 0,
+            'mean_political_depth': (depth_values * self.political_depth).sum() / political_recs if has_depth else 0,
+        }
+
+    @staticmethod
+    def _grouped(totals: GroupTotals, videos: Union[GroupVideoSets, RunVideoCounts], key: str) -> pd.DataFrame:
+        stats = totals.result()
+        if stats.empty:
+            stats = pd.DataFrame(columns=['political_count', 'total_recommendations'], dtype=np.int64)
+        stats = stats.sort_index()
+        stats.insert(1, 'political_rate', stats['political_count'] / stats['total_recommendations'])
+        stats.insert(3, 'unique_videos', videos.counts().reindex(stats.index).to_numpy())
+        stats['political_percentage'] = stats['political_rate'] * 100
+        return stats.rename_axis(key).reset_index()
+
+    def _political_videos(self) -> pd.DataFrame:
+        recommended = self._political & (self.video_recommendations > 0)
+        videos = self.videos.loc[recommended, ['video_id', 'channel_id', 'channel_title']].assign(
+            recommendation_count=self.video_recommendations[recommended],
+            iteration_sum=self.video_iteration_sum[recommended],
+            position_sum=self.video_position_sum[recommended],
+            position_count=self.video_position_count[recommended],
+        )
+        # Grouping by channel_title in the in-memory path drops videos without one
+        return videos[videos['channel_title'].notna()]
+
+    def summary(self, load_details: Callable[[List[str]], pd.DataFrame], top_n: int = 20) -> Dict:
+        """
+        The compute_exposure_summary dict. load_details(video_ids) returns
+        video_id, title, view_count and category for the top political videos.
+        """
+        if self.unknown:
+            logger.warning(f"Skipped {self.unknown:,} events whose video_id is not in videos")
+
+        by_run = self._grouped(self.by_run, self.run_videos, 'run_code')
+        run_ids = np.array(list(self._run_codes), dtype=object)
+        by_run.insert(0, 'run_id', run_ids[by_run.pop('run_code').to_numpy(dtype=np.int64)] if len(by_run) else [])
+        by_run = by_run.sort_values('run_id').reset_index(drop=True)
+        by_run = by_run[[
+            'run_id', 'political_count', 'political_rate', 'total_recommendations',
+            'unique_videos', 'max_iteration', 'political_percentage'
+        ]]
+
+        political_videos = self._political_videos()
+        top = political_videos.sort_values(
+            ['recommendation_count', 'video_id'], ascending=[False, True]
+        ).head(top_n)
+        top_videos = pd.DataFrame({
+            'video_id': top['video_id'].to_numpy(),
+            'channel_title': top['channel_title'].to_numpy(),
+            'recommendation_count': top['recommendation_count'].to_numpy(),
+            'avg_iteration': (top['iteration_sum'] / top['recommendation_count']).to_numpy(),
+            'avg_position': (top['position_sum'] / top['position_count'].where(top['position_count'] > 0)).to_numpy(),
+        })
+        details = load_details(top_videos['video_id'].tolist())
+        top_videos = top_videos.merge(details, on='video_id', how='left')[[
+            'video_id', 'title', 'channel_title', 'recommendation_count',
+            'avg_iteration', 'avg_position', 'view_count', 'category'
+        ]]
+
+        top_channels = political_videos.groupby(['channel_id', 'channel_title']).agg(
+            unique_videos=('video_id', 'count'),
+            total_recommendations=('recommendation_count', 'sum'),
+            iteration_sum=('iteration_sum', 'sum'),
+        ).reset_index()
+        top_channels['avg_iteration'] = top_channels.pop('iteration_sum') / top_channels['total_recommendations']
+        top_channels = top_channels.sort_values(
+            ['total_recommendations', 'channel_id'], ascending=[False, True], kind='stable'
+        ).head(top_n)
+
+        return {
+            'overall': self._overall(),
+            'by_iteration': self._grouped(self.by_iteration, self.iteration_videos, 'iteration'),
+            'by_position': self._grouped(self.by_position, self.position_videos, 'position'),
+            'by_run': by_run,
+            'top_videos': top_videos,
+            'top_channels': top_channels.reset_index(drop=True),
+        }
+
+
+def load_video_flags(
+    engine,
+    min_signals: int = 2,
+    custom_political_channels: Optional[List[str]] = None,
+    custom_political_videos: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    One row per video with channel_id, channel_title and is_political, from
+    video_labels (run analysis.materialized_views.sync_video_labels first).
+    Custom labels match add_custom_political_labels.
+    """
+    from app.models.video import Video
+    from app.models.video_label import VideoLabel
+
+    query = select(
+        Video.video_id.label('video_id'),
+        Video.channel_id.label('channel_id'),
+        Video.channel_title.label('channel_title'),
+        func.coalesce(VideoLabel.signal_count, 0).label('signal_count'),
+    ).outerjoin(VideoLabel, VideoLabel.video_id == Video.video_id)
+    videos = read_columns(engine, query, {'signal_count': 'int16'})
+
+    is_political = videos['signal_count'] >= min_signals
+    if custom_political_channels:
+        is_political |= videos['channel_id'].isin(custom_political_channels)
+    if custom_political_videos:
+        is_political |= videos['video_id'].isin(custom_political_videos)
+    return videos.drop(columns='signal_count').assign(is_political=is_political)
+
+
+def compute_streaming_exposure_summary(
+    engine=None,
+    min_signals: int = 2,
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+    custom_political_channels: Optional[List[str]] = None,
+    custom_political_videos: Optional[List[str]] = None,
+    max_position: int = 20,
+    top_n: int = 20
+) -> Dict:
+    """
+    compute_exposure_summary for a dataset too large for memory: rec_events
+    are streamed chunk_rows at a time, ordered by run, and folded into an
+    ExposureAccumulator, with labels joined from video_labels per chunk.
+    """
+    if engine is None:
+        engine = create_engine(get_database_url())
+
+    videos = load_video_flags(engine, min_signals, custom_political_channels, custom_political_videos)
+    accumulator = ExposureAccumulator(videos, max_position=max_position)
+    for i, chunk in enumerate(iter_rec_events(engine, columns=_EVENT_COLUMNS, chunk_rows=chunk_rows, order_by_run=True), start=1):
+        accumulator.add(chunk)
+        if i % 10 == 0:
+            logger.info(f"  {accumulator.total:,} events processed...")
+    logger.info(f"Streamed {accumulator.total:,} recommendation events")
+
+    def load_details(video_ids: List[str]) -> pd.DataFrame:
+        details = load_videos(engine, columns=['video_id', 'title', 'view_count', 'category_id'], video_ids=video_ids)
+        categories = load_categories(engine).set_index('id')['name']
+        return details.assign(category=details['category_id'].map(categories)).drop(columns='category_id')
+
+    return accumulator.summary(load_details, top_n=top_n)
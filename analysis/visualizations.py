@@ -64,13 +64,18 @@ def plot_overall_exposure(metrics: Dict, output_dir: Path):
     logger.info(f"Saved: overall_exposure.png")
 
 
-def plot_exposure_by_iteration(df_iteration: pd.DataFrame, output_dir: Path):
+def plot_exposure_by_iteration(df_iteration: pd.DataFrame, output_dir: Path, df_ci: pd.DataFrame = None):
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
 
     ax1.plot(df_iteration['iteration'], df_iteration['political_percentage'],
              marker='o', linewidth=2, markersize=8, color='#e74c3c')
-    ax1.fill_between(df_iteration['iteration'], 0, df_iteration['political_percentage'],
-                      alpha=0.3, color='#e74c3c')
+    if df_ci is not None:
+        ax1.fill_between(df_ci['iteration'], df_ci['ci_low'], df_ci['ci_high'],
+                         alpha=0.3, color='#e74c3c', label='Run-level bootstrap CI')
+        ax1.legend()
+    else:
+        ax1.fill_between(df_iteration['iteration'], 0, df_iteration['political_percentage'],
+                         alpha=0.3, color='#e74c3c')
     ax1.set_xlabel('Iteration (Crawl Depth)', fontsize=12)
     ax1.set_ylabel('Political Content (%)', fontsize=12)
     ax1.set_title('Political Exposure by Iteration', fontsize=13, fontweight='bold')
@@ -213,6 +218,16 @@ def export_tables(summary: Dict, output_dir: Path):
     )
     logger.info(f"Saved: table_top_political_channels.csv")
 
+    # Added by analysis.sensitivity.add_uncertainty
+    for key, filename in [
+        ('thresholds', 'table_threshold_sensitivity.csv'),
+        ('by_iteration_ci', 'table_iteration_ci.csv'),
+        ('by_position_ci', 'table_position_ci.csv'),
+    ]:
+        if key in summary:
+            summary[key].to_csv(output_dir / filename, index=False)
+            logger.info(f"Saved: {filename}")
+
     overall_df = pd.DataFrame([summary['overall']])
     overall_df.to_csv(
         output_dir / 'table_overall_metrics.csv',
@@ -230,7 +245,7 @@ def generate_all_visualizations(summary: Dict, output_dir: str = "analysis/outpu
 
 
     plot_overall_exposure(summary['overall'], output_path)
-    plot_exposure_by_iteration(summary['by_iteration'], output_path)
+    plot_exposure_by_iteration(summary['by_iteration'], output_path, summary.get('by_iteration_ci'))
     plot_exposure_by_position(summary['by_position'], output_path)
     plot_top_videos(summary['top_videos'], output_path)
     plot_top_channels(summary['top_channels'], output_path)
@@ -12,6 +12,9 @@ logger = logging.getLogger(__name__)
 def get_category_by_name(session: Session, name: str) -> Optional[Category]:
     return session.query(Category).filter(Category.name == name).one_or_none()
 
+def list_categories(session: Session) -> list[Category]:
+    return list(session.query(Category).all())
+
 def get_category_by_id(session: Session, category_id: int) -> Optional[Category]:
     return session.get(Category, category_id)
 
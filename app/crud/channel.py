@@ -1,7 +1,9 @@
 from __future__ import annotations
 import logging
-from typing import Optional
+from typing import Iterable, Optional
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models.channel import Channel
@@ -14,6 +16,26 @@ def get_channel_by_id(session: Session, channel_id: str) -> Optional[Channel]:
     return session.get(Channel, channel_id)
 
 
+def _existing_channel_ids_statement(channel_ids: Iterable[str]):
+    """SELECT of the given channel_ids that exist, or None when there are none to look up."""
+    channel_ids = list(channel_ids)
+    if not channel_ids:
+        return None
+    return select(Channel.channel_id).where(Channel.channel_id.in_(channel_ids))
+
+
+def get_existing_channel_ids(session: Session, channel_ids: Iterable[str]) -> set[str]:
+    """Return the subset of channel_ids that exist, in a single query."""
+    stmt = _existing_channel_ids_statement(channel_ids)
+    return set(session.scalars(stmt)) if stmt is not None else set()
+
+
+async def get_existing_channel_ids_async(session: AsyncSession, channel_ids: Iterable[str]) -> set[str]:
+    """Async variant of get_existing_channel_ids."""
+    stmt = _existing_channel_ids_statement(channel_ids)
+    return set(await session.scalars(stmt)) if stmt is not None else set()
+
+
 def upsert_channel(session: Session, channel_data: dict) -> Channel:
     """
     Insert or update a channel in the database.
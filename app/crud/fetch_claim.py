@@ -0,0 +1,75 @@
+from __future__ import annotations
+import logging
+from datetime import timedelta
+from typing import Iterable
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.video_fetch_claim import VideoFetchClaim
+
+logger = logging.getLogger(__name__)
+
+
+def claim_video_ids(session: Session, video_ids: Iterable[str], worker_id: str, ttl_seconds: int) -> set[str]:
+    """
+    Claim video IDs for fetching by this worker, in one statement.
+
+    Returns the IDs this worker now holds: unclaimed IDs, IDs it already held,
+    and IDs whose previous claim is older than ttl_seconds.
+    """
+    video_ids = sorted(set(video_ids))
+    if not video_ids:
+        return set()
+    stmt = pg_insert(VideoFetchClaim).values(
+        [{"video_id": video_id, "worker_id": worker_id} for video_id in video_ids]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[VideoFetchClaim.video_id],
+        set_={"worker_id": stmt.excluded.worker_id, "claimed_at": func.now()},
+        where=(VideoFetchClaim.worker_id == stmt.excluded.worker_id)
+        | (VideoFetchClaim.claimed_at < func.now() - timedelta(seconds=ttl_seconds)),
+    ).returning(VideoFetchClaim.video_id)
+    claimed = set(session.scalars(stmt))
+    session.commit()
+    return claimed
+
+
+def release_video_ids(session: Session, video_ids: Iterable[str], worker_id: str) -> int:
+    """Drop this worker's claims on video_ids. Returns the number released."""
+    video_ids = list(video_ids)
+    if not video_ids:
+        return 0
+    result = session.execute(
+        delete(VideoFetchClaim)
+        .where(VideoFetchClaim.video_id.in_(video_ids))
+        .where(VideoFetchClaim.worker_id == worker_id)
+    )
+    session.commit()
+    return result.rowcount
+
+
+def foreign_claims(session: Session, video_ids: Iterable[str], worker_id: str, ttl_seconds: int) -> dict[str, bool]:
+    """
+    Claims other workers hold on video_ids, as {video_id: is_live}. A claim
+    older than ttl_seconds is not live.
+    """
+    video_ids = list(video_ids)
+    if not video_ids:
+        return {}
+    is_live = VideoFetchClaim.claimed_at >= func.now() - timedelta(seconds=ttl_seconds)
+    rows = session.execute(
+        select(VideoFetchClaim.video_id, is_live)
+        .where(VideoFetchClaim.video_id.in_(video_ids))
+        .where(VideoFetchClaim.worker_id != worker_id)
+    )
+    return {video_id: bool(live) for video_id, live in rows}
+
+
+def delete_expired_claims(session: Session, ttl_seconds: int) -> int:
+    result = session.execute(
+        delete(VideoFetchClaim).where(VideoFetchClaim.claimed_at < func.now() - timedelta(seconds=ttl_seconds))
+    )
+    session.commit()
+    return result.rowcount
@@ -1,18 +1,39 @@
 from __future__ import annotations
 import logging
+from collections import Counter
 from typing import Iterable, Union
 from uuid import UUID
 
+from sqlalchemy import bindparam, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models.rec_event import RecEvent
+from app.models.video import Video
 
 logger = logging.getLogger(__name__)
 
 
+def _rec_count_update(objects: list[RecEvent]):
+    """
+    Statement and parameters adding the new events to videos.rec_count. Rows
+    are updated in video_id order so concurrent workers lock them in the
+    same order.
+    """
+    videos = Video.__table__
+    stmt = (
+        update(videos)
+        .where(videos.c.video_id == bindparam("counted_video_id"))
+        .values(rec_count=videos.c.rec_count + bindparam("added"))
+    )
+    counts = Counter(obj.video_id for obj in objects)
+    return stmt, [{"counted_video_id": video_id, "added": counts[video_id]} for video_id in sorted(counts)]
+
+
 def insert_rec_event(session: Session, event: Union[RecEvent, dict]) -> RecEvent:
     obj = event if isinstance(event, RecEvent) else RecEvent(**event)
     session.add(obj)
+    session.execute(*_rec_count_update([obj]))
     session.commit()
     session.refresh(obj)
     logger.info(
@@ -30,7 +51,23 @@ def insert_rec_events(
         event if isinstance(event, RecEvent) else RecEvent(**event) for event in events
     ]
     session.bulk_save_objects(objects, return_defaults=True)
+    if objects:
+        session.execute(*_rec_count_update(objects))
     session.commit()
     logger.info("Bulk inserted %d recommendation events", len(objects))
     return objects
 
+
+async def insert_rec_events_async(
+    session: AsyncSession, events: Iterable[Union[RecEvent, dict]]
+) -> list[RecEvent]:
+    """Async variant of insert_rec_events; the session should not expire on commit."""
+    objects = [
+        event if isinstance(event, RecEvent) else RecEvent(**event) for event in events
+    ]
+    session.add_all(objects)
+    if objects:
+        await session.execute(*_rec_count_update(objects))
+    await session.commit()
+    logger.info("Bulk inserted %d recommendation events", len(objects))
+    return objects
@@ -1,9 +1,12 @@
 from __future__ import annotations
 import logging
-from typing import Iterable, Optional, Sequence, Union
+from datetime import datetime
+from typing import Iterable, Iterator, Optional, Sequence, Union
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import func, or_, select, update
 
 from app.models.video import Video
 
@@ -24,6 +27,19 @@ def list_videos(session: Session, limit: int = 100, offset: int = 0) -> list[Vid
     return list(session.scalars(stmt))
 
 
+def count_videos(session: Session) -> int:
+    return session.scalar(select(func.count()).select_from(Video))
+
+
+def iter_video_ids(session: Session, batch_size: int = 10_000) -> Iterator[str]:
+    """Stream every stored video_id using a server-side cursor."""
+    result = session.execute(
+        select(Video.video_id).execution_options(stream_results=True, yield_per=batch_size)
+    )
+    for video_id in result.scalars():
+        yield video_id
+
+
 def insert_video(session: Session, video: Union[Video, dict]) -> Video:
     obj = video if isinstance(video, Video) else Video(**video)
     session.add(obj)
@@ -49,9 +65,123 @@ def upsert_video(session: Session, video: Union[Video, dict]) -> Video:
         for key, value in data.items():
             if key != "video_id":
                 setattr(existing, key, value)
+        existing.metadata_refreshed_at = func.now()
         session.commit()
         session.refresh(existing)
         logger.info("Updated video id=%s", existing.video_id)
         return existing
 
     return insert_video(session, data)
+
+
+BULK_UPSERT_CHUNK_SIZE = 1000
+
+
+def _video_upsert_statements(videos: Sequence[dict]):
+    for i in range(0, len(videos), BULK_UPSERT_CHUNK_SIZE):
+        chunk = videos[i:i + BULK_UPSERT_CHUNK_SIZE]
+        stmt = pg_insert(Video).values(chunk)
+        update_columns = {
+            key: stmt.excluded[key] for key in chunk[0] if key not in ("video_id", "iteration")
+        }
+        update_columns["metadata_refreshed_at"] = func.now()
+        yield stmt.on_conflict_do_update(index_elements=[Video.video_id], set_=update_columns)
+
+
+def _video_insert_statements(videos: Sequence[dict]):
+    for i in range(0, len(videos), BULK_UPSERT_CHUNK_SIZE):
+        chunk = videos[i:i + BULK_UPSERT_CHUNK_SIZE]
+        yield pg_insert(Video).values(chunk).on_conflict_do_nothing(index_elements=[Video.video_id])
+
+
+def bulk_insert_new_videos(session: Session, videos: Sequence[dict]) -> int:
+    """
+    Insert videos known to be new (see app.services.seen_index) with a plain
+    INSERT per chunk, skipping the upsert's update. A row another writer
+    stored first is left as it is.
+    """
+    if not videos:
+        return 0
+
+    for stmt in _video_insert_statements(videos):
+        session.execute(stmt)
+
+    session.commit()
+    logger.info("Bulk inserted %d new videos", len(videos))
+    return len(videos)
+
+
+def bulk_upsert_videos(session: Session, videos: Sequence[dict]) -> int:
+    """
+    Insert or update many videos with INSERT ... ON CONFLICT in one statement
+    per chunk. Every dict must have the same keys. iteration is only set on
+    insert so refreshes don't overwrite it.
+    """
+    if not videos:
+        return 0
+
+    for stmt in _video_upsert_statements(videos):
+        session.execute(stmt)
+
+    session.commit()
+    logger.info("Bulk upserted %d videos", len(videos))
+    return len(videos)
+
+
+async def bulk_upsert_videos_async(session: AsyncSession, videos: Sequence[dict]) -> int:
+    """Async variant of bulk_upsert_videos."""
+    if not videos:
+        return 0
+
+    for stmt in _video_upsert_statements(videos):
+        await session.execute(stmt)
+
+    await session.commit()
+    logger.info("Bulk upserted %d videos", len(videos))
+    return len(videos)
+
+
+def _touch_statement(video_ids: list[str]):
+    return update(Video).where(Video.video_id.in_(video_ids)).values(metadata_refreshed_at=func.now())
+
+
+def touch_videos(session: Session, video_ids: Iterable[str]) -> int:
+    """Mark videos as refreshed without changing their metadata (e.g. deleted or private videos)."""
+    video_ids = list(video_ids)
+    if not video_ids:
+        return 0
+    session.execute(_touch_statement(video_ids))
+    session.commit()
+    return len(video_ids)
+
+
+async def touch_videos_async(session: AsyncSession, video_ids: Iterable[str]) -> int:
+    """Async variant of touch_videos."""
+    video_ids = list(video_ids)
+    if not video_ids:
+        return 0
+    await session.execute(_touch_statement(video_ids))
+    await session.commit()
+    return len(video_ids)
+
+
+def list_stale_video_ids(session: Session, refreshed_before: datetime, limit: int) -> list[str]:
+    """
+    Videos whose metadata is older than refreshed_before, most urgent first.
+
+    Priority is hours since the last refresh (or publish date for rows never
+    refreshed) weighted by log recommendation count, so frequently
+    recommended videos come back around sooner. The count is read from
+    videos.rec_count, so the cost doesn't grow with rec_events.
+    """
+    last_refresh = func.coalesce(Video.metadata_refreshed_at, Video.published_at, func.to_timestamp(0))
+    age_hours = func.extract("epoch", func.now() - last_refresh) / 3600
+    priority = age_hours * func.ln(2 + Video.rec_count)
+
+    stmt = (
+        select(Video.video_id)
+        .where(or_(Video.metadata_refreshed_at.is_(None), Video.metadata_refreshed_at < refreshed_before))
+        .order_by(priority.desc())
+        .limit(limit)
+    )
+    return list(session.scalars(stmt))
@@ -1,19 +1,122 @@
 import os
-from contextlib import contextmanager
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 
 load_dotenv()
 
 DB_URL = os.getenv("DB_URL")
-engine = create_engine(DB_URL, future=True, pool_pre_ping=True)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+# Defaults match SQLAlchemy's own; DB_POOL_RECYCLE=-1 never recycles
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+# Size of SQLAlchemy's compiled-statement cache per engine
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "500"))
+# psycopg 3 server-side prepare threshold for the async engine; "none" disables
+# prepared statements (needed behind pgbouncer in transaction mode)
+DB_PREPARE_THRESHOLD = os.getenv("DB_PREPARE_THRESHOLD", "5")
+ASYNC_DB_URL = os.getenv("ASYNC_DB_URL")
+
+# Engines and session factories are built on first use: importing this module
+# loads neither SQLAlchemy's engine machinery nor the database driver, and
+# never fails when DB_URL is unset (tests, CLI --help, worker spawn).
+_engine = None
+_sessionmaker = None
+_async_engine = None
+_async_sessionmaker = None
+# The metadata-refresh thread and the main loop may both ask for the engine first
+_engine_lock = threading.Lock()
+
+
+def _pool_options() -> dict:
+    return {
+        "pool_pre_ping": True,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "query_cache_size": DB_QUERY_CACHE_SIZE,
+    }
+
+
+def get_engine():
+    global _engine, _sessionmaker
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                from sqlalchemy import create_engine
+                from sqlalchemy.orm import sessionmaker
+                from app.services.profiling import profiler
+
+                engine = create_engine(DB_URL, future=True, **_pool_options())
+                # Statement timings are only recorded while a cycle is being profiled
+                profiler.attach_to_engine(engine)
+                # Publish the engine last, so a thread that sees it also sees the session factory
+                _sessionmaker = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+                _engine = engine
+    return _engine
+
+
+def __getattr__(name: str):
+    # Keeps `from app.db import engine, SessionLocal` working without eager creation
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        get_engine()
+        return _sessionmaker
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 @contextmanager
 def get_session():
-    session = SessionLocal()
+    get_engine()
+    session = _sessionmaker()
     try:
         yield session
     finally:
         session.close()
+
+
+def async_db_url(url: Optional[str] = None) -> str:
+    """ASYNC_DB_URL, or DB_URL switched to the psycopg 3 driver (which supports asyncio)."""
+    from sqlalchemy.engine import make_url
+
+    if url is None and ASYNC_DB_URL:
+        return ASYNC_DB_URL
+    return make_url(url or DB_URL).set(drivername="postgresql+psycopg").render_as_string(hide_password=False)
+
+
+def get_async_engine():
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        from app.services.profiling import profiler
+
+        prepare_threshold = None if DB_PREPARE_THRESHOLD.lower() == "none" else int(DB_PREPARE_THRESHOLD)
+        _async_engine = create_async_engine(
+            async_db_url(),
+            connect_args={"prepare_threshold": prepare_threshold},
+            **_pool_options(),
+        )
+        profiler.attach_to_engine(_async_engine.sync_engine)
+        _async_sessionmaker = async_sessionmaker(
+            bind=_async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_engine
+
+
+@asynccontextmanager
+async def get_async_session():
+    get_async_engine()
+    async with _async_sessionmaker() as session:
+        yield session
+
+
+async def dispose_async_engine():
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_sessionmaker = None
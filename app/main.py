@@ -1,39 +1,60 @@
 import logging
+import os
 import time
 import uuid
 
 from app.crud.rec_event import insert_rec_events
 from app.services.category_sync import sync_categories_from_youtube
-from app.services.video_processing import process_and_insert_video_from_json
-from app.services.channel_processing import process_and_insert_channels_from_videos
-from app.services.youtube_api_caller import fetch_video_data_from_urls, get_video_id_from_url
+from app.services.video_processing import store_video_rows
+from app.services.channel_processing import process_and_insert_channels
+from app.services.youtube_api_caller import fetch_video_rows, fetch_video_rows_from_urls, get_video_id_from_url
 from app.services.yt_agent import run_yt_agent
-from app.db import get_session
+from app.db import get_engine, get_session
 from app.services.exceptions import QuotaExceededError
+from app.services import id_cache
+from app.services.seen_index import SEEN_INDEX_PATH, load_or_build_seen_index, partition_video_ids
+from app.services.metadata_refresh import MetadataRefresher
+from app.services.instrumentation import metrics, start_metrics_server
+from app.services.coordination import CATEGORY_SYNC_LOCK, METADATA_REFRESH_LOCK, Coordinator
+from app.services.quota import PostgresQuotaLedger, quota
+from app.services.scheduler import CycleScheduler
+from app.services.profiling import profiler
 
 logging.basicConfig(level=logging.INFO)
 
 
-def is_video_data_valid(video_data: dict) -> bool:
-    if not video_data or not isinstance(video_data, dict):
-        return False
+def fetch_video_rows_coordinated(session, recommendations: list[dict], coordinator: Coordinator):
+    """
+    Fetch only the videos this worker managed to claim. IDs claimed by other
+    workers are waited for until their claims are released; IDs whose claims
+    expired instead are claimed and fetched here. Returns the rows and the IDs
+    whose claims the caller must release.
+    """
+    unique_ids = {get_video_id_from_url(rec["url"]) for rec in recommendations}
+    claimed_ids = coordinator.claim_videos(session, unique_ids)
+    foreign_ids = unique_ids - claimed_ids
+    logging.info(f"Claimed {len(claimed_ids)} of {len(unique_ids)} videos; {len(foreign_ids)} in flight on other workers.")
+    metrics.increment("fetch_claims", len(claimed_ids), outcome="claimed")
+    metrics.increment("fetch_claims", len(foreign_ids), outcome="deferred")
 
-    required_keys = ['id', 'snippet', 'statistics', 'contentDetails']
-    if not all(key in video_data for key in required_keys):
-        logging.warning(f"Validation failed: Missing one of the required keys: {required_keys} in video data.")
-        return False
-
-    if 'title' not in video_data.get('snippet', {}):
-        logging.warning("Validation failed: Missing 'title' in snippet.")
-        return False
-    if 'channelId' not in video_data.get('snippet', {}):
-        logging.warning("Validation failed: Missing 'channelId' in snippet.")
-        return False
-
-    return True
-
-
-def gather_recommendations_insert_into_db(session, videos_to_click: int = 3, headless: bool = True):
+    try:
+        video_rows = fetch_video_rows(sorted(claimed_ids)) if claimed_ids else []
+        if foreign_ids:
+            abandoned_ids = coordinator.wait_for_claims(session, foreign_ids)
+            if abandoned_ids:
+                taken_ids = coordinator.claim_videos(session, abandoned_ids)
+                claimed_ids |= taken_ids
+                logging.warning(f"{len(abandoned_ids)} claims expired on other workers; fetching {len(taken_ids)} of those videos here.")
+                metrics.increment("fetch_claims", len(taken_ids), outcome="expired")
+                if taken_ids:
+                    video_rows += fetch_video_rows(sorted(taken_ids))
+    except Exception:
+        coordinator.release_videos(session, claimed_ids)
+        raise
+    return video_rows, claimed_ids
+
+
+def gather_recommendations_insert_into_db(session, videos_to_click: int = 3, headless: bool = True, seen_index=None, coordinator: Coordinator | None = None):
     logging.info(f"Starting new data gathering cycle with {videos_to_click} videos to click.")
     run_id = uuid.uuid4()
 
@@ -43,32 +64,51 @@ def gather_recommendations_insert_into_db(session, videos_to_click: int = 3, hea
         return
 
     logging.info(f"Successfully gathered {len(recommendations)} video recommendations. Fetching data...")
-    json_response = fetch_video_data_from_urls(recommendations)
-    if not json_response or 'items' not in json_response:
-        logging.warning("Could not fetch video data from YouTube API or data is malformed. Skipping this cycle.")
+    metrics.increment("recommendations", len(recommendations))
+    new_video_ids = set()
+    if seen_index is not None:
+        recommended_ids = {get_video_id_from_url(rec["url"]) for rec in recommendations}
+        new_video_ids, maybe_known_ids = partition_video_ids(seen_index, recommended_ids)
+        logging.info(f"Seen-video index: {len(new_video_ids)} definitely new, {len(maybe_known_ids)} maybe known.")
+        metrics.increment("videos_seen", len(new_video_ids), index="new")
+        metrics.increment("videos_seen", len(maybe_known_ids), index="maybe_known")
+
+    claimed_ids = set()
+    with metrics.stage("api_fetch"):
+        if coordinator is None:
+            video_rows = fetch_video_rows_from_urls(recommendations)
+        else:
+            video_rows, claimed_ids = fetch_video_rows_coordinated(session, recommendations, coordinator)
+    if not video_rows and coordinator is None:
+        logging.warning("No valid video data received from YouTube API. Skipping this cycle.")
         return
+    logging.info(f"Received {len(video_rows)} valid video rows from API.")
 
-    video_data_list = json_response['items']
-    logging.info(f"Received {len(video_data_list)} video data items from API.")
-
-    valid_video_data = [data for data in video_data_list if is_video_data_valid(data)]
-    if not valid_video_data:
-        logging.warning("No valid video data found after validation. Skipping insertion.")
-        return
-    
     logging.info("Processing and inserting channels for videos...")
     try:
-        process_and_insert_channels_from_videos(session, valid_video_data)
+        with metrics.stage("channel_ingest"):
+            inserted_channels = process_and_insert_channels(session, {row.channel_id for row in video_rows})
+        metrics.increment("db_rows", inserted_channels, table="channels")
     except Exception as e:
         logging.error(f"Failed to process channels: {e}")
 
+    logging.info(f"Bulk inserting {len(video_rows)} videos...")
+    stored_ids = []
+    try:
+        with metrics.stage("video_ingest"):
+            stored_ids = store_video_rows(session, video_rows, new_ids=new_video_ids)
+        metrics.increment("db_rows", len(stored_ids), table="videos")
+    except Exception as e:
+        session.rollback()
+        logging.error(f"Failed to insert videos: {e}")
+    finally:
+        if claimed_ids:
+            coordinator.release_videos(session, claimed_ids)
 
-    logging.info(f"Found {len(valid_video_data)} valid videos to insert. Processing and inserting...")
-    for video_data in valid_video_data:
-        try:
-            process_and_insert_video_from_json(session, video_data)
-        except Exception as e:
-            logging.error(f"Failed to process and insert video {video_data.get('id')}: {e}")
+    inserted_new_ids = [video_id for video_id in stored_ids if video_id in new_video_ids]
+    if seen_index is not None and inserted_new_ids:
+        seen_index.update(inserted_new_ids)
+        seen_index.save(SEEN_INDEX_PATH)
 
     logging.info("Creating recommendation events...")
     rec_events = [
@@ -83,35 +123,86 @@ def gather_recommendations_insert_into_db(session, videos_to_click: int = 3, hea
     ]
 
     try:
-        insert_rec_events(session, rec_events)
+        with metrics.stage("rec_event_insert"):
+            insert_rec_events(session, rec_events)
+        metrics.increment("db_rows", len(rec_events), table="rec_events")
     except Exception as e:
         logging.error(f"Failed to insert recommendation events: {e}")
 
     logging.info(f"Completed processing and inserting {len(rec_events)} recommendation events into the database.")
+    for stats in id_cache.all_stats():
+        logging.info(f"ID cache {stats['name']}: size={stats['size']} hits={stats['hits']} misses={stats['misses']}")
 
 
-def main_loop(initial_wait_seconds: int = 5, error_wait_seconds: int = 60, quota_wait_hours: int = 6, headless: bool = True):
+def main_loop(initial_wait_seconds: int = 5, headless: bool = True, refresh_metadata: bool = True, coordinator: Coordinator | None = None, scheduler: CycleScheduler | None = None):
     logging.info("--- Starting Main Application Loop ---")
     time.sleep(initial_wait_seconds)
-    quota_wait_seconds = quota_wait_hours * 3600
+    # With several workers only the holder of the refresh lease runs the refresher
+    refresh_lease = coordinator.lease(METADATA_REFRESH_LOCK) if coordinator is not None and refresh_metadata else None
+    if refresh_metadata and refresh_lease is None:
+        MetadataRefresher().start()
+    start_metrics_server()
+    profiler.install_signal_handler()
+    scheduler = scheduler or CycleScheduler()
+    seen_index = None
 
     while True:
+        metrics.begin_cycle()
         try:
+            if refresh_lease is not None and not refresh_lease.is_held and refresh_lease.try_acquire():
+                logging.info(f"Worker {coordinator.worker_id} holds the metadata refresh lease.")
+                MetadataRefresher().start()
             with get_session() as session:
-                gather_recommendations_insert_into_db(session, videos_to_click=30, headless=headless)
-            logging.info(f"Cycle finished. Waiting for {error_wait_seconds} seconds before next run.")
-            time.sleep(error_wait_seconds)
+                if seen_index is None:
+                    seen_index = load_or_build_seen_index(session)
+                with profiler.profile("cycle"):
+                    gather_recommendations_insert_into_db(session, videos_to_click=30, headless=headless, seen_index=seen_index, coordinator=coordinator)
+            cycle = metrics.end_cycle("ok")
+            decision = scheduler.after_success(cycle["duration_seconds"], cycle["api_units"])
+            logging.info(f"Cycle finished. Next run in {decision.delay_seconds:.0f} seconds ({decision.reason}).")
         except QuotaExceededError as e:
+            metrics.end_cycle("quota_exceeded")
             logging.error(f"YouTube API quota exceeded: {e}")
-            logging.info(f"Application will sleep for {quota_wait_hours} hours before retrying.")
-            time.sleep(quota_wait_seconds)
+            decision = scheduler.after_quota_exceeded()
+            logging.info(f"Application will sleep for {decision.delay_seconds / 3600:.1f} hours until the quota resets.")
         except Exception as e:
+            metrics.end_cycle("error")
             logging.error(f"An unexpected error occurred in the main loop: {e}", exc_info=True)
-            logging.info(f"Restarting loop after a {error_wait_seconds} second delay...")
-            time.sleep(error_wait_seconds)
+            decision = scheduler.after_failure()
+            logging.info(f"Restarting loop after a {decision.delay_seconds:.0f} second delay (failure {scheduler.consecutive_failures})...")
+        time.sleep(decision.delay_seconds)
+
+
+def run_worker(worker_id: str | None = None, headless: bool = True):
+    """
+    Run one collector worker that shares quota, category sync and API fetches
+    with the other workers on the same database.
+    """
+    engine = get_engine()
+    coordinator = Coordinator(engine, worker_id=worker_id)
+    quota.use_ledger(PostgresQuotaLedger(engine))
+    logging.info(f"Starting collector worker {coordinator.worker_id}.")
+    if not coordinator.presence.try_acquire():
+        logging.warning(f"Another process already runs as worker {coordinator.worker_id}.")
+
+    category_lease = coordinator.lease(CATEGORY_SYNC_LOCK)
+    if category_lease.try_acquire():
+        try:
+            with get_session() as session:
+                sync_categories_from_youtube(session)
+                coordinator.prune_claims(session)
+        finally:
+            category_lease.release()
+    else:
+        logging.info("Another worker is syncing categories; skipping.")
+
+    main_loop(headless=headless, coordinator=coordinator, scheduler=CycleScheduler(worker_count=coordinator.live_workers))
 
 
 if __name__ == "__main__":
-    with get_session() as session:
-        sync_categories_from_youtube(session)
-    main_loop(headless=True)
+    if os.getenv("COLLECTOR_COORDINATION"):
+        run_worker(headless=True)
+    else:
+        with get_session() as session:
+            sync_categories_from_youtube(session)
+        main_loop(headless=True)
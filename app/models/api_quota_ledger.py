@@ -0,0 +1,19 @@
+from __future__ import annotations
+from datetime import date, datetime
+from sqlalchemy import Date, DateTime, Integer, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base
+
+
+class ApiQuotaLedger(Base):
+    """YouTube API units spent per quota day, shared by all collector workers."""
+    __tablename__ = "api_quota_ledger"
+
+    # Primary key — quota day in Pacific time (when YouTube resets quotas)
+    quota_day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    units_spent: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Text, Integer, BigInteger, DateTime, Index, ForeignKey
+from sqlalchemy import String, Text, Integer, BigInteger, DateTime, Index, ForeignKey, func
 from sqlalchemy.dialects.postgresql import ARRAY
 from .base import Base
 from datetime import datetime
@@ -41,5 +41,14 @@ class Video(Base):
     like_count: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     comment_count: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
 
+    # When metadata was last fetched from the API (NULL = before tracking began)
+    metadata_refreshed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=True
+    )
+
+    # Number of rec_events for this video, kept up to date by insert_rec_events
+    rec_count: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+
 Index("ix_videos_channel_id", Video.channel_id)
-Index("ix_videos_published_at", Video.published_at)
\ No newline at end of file
+Index("ix_videos_published_at", Video.published_at)
+Index("ix_videos_metadata_refreshed_at", Video.metadata_refreshed_at)
\ No newline at end of file
@@ -0,0 +1,21 @@
+from __future__ import annotations
+from datetime import datetime
+from sqlalchemy import DateTime, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base
+
+
+class VideoFetchClaim(Base):
+    """A video ID one collector worker is currently fetching from the API."""
+    __tablename__ = "video_fetch_claims"
+
+    # Primary key — the claimed YouTube video ID
+    video_id: Mapped[str] = mapped_column(String(32), primary_key=True)
+
+    # Worker holding the claim
+    worker_id: Mapped[str] = mapped_column(String(128), nullable=False)
+
+    # Claims older than the TTL are treated as abandoned (crashed worker)
+    claimed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
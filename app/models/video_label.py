@@ -0,0 +1,36 @@
+from __future__ import annotations
+from datetime import datetime
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, SmallInteger, String, false, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models.base import Base
+
+
+class VideoLabel(Base):
+    """Persisted political label for a single video."""
+    __tablename__ = "video_labels"
+
+    # Primary key — one label row per video
+    video_id: Mapped[str] = mapped_column(
+        String(32), ForeignKey("videos.video_id", ondelete="CASCADE"), primary_key=True
+    )
+
+    # Individual signals (see analysis.political_labeling.SIGNAL_COLUMNS)
+    signal_category: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
+    signal_topic: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
+    signal_channel_topic: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
+    signal_title: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
+    signal_description: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
+    signal_tags: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
+
+    # Number of political signals that fired (0-6)
+    signal_count: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=0)
+
+    # labeling_config_hash() of the configuration that produced this row (NULL = before tracking began)
+    config_hash: Mapped[str | None] = mapped_column(String(16), nullable=True)
+
+    # When the label was computed
+    labeled_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+Index("ix_video_labels_config_hash", VideoLabel.config_hash)
@@ -0,0 +1,152 @@
+from __future__ import annotations
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+RESTART_BACKOFF_SECONDS = 5
+MAX_RESTART_BACKOFF_SECONDS = 600
+# A worker that stays up this long is considered healthy again
+STABLE_AFTER_SECONDS = 300
+POLL_SECONDS = 1.0
+
+
+def worker_env(index: int, base_env: Optional[dict] = None) -> dict:
+    """Per-worker settings so workers on one host don't share ports or files."""
+    base_env = os.environ if base_env is None else base_env
+    metrics_port = int(base_env.get("METRICS_PORT", "9108"))
+    seen_index_path = base_env.get("SEEN_INDEX_PATH", "seen_videos.bloom")
+    root, ext = os.path.splitext(seen_index_path)
+    return {
+        "COLLECTOR_COORDINATION": "1",
+        "COLLECTOR_WORKER_ID": f"{socket.gethostname()}-w{index}",
+        "METRICS_PORT": str(metrics_port + index if metrics_port >= 0 else metrics_port),
+        "SEEN_INDEX_PATH": f"{root}.w{index}{ext}",
+    }
+
+
+def _worker_main(index: int, headless: bool):
+    # Env must be in place before app.main pulls in modules that read it at import
+    os.environ.update(worker_env(index))
+    logging.basicConfig(level=logging.INFO)
+    from app.main import run_worker
+
+    run_worker(os.environ["COLLECTOR_WORKER_ID"], headless=headless)
+
+
+def _spawn_process(index: int, headless: bool):
+    ctx = multiprocessing.get_context("spawn")
+    return ctx.Process(target=_worker_main, args=(index, headless), name=f"collector-w{index}")
+
+
+@dataclass
+class WorkerSlot:
+    index: int
+    process: object = None
+    started_at: float = 0.0
+    failures: int = 0
+    restart_at: Optional[float] = None
+
+
+class Supervisor:
+    """
+    Keeps N collector worker processes running. A worker that exits is
+    restarted on its own with exponential backoff; the others are untouched.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        headless: bool = True,
+        process_factory: Callable = _spawn_process,
+        clock: Callable[[], float] = time.monotonic,
+        backoff_seconds: float = RESTART_BACKOFF_SECONDS,
+        max_backoff_seconds: float = MAX_RESTART_BACKOFF_SECONDS,
+    ):
+        self.headless = headless
+        self.process_factory = process_factory
+        self.clock = clock
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.slots = [WorkerSlot(index) for index in range(workers)]
+        self._stopping = False
+
+    def _start(self, slot: WorkerSlot):
+        slot.process = self.process_factory(slot.index, self.headless)
+        slot.process.start()
+        slot.started_at = self.clock()
+        slot.restart_at = None
+        logger.info(f"Started worker {slot.index} (pid {slot.process.pid}).")
+
+    def backoff_for(self, failures: int) -> float:
+        return min(self.max_backoff_seconds, self.backoff_seconds * 2 ** max(0, failures - 1))
+
+    def start(self):
+        for slot in self.slots:
+            self._start(slot)
+
+    def poll(self):
+        """Run one supervision step: notice exits and restart workers whose backoff elapsed."""
+        now = self.clock()
+        for slot in self.slots:
+            if slot.restart_at is not None:
+                if now >= slot.restart_at and not self._stopping:
+                    self._start(slot)
+                continue
+            if slot.process is None or slot.process.is_alive():
+                continue
+
+            if now - slot.started_at >= STABLE_AFTER_SECONDS:
+                slot.failures = 0
+            slot.failures += 1
+            delay = self.backoff_for(slot.failures)
+            slot.restart_at = now + delay
+            logger.warning(
+                f"Worker {slot.index} exited with code {slot.process.exitcode}; "
+                f"restarting in {delay:.0f}s (failure {slot.failures})."
+            )
+
+    def stop(self, timeout: float = 30):
+        self._stopping = True
+        for slot in self.slots:
+            if slot.process is not None and slot.process.is_alive():
+                slot.process.terminate()
+        for slot in self.slots:
+            if slot.process is not None:
+                slot.process.join(timeout)
+
+    def run(self):
+        def _handle_signal(signum, frame):
+            logger.info(f"Received signal {signum}, stopping workers.")
+            self._stopping = True
+
+        signal.signal(signal.SIGTERM, _handle_signal)
+        signal.signal(signal.SIGINT, _handle_signal)
+        self.start()
+        try:
+            while not self._stopping:
+                self.poll()
+                time.sleep(POLL_SECONDS)
+        finally:
+            self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several coordinated collector workers.")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("COLLECTOR_WORKERS", "2")))
+    parser.add_argument("--headed", action="store_true", help="Show the browser windows")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    Supervisor(args.workers, headless=not args.headed).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,37 @@
 from __future__ import annotations
 import logging
+import os
+import time
+from typing import Optional
+
 from sqlalchemy.orm import Session
 from app.services.youtube_api_caller import fetch_youtube_categories
 
 from app.models.category import Category
-from app.crud.category import get_category_by_name
+from app.services import id_cache
 
 logger = logging.getLogger(__name__)
 
+# A video with an unknown category triggers a re-sync at most this often
+CATEGORY_RESYNC_SECONDS = int(os.getenv("CATEGORY_RESYNC_SECONDS", "3600"))
+_last_resync_at: Optional[float] = None
+_last_resync_ok = False
+
 
-def sync_categories_from_youtube(session: Session):
+def sync_categories_from_youtube(session: Session) -> bool:
+    """Add categories the API lists and the table lacks. Returns False if the API call failed."""
     logger.info("Starting category population from YouTube API (adds missing only)...")
     try:
         api_response = fetch_youtube_categories()
         api_categories_raw = api_response.get('items', [])
     except Exception as e:
         logger.error(f"Could not fetch or parse categories from YouTube API: {e}")
-        return
+        return False
+
+    id_cache.ensure_categories_loaded(session)
 
     processed_names = set()
+    added = []
 
     for cat_item in api_categories_raw:
         cat_id = int(cat_item['id'])
@@ -27,24 +40,47 @@ def sync_categories_from_youtube(session: Session):
         if cat_name in processed_names:
             continue
 
-        existing_category = get_category_by_name(session, cat_name)
+        existing_id = id_cache.category_ids_by_name.get(cat_name)
 
-        if existing_category:
-            if existing_category.id != cat_id:
+        if existing_id is not None:
+            if existing_id != cat_id:
                 logger.warning(
-                    f"Category '{cat_name}' already exists with ID {existing_category.id}, "
+                    f"Category '{cat_name}' already exists with ID {existing_id}, "
                     f"but API returned new ID {cat_id}. Skipping update to avoid conflicts."
                 )
         else:
             new_category = Category(id=cat_id, name=cat_name)
             session.add(new_category)
             processed_names.add(cat_name)
+            added.append((cat_id, cat_name))
             logger.info(f"New category found: ID={cat_id}, Name='{cat_name}'. Adding to DB.")
 
     try:
         session.commit()
+        for cat_id, cat_name in added:
+            id_cache.remember_category(cat_id, cat_name)
         logger.info("--- Category Sync Finished ---")
+        return True
     except Exception as e:
         logger.error(f"An error occurred during category sync commit: {e}", exc_info=True)
         session.rollback()
+        for cat_id, cat_name in added:
+            id_cache.forget_category(cat_id, cat_name)
         raise
+
+
+def resync_categories(session: Session) -> bool:
+    """
+    Sync categories again because a video referenced one the table lacks, at
+    most once per CATEGORY_RESYNC_SECONDS. Returns whether the latest sync
+    succeeded, i.e. whether the table now holds every category the API lists.
+    """
+    global _last_resync_at, _last_resync_ok
+    now = time.monotonic()
+    if _last_resync_at is None or now - _last_resync_at >= CATEGORY_RESYNC_SECONDS:
+        _last_resync_at = now
+        try:
+            _last_resync_ok = sync_categories_from_youtube(session)
+        except Exception:
+            _last_resync_ok = False
+    return _last_resync_ok
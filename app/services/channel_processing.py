@@ -1,6 +1,7 @@
 import logging
 from sqlalchemy.orm import Session
-from app.crud.channel import get_channel_by_id, upsert_channel
+from app.crud.channel import get_existing_channel_ids, upsert_channel
+from app.services import id_cache
 from app.services.youtube_api_caller import fetch_channel_details
 
 logger = logging.getLogger(__name__)
@@ -14,18 +15,26 @@ def process_and_insert_channels_from_videos(session: Session, video_data_list: l
         if channel_id:
             channel_ids.add(channel_id)
 
+    return process_and_insert_channels(session, channel_ids)
+
+
+def process_and_insert_channels(session: Session, channel_ids: set[str]) -> int:
+    """Fetch and insert any channels not yet stored. Returns the number inserted."""
+    channel_ids = {channel_id for channel_id in channel_ids if channel_id}
     if not channel_ids:
         logger.warning("No channel IDs found in video data")
-        return
+        return 0
+
+    uncached_ids = [channel_id for channel_id in channel_ids if channel_id not in id_cache.channel_ids]
+    existing_ids = get_existing_channel_ids(session, uncached_ids)
+    for channel_id in existing_ids:
+        id_cache.channel_ids.put(channel_id)
 
-    new_channel_ids = []
-    for channel_id in channel_ids:
-        if not get_channel_by_id(session, channel_id):
-            new_channel_ids.append(channel_id)
+    new_channel_ids = [channel_id for channel_id in uncached_ids if channel_id not in existing_ids]
 
     if not new_channel_ids:
         logger.info("All channels already exist in database. No new channels to fetch.")
-        return
+        return 0
 
     logger.info(f"Found {len(new_channel_ids)} new channels to fetch from YouTube API")
 
@@ -35,7 +44,7 @@ def process_and_insert_channels_from_videos(session: Session, video_data_list: l
 
         if not items:
             logger.warning("No channel data returned from YouTube API")
-            return
+            return 0
 
         logger.info(f"Fetched {len(items)} channels from YouTube API. Inserting into database...")
 
@@ -55,13 +64,16 @@ def process_and_insert_channels_from_videos(session: Session, video_data_list: l
                 }
 
                 upsert_channel(session, channel_data)
+                id_cache.channel_ids.put(channel_id)
                 inserted_count += 1
 
             except Exception as e:
+                id_cache.channel_ids.invalidate(item.get('id'))
                 logger.error(f"Failed to insert channel {item.get('id')}: {e}")
                 continue
 
         logger.info(f"Successfully inserted {inserted_count} channels into database")
+        return inserted_count
 
     except Exception as e:
         logger.error(f"Error fetching channel details from YouTube API: {e}")
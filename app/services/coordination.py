@@ -0,0 +1,162 @@
+from __future__ import annotations
+import logging
+import os
+import socket
+import time
+import zlib
+from typing import Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.crud.fetch_claim import claim_video_ids, delete_expired_claims, foreign_claims, release_video_ids
+
+logger = logging.getLogger(__name__)
+
+CLAIM_TTL_SECONDS = int(os.getenv("FETCH_CLAIM_TTL_SECONDS", "600"))
+CLAIM_WAIT_SECONDS = int(os.getenv("FETCH_CLAIM_WAIT_SECONDS", "120"))
+CLAIM_POLL_SECONDS = 5
+
+
+def advisory_key(name: str) -> int:
+    """Stable key for pg advisory locks, shared by every worker."""
+    return zlib.crc32(f"yt-collector:{name}".encode("utf-8"))
+
+
+CATEGORY_SYNC_LOCK = advisory_key("category_sync")
+METADATA_REFRESH_LOCK = advisory_key("metadata_refresh")
+# Every live worker holds an advisory lock keyed (WORKER_LOCK_CLASS, crc32(worker_id));
+# the bigint key puts the class in the high 32 bits, which pg_locks reports as classid
+WORKER_LOCK_CLASS = advisory_key("workers") & 0x7FFFFFFF
+
+
+def worker_lock_key(worker_id: str) -> int:
+    return (WORKER_LOCK_CLASS << 32) | zlib.crc32(worker_id.encode("utf-8"))
+
+
+def default_worker_id() -> str:
+    return os.getenv("COLLECTOR_WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+
+
+class AdvisoryLease:
+    """
+    Session-level pg advisory lock held on a dedicated connection.
+
+    The lease lasts until release() or until the connection drops, so a
+    crashed worker's leadership passes to the next worker that asks.
+    """
+
+    def __init__(self, engine, key: int):
+        self.engine = engine
+        self.key = key
+        self._conn = None
+
+    @property
+    def is_held(self) -> bool:
+        return self._conn is not None
+
+    def try_acquire(self) -> bool:
+        if self._conn is not None:
+            return True
+        conn = self.engine.connect()
+        try:
+            acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        if not acquired:
+            conn.close()
+            return False
+        self._conn = conn
+        return True
+
+    def release(self):
+        if self._conn is None:
+            return
+        try:
+            self._conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            self._conn.commit()
+        finally:
+            self._conn.close()
+            self._conn = None
+
+
+class Coordinator:
+    """
+    Splits API fetches between collector workers sharing one database.
+
+    Before fetching, a worker claims the video IDs in video_fetch_claims; IDs
+    claimed by another worker are left to it until it releases them. Claims older than claim_ttl_seconds are treated as
+    abandoned by a crashed worker and can be taken over.
+    """
+
+    def __init__(
+        self,
+        engine,
+        worker_id: Optional[str] = None,
+        claim_ttl_seconds: int = CLAIM_TTL_SECONDS,
+        wait_timeout_seconds: int = CLAIM_WAIT_SECONDS,
+        poll_seconds: float = CLAIM_POLL_SECONDS,
+    ):
+        self.engine = engine
+        self.worker_id = worker_id or default_worker_id()
+        self.claim_ttl_seconds = claim_ttl_seconds
+        self.wait_timeout_seconds = wait_timeout_seconds
+        self.poll_seconds = poll_seconds
+        self.presence = AdvisoryLease(engine, worker_lock_key(self.worker_id))
+        self._live_workers = 1
+
+    def lease(self, key: int) -> AdvisoryLease:
+        return AdvisoryLease(self.engine, key)
+
+    def live_workers(self) -> int:
+        """
+        Number of workers holding a presence lease on this database, at least
+        1. A worker's lease goes with its connection, so crashed workers drop
+        out. The last known count is kept if the database can't be reached.
+        """
+        try:
+            with self.engine.connect() as conn:
+                count = conn.execute(text(
+                    "SELECT count(*) FROM pg_locks"
+                    " WHERE locktype = 'advisory' AND granted AND classid = :cls AND objsubid = 1"
+                    " AND database = (SELECT oid FROM pg_database WHERE datname = current_database())"
+                ), {"cls": WORKER_LOCK_CLASS}).scalar()
+            self._live_workers = max(1, int(count))
+        except SQLAlchemyError as e:
+            logger.warning(f"Could not count live workers, assuming {self._live_workers}: {e}")
+        return self._live_workers
+
+    def claim_videos(self, session: Session, video_ids: Iterable[str]) -> set[str]:
+        return claim_video_ids(session, video_ids, self.worker_id, self.claim_ttl_seconds)
+
+    def release_videos(self, session: Session, video_ids: Iterable[str]) -> int:
+        return release_video_ids(session, video_ids, self.worker_id)
+
+    def prune_claims(self, session: Session) -> int:
+        return delete_expired_claims(session, self.claim_ttl_seconds)
+
+    def wait_for_claims(self, session: Session, video_ids: Iterable[str]) -> set[str]:
+        """
+        Poll until no other worker holds a live claim on video_ids or the wait
+        times out. A released claim ends the wait for its ID whether or not the
+        video was stored, since the API returns nothing for deleted, private or
+        invalid videos. Returns the IDs whose claims expired instead, i.e. were
+        abandoned by a crashed worker; the caller should claim and fetch those.
+        """
+        pending = set(video_ids)
+        expired = set()
+        deadline = time.monotonic() + self.wait_timeout_seconds
+        while pending:
+            claims = foreign_claims(session, pending, self.worker_id, self.claim_ttl_seconds)
+            session.commit()
+            expired |= {video_id for video_id, live in claims.items() if not live}
+            pending = {video_id for video_id, live in claims.items() if live}
+            if not pending or time.monotonic() >= deadline:
+                break
+            time.sleep(self.poll_seconds)
+        if pending:
+            logger.warning(f"{len(pending)} videos still claimed by other workers after {self.wait_timeout_seconds}s; leaving them to their owners.")
+        return expired
@@ -0,0 +1,130 @@
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.crud.category import get_category_by_id, list_categories
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Small thread-safe LRU map with hit/miss counters.
+
+    Used as a process-wide cache of IDs known to exist in Postgres so steady
+    state lookups don't need a roundtrip.
+    """
+
+    def __init__(self, name: str, maxsize: int):
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def put(self, key: Hashable, value: Any = True):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Channel IDs known to exist in the channels table
+channel_ids = LRUCache("channel_ids", maxsize=100_000)
+
+# Category name -> id and id -> name for rows in the categories table
+category_ids_by_name = LRUCache("category_ids_by_name", maxsize=1_000)
+category_names_by_id = LRUCache("category_names_by_id", maxsize=1_000)
+# Category IDs looked up and not found, so repeats don't go back to Postgres
+unknown_category_ids = LRUCache("unknown_category_ids", maxsize=1_000)
+_categories_loaded = False
+
+
+def remember_category(category_id: int, name: str):
+    category_ids_by_name.put(name, category_id)
+    category_names_by_id.put(category_id, name)
+    unknown_category_ids.invalidate(category_id)
+
+
+def forget_category(category_id: Optional[int] = None, name: Optional[str] = None):
+    if name is not None:
+        category_ids_by_name.invalidate(name)
+    if category_id is not None:
+        category_names_by_id.invalidate(category_id)
+
+
+def ensure_categories_loaded(session: Session):
+    """Load the whole categories table into the cache once per process."""
+    global _categories_loaded
+    if _categories_loaded:
+        return
+    for category in list_categories(session):
+        remember_category(category.id, category.name)
+    _categories_loaded = True
+
+
+def is_known_category_id(session: Session, category_id: int) -> bool:
+    ensure_categories_loaded(session)
+    if category_id in category_names_by_id:
+        return True
+    if category_id in unknown_category_ids:
+        return False
+    category = get_category_by_id(session, category_id)
+    if category is None:
+        unknown_category_ids.put(category_id)
+        return False
+    remember_category(category.id, category.name)
+    return True
+
+
+def all_stats() -> list[dict]:
+    return [cache.stats() for cache in (channel_ids, category_ids_by_name, category_names_by_id, unknown_category_ids)]
+
+
+def clear_all():
+    global _categories_loaded
+    _categories_loaded = False
+    for cache in (channel_ids, category_ids_by_name, category_names_by_id, unknown_category_ids):
+        cache.clear()
@@ -0,0 +1,182 @@
+from __future__ import annotations
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+METRIC_PREFIX = "yt_collector"
+
+# Stages timed by the collector, in pipeline order
+STAGES = (
+    "browser_launch",
+    "page_load",
+    "extraction",
+    "api_fetch",
+    "channel_ingest",
+    "video_ingest",
+    "rec_event_insert",
+)
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key: tuple) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in key) + "}"
+
+
+class CollectorMetrics:
+    """
+    Process-wide timings and counters for the collector.
+
+    Totals accumulate for the life of the process and are exposed in
+    Prometheus text format; a per-cycle view is reset by begin_cycle and
+    logged as one JSON line by end_cycle.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stage_seconds: dict[str, float] = {}
+        self._stage_count: dict[str, int] = {}
+        self._stage_max: dict[str, float] = {}
+        self._counters: dict[tuple[str, tuple], float] = {}
+        self._gauges: dict[tuple[str, tuple], float] = {}
+        self._cycle_started: Optional[float] = None
+        self._cycle_stages: dict[str, float] = {}
+        self._cycle_counters: dict[tuple[str, tuple], float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(name, time.perf_counter() - start)
+
+    def observe_stage(self, name: str, seconds: float):
+        with self._lock:
+            self._stage_seconds[name] = self._stage_seconds.get(name, 0.0) + seconds
+            self._stage_count[name] = self._stage_count.get(name, 0) + 1
+            self._stage_max[name] = max(self._stage_max.get(name, 0.0), seconds)
+            self._cycle_stages[name] = self._cycle_stages.get(name, 0.0) + seconds
+
+    def increment(self, name: str, value: float = 1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+            self._cycle_counters[key] = self._cycle_counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+
+    def counter_value(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def begin_cycle(self):
+        with self._lock:
+            self._cycle_started = time.perf_counter()
+            self._cycle_stages = {}
+            self._cycle_counters = {}
+
+    def _cycle_total(self, name: str, **labels) -> float:
+        wanted = set(labels.items())
+        return sum(
+            value for (counter, key), value in self._cycle_counters.items()
+            if counter == name and wanted <= set(key)
+        )
+
+    def end_cycle(self, status: str = "ok") -> dict:
+        """Close the current cycle, update last-cycle gauges and log it as one JSON line."""
+        with self._lock:
+            started = self._cycle_started if self._cycle_started is not None else time.perf_counter()
+            duration = time.perf_counter() - started
+            recommendations = self._cycle_total("recommendations")
+            record = {
+                "event": "collector_cycle",
+                "status": status,
+                "duration_seconds": round(duration, 3),
+                "stages": {name: round(seconds, 3) for name, seconds in self._cycle_stages.items()},
+                "recommendations": int(recommendations),
+                "recs_per_minute": round(recommendations / duration * 60, 2) if duration > 0 else 0.0,
+                # Units the crawl itself spent; the scheduler paces on these alone
+                "api_units": int(self._cycle_total("api_units", source="crawl")),
+                "refresh_api_units": int(self._cycle_total("api_units", source="refresh")),
+                "db_rows": {
+                    dict(labels).get("table", ""): int(value)
+                    for (counter, labels), value in self._cycle_counters.items() if counter == "db_rows"
+                },
+            }
+            self._cycle_started = None
+
+        self.increment("cycles", status=status)
+        self.set_gauge("last_cycle_duration_seconds", record["duration_seconds"])
+        self.set_gauge("last_cycle_recs_per_minute", record["recs_per_minute"])
+        self.set_gauge("last_cycle_api_units", record["api_units"])
+        self.set_gauge("last_cycle_db_rows", sum(record["db_rows"].values()))
+        logger.info(json.dumps(record, sort_keys=True))
+        return record
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            lines = [
+                f"# HELP {METRIC_PREFIX}_stage_seconds Wall time spent in each collector stage.",
+                f"# TYPE {METRIC_PREFIX}_stage_seconds summary",
+            ]
+            for name in sorted(self._stage_seconds):
+                label = _format_labels((("stage", name),))
+                lines.append(f"{METRIC_PREFIX}_stage_seconds_sum{label} {self._stage_seconds[name]:.6f}")
+                lines.append(f"{METRIC_PREFIX}_stage_seconds_count{label} {self._stage_count[name]}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_stage_seconds_max gauge")
+            for name in sorted(self._stage_max):
+                label = _format_labels((("stage", name),))
+                lines.append(f"{METRIC_PREFIX}_stage_seconds_max{label} {self._stage_max[name]:.6f}")
+
+            for kind, values, suffix in (("counter", self._counters, "_total"), ("gauge", self._gauges, "")):
+                for name in sorted({name for name, _ in values}):
+                    lines.append(f"# TYPE {METRIC_PREFIX}_{name}{suffix} {kind}")
+                    for (metric, labels), value in sorted(values.items()):
+                        if metric == name:
+                            lines.append(f"{METRIC_PREFIX}_{name}{suffix}{_format_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = CollectorMetrics()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = METRICS_HOST) -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics on a daemon thread. Port 0 picks a free port; a negative port disables it."""
+    if port < 0:
+        return None
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"Serving collector metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
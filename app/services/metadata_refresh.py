@@ -0,0 +1,96 @@
+from __future__ import annotations
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from app.crud.video import list_stale_video_ids, touch_videos
+from app.db import get_session
+from app.services.exceptions import QuotaExceededError
+from app.services.quota import VIDEOS_LIST_COST, quota
+from app.services.video_processing import store_video_rows
+from app.services.youtube_api_caller import api_spend_source, fetch_video_rows
+
+logger = logging.getLogger(__name__)
+
+# videos.list accepts at most 50 IDs per request and costs the same either way
+VIDEO_BATCH_SIZE = 50
+REFRESH_MIN_AGE_HOURS = int(os.getenv("METADATA_REFRESH_MIN_AGE_HOURS", "24"))
+REFRESH_INTERVAL_SECONDS = int(os.getenv("METADATA_REFRESH_INTERVAL_SECONDS", "900"))
+REFRESH_MAX_BATCHES = int(os.getenv("METADATA_REFRESH_MAX_BATCHES", "20"))
+
+
+def plan_refresh_batches(video_ids: list[str], max_batches: int) -> list[list[str]]:
+    """
+    Pack IDs into full batches of VIDEO_BATCH_SIZE. A trailing partial batch
+    is only sent when it is the whole backlog, so every unit buys 50 videos.
+    """
+    batches = [
+        video_ids[i:i + VIDEO_BATCH_SIZE]
+        for i in range(0, len(video_ids), VIDEO_BATCH_SIZE)
+    ][:max_batches]
+    if len(batches) > 1 and len(batches[-1]) < VIDEO_BATCH_SIZE:
+        batches.pop()
+    return batches
+
+
+def refresh_stale_videos(
+    session: Session,
+    max_batches: int = REFRESH_MAX_BATCHES,
+    min_age_hours: int = REFRESH_MIN_AGE_HOURS
+) -> int:
+    """Refresh the stalest stored videos using only spare daily quota. Returns rows written."""
+    budget = min(max_batches, quota.spare() // VIDEOS_LIST_COST)
+    if budget <= 0:
+        logger.info(f"No spare API quota for metadata refresh ({quota.remaining()} units left, {quota.reserve} reserved).")
+        return 0
+
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=min_age_hours)
+    candidates = list_stale_video_ids(session, cutoff, limit=budget * VIDEO_BATCH_SIZE)
+    batches = plan_refresh_batches(candidates, budget)
+    video_ids = [video_id for batch in batches for video_id in batch]
+    if not video_ids:
+        logger.info("No stale videos to refresh.")
+        return 0
+
+    logger.info(f"Refreshing metadata for {len(video_ids)} stale videos in {len(batches)} API calls.")
+    rows = fetch_video_rows(video_ids)
+    written = len(store_video_rows(session, rows))
+
+    # Deleted or private videos come back without an item; don't retry them every run
+    returned_ids = {row.video_id for row in rows}
+    touch_videos(session, [video_id for video_id in video_ids if video_id not in returned_ids])
+
+    logger.info(f"Refreshed {written} videos ({quota.spare()} spare quota units left).")
+    return written
+
+
+class MetadataRefresher(threading.Thread):
+    """Background thread that periodically spends spare quota on stale videos."""
+
+    def __init__(self, interval_seconds: int = REFRESH_INTERVAL_SECONDS, max_batches: int = REFRESH_MAX_BATCHES):
+        super().__init__(name="metadata-refresher", daemon=True)
+        self.interval_seconds = interval_seconds
+        self.max_batches = max_batches
+        self._stop_event = threading.Event()
+
+    def run_once(self) -> int:
+        try:
+            with api_spend_source("refresh"), get_session() as session:
+                return refresh_stale_videos(session, max_batches=self.max_batches)
+        except QuotaExceededError as e:
+            logger.warning(f"Metadata refresh stopped, quota exceeded: {e}")
+        except Exception as e:
+            logger.error(f"Metadata refresh failed: {e}", exc_info=True)
+        return 0
+
+    def run(self):
+        logger.info(f"Metadata refresher started (every {self.interval_seconds}s).")
+        while not self._stop_event.is_set():
+            self.run_once()
+            self._stop_event.wait(self.interval_seconds)
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,159 @@
+from __future__ import annotations
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ENABLED = os.getenv("COLLECTOR_PROFILE", "").lower() in ("1", "true", "yes")
+PROFILE_DIR = Path(os.getenv("COLLECTOR_PROFILE_DIR", "profiles"))
+TOP_FUNCTIONS = 30
+TOP_STATEMENTS = 20
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize_statement(statement: str) -> str:
+    return _WHITESPACE.sub(" ", statement).strip()[:300]
+
+
+class QueryStats:
+    """Count and total time per SQL statement text."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: dict[str, list] = {}
+
+    def record(self, statement: str, seconds: float):
+        key = _normalize_statement(statement)
+        with self._lock:
+            entry = self._stats.setdefault(key, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def summary(self, top: int = TOP_STATEMENTS) -> dict:
+        with self._lock:
+            items = sorted(self._stats.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            "statements": sum(count for _, (count, _, _) in items),
+            "total_seconds": round(sum(total for _, (_, total, _) in items), 6),
+            "top": [
+                {"statement": key, "count": count, "total_seconds": round(total, 6), "max_seconds": round(worst, 6)}
+                for key, (count, total, worst) in items[:top]
+            ],
+        }
+
+
+class CycleProfiler:
+    """
+    Opt-in per-cycle profiling for the collector.
+
+    When enabled (COLLECTOR_PROFILE=1, or toggled at runtime with SIGUSR1),
+    profile() runs the wrapped block under cProfile, times every SQL statement
+    the same thread sends through an attached engine, and writes a .prof file
+    (readable with pstats/snakeviz) plus a JSON summary to PROFILE_DIR.
+    When disabled it costs one attribute check per cycle and per statement.
+    """
+
+    def __init__(self, enabled: bool = PROFILE_ENABLED, output_dir: Path = PROFILE_DIR):
+        self.enabled = enabled
+        self.output_dir = Path(output_dir)
+        self.queries = QueryStats()
+        self._thread: Optional[int] = None
+
+    def toggle(self) -> bool:
+        self.enabled = not self.enabled
+        logger.info(f"Cycle profiling {'enabled' if self.enabled else 'disabled'}.")
+        return self.enabled
+
+    def install_signal_handler(self, signum: Optional[int] = getattr(signal, "SIGUSR1", None)):
+        """Toggle profiling on signum. Must be called from the main thread."""
+        if signum is None:
+            return
+        signal.signal(signum, lambda received, frame: self.toggle())
+
+    def attach_to_engine(self, engine):
+        from sqlalchemy import event
+
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self._thread is not None and self._thread == threading.get_ident():
+            conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("profile_query_start")
+        if not starts:
+            return
+        started = starts.pop()
+        if self._thread is not None and self._thread == threading.get_ident():
+            self.queries.record(statement, time.perf_counter() - started)
+
+    def _handle_error(self, exception_context):
+        # A failed statement never reaches after_cursor_execute; drop its start
+        conn = exception_context.connection
+        starts = conn.info.get("profile_query_start") if conn is not None else None
+        if starts:
+            starts.pop()
+
+    @contextmanager
+    def profile(self, name: str = "cycle"):
+        if not self.enabled:
+            yield None
+            return
+
+        profiler = cProfile.Profile()
+        self.queries.reset()
+        self._thread = threading.get_ident()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            self._thread = None
+            try:
+                self._dump(name, profiler, time.perf_counter() - started)
+            except OSError as e:
+                logger.warning(f"Could not write profile for {name}: {e}")
+
+    def _dump(self, name: str, profiler: cProfile.Profile, wall_seconds: float) -> Path:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        base = self.output_dir / f"{name}-{stamp}-{os.getpid()}"
+        profiler.dump_stats(f"{base}.prof")
+
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        summary = {
+            "name": name,
+            "wall_seconds": round(wall_seconds, 3),
+            "sql": self.queries.summary(),
+            "top_functions": text.getvalue(),
+        }
+        Path(f"{base}.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        logger.info(
+            f"Wrote profile {base}.prof ({wall_seconds:.1f}s wall, "
+            f"{summary['sql']['statements']} SQL statements in {summary['sql']['total_seconds']:.2f}s)."
+        )
+        return base
+
+
+profiler = CycleProfiler()
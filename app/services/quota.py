@@ -0,0 +1,129 @@
+from __future__ import annotations
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.models.api_quota_ledger import ApiQuotaLedger
+
+logger = logging.getLogger(__name__)
+
+# YouTube Data API quotas reset at midnight Pacific time
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+DAILY_QUOTA_UNITS = int(os.getenv("YT_DAILY_QUOTA", "10000"))
+# Units kept back for the crawl path; background jobs may only spend the rest
+CRAWLER_RESERVE_UNITS = int(os.getenv("YT_QUOTA_RESERVE", "2000"))
+
+# Cost per request for the endpoints we call (list calls are 1 unit)
+VIDEOS_LIST_COST = 1
+CHANNELS_LIST_COST = 1
+VIDEO_CATEGORIES_LIST_COST = 1
+
+
+def current_quota_day(now: datetime | None = None) -> date:
+    return (now or datetime.now(QUOTA_TIMEZONE)).astimezone(QUOTA_TIMEZONE).date()
+
+
+def seconds_until_quota_reset(now: datetime | None = None) -> float:
+    now = (now or datetime.now(QUOTA_TIMEZONE)).astimezone(QUOTA_TIMEZONE)
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), QUOTA_TIMEZONE)
+    return (midnight - now).total_seconds()
+
+
+class LocalQuotaLedger:
+    """Units spent per quota day, kept in this process only."""
+
+    def __init__(self):
+        self._spent: dict[date, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, day: date, units: int) -> int:
+        with self._lock:
+            self._spent = {day: self._spent.get(day, 0) + units}
+            return self._spent[day]
+
+    def raise_to(self, day: date, units: int):
+        with self._lock:
+            self._spent = {day: max(self._spent.get(day, 0), units)}
+
+    def spent(self, day: date) -> int:
+        with self._lock:
+            return self._spent.get(day, 0)
+
+
+class PostgresQuotaLedger:
+    """
+    Units spent per quota day in the api_quota_ledger table, shared by every
+    collector worker on the same database. Updates are single atomic upserts.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def add(self, day: date, units: int) -> int:
+        stmt = pg_insert(ApiQuotaLedger).values(quota_day=day, units_spent=units)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ApiQuotaLedger.quota_day],
+            set_={
+                "units_spent": ApiQuotaLedger.units_spent + stmt.excluded.units_spent,
+                "updated_at": func.now(),
+            },
+        ).returning(ApiQuotaLedger.units_spent)
+        with self.engine.begin() as conn:
+            return conn.execute(stmt).scalar_one()
+
+    def raise_to(self, day: date, units: int):
+        stmt = pg_insert(ApiQuotaLedger).values(quota_day=day, units_spent=units)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ApiQuotaLedger.quota_day],
+            set_={
+                "units_spent": func.greatest(ApiQuotaLedger.units_spent, stmt.excluded.units_spent),
+                "updated_at": func.now(),
+            },
+        )
+        with self.engine.begin() as conn:
+            conn.execute(stmt)
+
+    def spent(self, day: date) -> int:
+        with self.engine.connect() as conn:
+            return conn.execute(
+                select(ApiQuotaLedger.units_spent).where(ApiQuotaLedger.quota_day == day)
+            ).scalar_one_or_none() or 0
+
+
+class DailyQuota:
+    """Tracks YouTube API units spent in the current quota day against a ledger."""
+
+    def __init__(self, daily_limit: int = DAILY_QUOTA_UNITS, reserve: int = CRAWLER_RESERVE_UNITS, ledger=None):
+        self.daily_limit = daily_limit
+        self.reserve = reserve
+        self.ledger = ledger or LocalQuotaLedger()
+
+    def use_ledger(self, ledger):
+        """Switch to another ledger, e.g. PostgresQuotaLedger when running several workers."""
+        self.ledger = ledger
+
+    def spend(self, units: int):
+        self.ledger.add(current_quota_day(), units)
+
+    def mark_exhausted(self):
+        """Record that the API reported quotaExceeded for today."""
+        self.ledger.raise_to(current_quota_day(), self.daily_limit)
+
+    @property
+    def spent(self) -> int:
+        return self.ledger.spent(current_quota_day())
+
+    def remaining(self) -> int:
+        return max(0, self.daily_limit - self.spent)
+
+    def spare(self) -> int:
+        """Units background work may spend without eating into the crawler reserve."""
+        return max(0, self.remaining() - self.reserve)
+
+
+quota = DailyQuota()
@@ -0,0 +1,103 @@
+from __future__ import annotations
+import logging
+import os
+import random
+from typing import Callable, NamedTuple, Optional
+
+from app.services.instrumentation import metrics
+from app.services.quota import quota, seconds_until_quota_reset
+
+logger = logging.getLogger(__name__)
+
+# 0 disables target-rate pacing: cycles run back to back while quota lasts
+TARGET_CYCLES_PER_HOUR = float(os.getenv("COLLECTOR_TARGET_CYCLES_PER_HOUR", "0"))
+MIN_CYCLE_GAP_SECONDS = float(os.getenv("COLLECTOR_MIN_CYCLE_GAP_SECONDS", "5"))
+BACKOFF_BASE_SECONDS = float(os.getenv("COLLECTOR_BACKOFF_BASE_SECONDS", "15"))
+BACKOFF_MAX_SECONDS = float(os.getenv("COLLECTOR_BACKOFF_MAX_SECONDS", "1800"))
+# Weight of the latest cycle in the running estimate of API units per cycle
+UNITS_EWMA_ALPHA = 0.3
+
+
+class Decision(NamedTuple):
+    delay_seconds: float
+    reason: str
+
+
+class CycleScheduler:
+    """
+    Decides how long main_loop waits before the next cycle.
+
+    After a success the next cycle starts as soon as both limits allow: the
+    target rate (if set) and the rate at which the remaining daily quota
+    lasts until the Pacific-time reset, estimated from recent API usage.
+    With several workers sharing the quota, each paces against its share of
+    the remaining units (worker_count() workers).
+    Failures back off exponentially with jitter; a quota error waits for the
+    reset. Every decision is recorded in the collector metrics.
+    """
+
+    def __init__(
+        self,
+        target_cycles_per_hour: float = TARGET_CYCLES_PER_HOUR,
+        min_gap_seconds: float = MIN_CYCLE_GAP_SECONDS,
+        backoff_base_seconds: float = BACKOFF_BASE_SECONDS,
+        backoff_max_seconds: float = BACKOFF_MAX_SECONDS,
+        quota_tracker=quota,
+        reset_clock: Callable[[], float] = seconds_until_quota_reset,
+        rng: Optional[random.Random] = None,
+        worker_count: Callable[[], int] = lambda: 1,
+    ):
+        self.target_cycles_per_hour = target_cycles_per_hour
+        self.min_gap_seconds = min_gap_seconds
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.quota = quota_tracker
+        self.reset_clock = reset_clock
+        self.rng = rng or random.Random()
+        self.worker_count = worker_count
+        self.consecutive_failures = 0
+        self.units_per_cycle: Optional[float] = None
+
+    def _record(self, decision: Decision) -> Decision:
+        metrics.increment("scheduler_decisions", reason=decision.reason)
+        metrics.set_gauge("scheduler_next_delay_seconds", round(decision.delay_seconds, 3))
+        metrics.set_gauge("scheduler_consecutive_failures", self.consecutive_failures)
+        return decision
+
+    def _quota_interval(self) -> float:
+        """Seconds per cycle that spreads this worker's share of the remaining quota until the reset."""
+        if not self.units_per_cycle:
+            return 0.0
+        share = self.quota.remaining() / max(1, self.worker_count())
+        cycles_left = share / self.units_per_cycle
+        if cycles_left < 1:
+            return self.reset_clock()
+        return self.reset_clock() / cycles_left
+
+    def after_success(self, duration_seconds: float, api_units: int) -> Decision:
+        self.consecutive_failures = 0
+        if self.units_per_cycle is None:
+            self.units_per_cycle = float(api_units)
+        else:
+            self.units_per_cycle += UNITS_EWMA_ALPHA * (api_units - self.units_per_cycle)
+
+        target_interval = 3600 / self.target_cycles_per_hour if self.target_cycles_per_hour > 0 else 0.0
+        quota_interval = self._quota_interval()
+        interval, reason = max(
+            (target_interval - duration_seconds, "target_rate"),
+            (quota_interval - duration_seconds, "quota_pacing"),
+            (self.min_gap_seconds, "continue"),
+        )
+        return self._record(Decision(max(0.0, interval), reason))
+
+    def after_failure(self) -> Decision:
+        self.consecutive_failures += 1
+        ceiling = min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** (self.consecutive_failures - 1))
+        # Equal jitter: never less than half the backoff, so retries still spread out
+        delay = ceiling / 2 + self.rng.uniform(0, ceiling / 2)
+        return self._record(Decision(delay, "backoff"))
+
+    def after_quota_exceeded(self) -> Decision:
+        # Jitter keeps several workers from all hitting the API at the reset instant
+        delay = self.reset_clock() + self.rng.uniform(0, self.backoff_base_seconds)
+        return self._record(Decision(delay, "quota_reset"))
@@ -0,0 +1,150 @@
+from __future__ import annotations
+import hashlib
+import logging
+import math
+import os
+import struct
+from pathlib import Path
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.crud.video import count_videos, iter_video_ids
+
+logger = logging.getLogger(__name__)
+
+SEEN_INDEX_PATH = os.getenv("SEEN_INDEX_PATH", "seen_videos.bloom")
+DEFAULT_CAPACITY = 1_000_000
+DEFAULT_ERROR_RATE = 0.001
+
+_MAGIC = b"YTBLOOM1"
+_HEADER = struct.Struct("<8sQIQQd")
+
+
+class BloomFilter:
+    """
+    Probabilistic set of strings. Membership tests never give false
+    negatives; false positives happen at roughly error_rate once the filter
+    holds `capacity` items.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, error_rate: float = DEFAULT_ERROR_RATE):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        bits = self._bits
+        for pos in self._positions(item):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def update(self, items: Iterable[str]):
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+    def estimated_false_positive_rate(self) -> float:
+        """Expected false-positive rate for the number of items added so far."""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def save(self, path):
+        path = Path(path)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(
+                _MAGIC, self.num_bits, self.num_hashes, self.count, self.capacity, self.error_rate
+            ))
+            f.write(self._bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path) -> "BloomFilter":
+        with open(path, "rb") as f:
+            magic, num_bits, num_hashes, count, capacity, error_rate = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not a seen-video index file")
+            bits = bytearray(f.read())
+        bloom = cls.__new__(cls)
+        bloom.capacity = capacity
+        bloom.error_rate = error_rate
+        bloom.num_bits = num_bits
+        bloom.num_hashes = num_hashes
+        bloom.count = count
+        bloom._bits = bits
+        if len(bits) != (num_bits + 7) // 8:
+            raise ValueError(f"{path} is truncated")
+        return bloom
+
+    def stats(self) -> dict:
+        return {
+            "items": self.count,
+            "capacity": self.capacity,
+            "memory_bytes": self.memory_bytes,
+            "num_hashes": self.num_hashes,
+            "false_positive_rate": self.estimated_false_positive_rate(),
+        }
+
+
+def partition_video_ids(index: BloomFilter, video_ids: Iterable[str]) -> tuple[set[str], set[str]]:
+    """Split IDs into (definitely_new, maybe_known) without touching the DB."""
+    definitely_new, maybe_known = set(), set()
+    for video_id in video_ids:
+        (maybe_known if video_id in index else definitely_new).add(video_id)
+    return definitely_new, maybe_known
+
+
+def build_seen_index(session: Session, capacity: Optional[int] = None, error_rate: float = DEFAULT_ERROR_RATE) -> BloomFilter:
+    """Rebuild the index by streaming every stored video_id."""
+    if capacity is None:
+        capacity = max(DEFAULT_CAPACITY, 2 * count_videos(session))
+    index = BloomFilter(capacity, error_rate)
+    index.update(iter_video_ids(session))
+    return index
+
+
+def load_or_build_seen_index(session: Session, path=SEEN_INDEX_PATH) -> BloomFilter:
+    """
+    Load the persisted index, rebuilding it when missing, unreadable, full, or
+    behind the videos table (e.g. rows written by another process).
+    """
+    stored_videos = count_videos(session)
+    index = None
+    if Path(path).exists():
+        try:
+            index = BloomFilter.load(path)
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning(f"Could not read seen-video index {path}: {e}")
+
+    if index is None or index.count < stored_videos or index.count > index.capacity:
+        logger.info(f"Rebuilding seen-video index from {stored_videos:,} stored videos...")
+        index = build_seen_index(session, capacity=max(DEFAULT_CAPACITY, 2 * stored_videos))
+        index.save(path)
+
+    stats = index.stats()
+    logger.info(
+        f"Seen-video index: {stats['items']:,} ids, {stats['memory_bytes'] / 1024 / 1024:.1f} MiB, "
+        f"estimated false-positive rate {stats['false_positive_rate']:.5f}"
+    )
+    return index
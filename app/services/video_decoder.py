@@ -0,0 +1,134 @@
+from __future__ import annotations
+import logging
+from datetime import datetime
+from typing import Any, Literal, NamedTuple, Optional, Union
+
+from pydantic import TypeAdapter, ValidationError
+from typing_extensions import NotRequired, TypedDict
+
+logger = logging.getLogger(__name__)
+
+
+class VideoRow(NamedTuple):
+    """One videos table row, in the column order of build_video_row."""
+    video_id: str
+    title: str
+    description: Optional[str]
+    channel_id: str
+    channel_title: Optional[str]
+    tags: Optional[list[str]]
+    topic_categories: Optional[list[str]]
+    category_id: Optional[int]
+    published_at: Optional[datetime]
+    language: Optional[str]
+    duration_iso: Optional[str]
+    view_count: int
+    like_count: int
+    comment_count: int
+
+
+# The schema only lists the fields we store; everything else in the response
+# is skipped by the parser. TypedDicts are used instead of BaseModels because
+# pydantic-core can build them without running any Python per item. The API
+# sometimes sends "" for numbers, which the row builder maps like the old
+# per-item code (None for ids/dates, 0 for counts).
+
+class _Snippet(TypedDict):
+    title: str
+    channelId: str
+    description: NotRequired[Optional[str]]
+    channelTitle: NotRequired[Optional[str]]
+    tags: NotRequired[Optional[list[str]]]
+    categoryId: NotRequired[Union[int, Literal[''], None]]
+    publishedAt: NotRequired[Union[datetime, Literal[''], None]]
+    defaultLanguage: NotRequired[Optional[str]]
+    defaultAudioLanguage: NotRequired[Optional[str]]
+
+
+class _Statistics(TypedDict):
+    viewCount: NotRequired[Union[int, Literal['']]]
+    likeCount: NotRequired[Union[int, Literal['']]]
+    commentCount: NotRequired[Union[int, Literal['']]]
+
+
+class _ContentDetails(TypedDict):
+    duration: NotRequired[Optional[str]]
+
+
+class _TopicDetails(TypedDict):
+    topicCategories: NotRequired[Optional[list[str]]]
+
+
+class _VideoItem(TypedDict):
+    id: str
+    snippet: _Snippet
+    statistics: _Statistics
+    contentDetails: _ContentDetails
+    topicDetails: NotRequired[_TopicDetails]
+
+
+class _VideoListResponse(TypedDict):
+    items: NotRequired[list[_VideoItem]]
+
+
+class _LooseVideoListResponse(TypedDict):
+    items: NotRequired[list[Any]]
+
+
+_response_adapter = TypeAdapter(_VideoListResponse)
+_loose_response_adapter = TypeAdapter(_LooseVideoListResponse)
+_item_adapter = TypeAdapter(_VideoItem)
+_NO_TOPICS: dict = {}
+
+
+def _to_row(item: dict) -> VideoRow:
+    snippet = item['snippet']
+    statistics = item['statistics']
+    return VideoRow(
+        item['id'],
+        snippet['title'],
+        snippet.get('description'),
+        snippet['channelId'],
+        snippet.get('channelTitle'),
+        snippet.get('tags'),
+        item.get('topicDetails', _NO_TOPICS).get('topicCategories'),
+        snippet.get('categoryId') or None,
+        snippet.get('publishedAt') or None,
+        snippet.get('defaultLanguage') or snippet.get('defaultAudioLanguage'),
+        item['contentDetails'].get('duration'),
+        statistics.get('viewCount') or 0,
+        statistics.get('likeCount') or 0,
+        statistics.get('commentCount') or 0,
+    )
+
+
+def decode_video_response(payload: Union[bytes, str, dict]) -> list[VideoRow]:
+    """
+    Validate and convert a videos.list response into VideoRows in one pass.
+
+    Raw bytes/str are parsed and validated by pydantic-core directly, with no
+    intermediate json.loads. If any item is invalid the response is
+    re-validated item by item so only the bad items are dropped.
+    """
+    try:
+        if isinstance(payload, dict):
+            response = _response_adapter.validate_python(payload)
+        else:
+            response = _response_adapter.validate_json(payload)
+        return [_to_row(item) for item in response.get('items', ())]
+    except ValidationError:
+        pass
+
+    if isinstance(payload, dict):
+        raw_items = _loose_response_adapter.validate_python(payload).get('items', ())
+    else:
+        raw_items = _loose_response_adapter.validate_json(payload).get('items', ())
+
+    rows = []
+    for raw_item in raw_items:
+        try:
+            rows.append(_to_row(_item_adapter.validate_python(raw_item)))
+        except ValidationError as e:
+            item_id = raw_item.get('id') if isinstance(raw_item, dict) else None
+            logger.warning(f"Validation failed for video {item_id}: {e.error_count()} errors")
+    return rows
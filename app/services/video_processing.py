@@ -1,25 +1,45 @@
 import logging
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Collection, Dict, Sequence
 
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from app.crud.video import upsert_video
+from app.crud.video import bulk_insert_new_videos, bulk_upsert_videos, upsert_video
+from app.services import id_cache
+from app.services.category_sync import resync_categories
+from app.services.video_decoder import VideoRow
 
 logger = logging.getLogger(__name__)
 
 
-def process_and_insert_video_from_json(session: Session, video_json_item: Dict[str, Any]):
-    if not video_json_item:
-        logger.warning("Received empty video JSON, skipping.")
-        return
+def is_video_data_valid(video_data: dict) -> bool:
+    if not video_data or not isinstance(video_data, dict):
+        return False
+
+    required_keys = ['id', 'snippet', 'statistics', 'contentDetails']
+    if not all(key in video_data for key in required_keys):
+        logger.warning(f"Validation failed: Missing one of the required keys: {required_keys} in video data.")
+        return False
+
+    if 'title' not in video_data.get('snippet', {}):
+        logger.warning("Validation failed: Missing 'title' in snippet.")
+        return False
+    if 'channelId' not in video_data.get('snippet', {}):
+        logger.warning("Validation failed: Missing 'channelId' in snippet.")
+        return False
 
+    return True
+
+
+def build_video_row(video_json_item: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a videos.list item to the columns of the videos table."""
     snippet = video_json_item.get("snippet", {})
     content_details = video_json_item.get("contentDetails", {})
     statistics = video_json_item.get("statistics", {})
     topic_details = video_json_item.get("topicDetails", {})
 
-    video_data = {
+    return {
         "video_id": video_json_item.get("id"),
         "title": snippet.get("title"),
         "description": snippet.get("description"),
@@ -36,9 +56,65 @@ def process_and_insert_video_from_json(session: Session, video_json_item: Dict[s
         "comment_count": int(statistics["commentCount"]) if statistics.get("commentCount") else 0,
     }
 
+
+def drop_unknown_category(session: Session, video_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Make sure the categories table holds the video's category, syncing
+    categories from the API on a miss. Only a category the API doesn't list
+    either is dropped. If the sync fails the category is kept, and the row
+    fails on the foreign key until a later sync succeeds.
+    """
+    category_id = video_data["category_id"]
+    if category_id is None or id_cache.is_known_category_id(session, category_id):
+        return video_data
+    if not resync_categories(session):
+        logger.warning(f"Unknown category {category_id} for video {video_data['video_id']} and categories could not be synced.")
+        return video_data
+    if id_cache.is_known_category_id(session, category_id):
+        return video_data
+    logger.warning(f"Category {category_id} of video {video_data['video_id']} is not listed by the API, storing without category.")
+    video_data["category_id"] = None
+    return video_data
+
+
+def process_and_insert_video_from_json(session: Session, video_json_item: Dict[str, Any]):
+    if not video_json_item:
+        logger.warning("Received empty video JSON, skipping.")
+        return
+
+    video_data = drop_unknown_category(session, build_video_row(video_json_item))
+
     try:
         upsert_video(session, video_data)
         logger.info(f"Successfully processed and saved video: {video_data['video_id']}")
     except Exception as e:
         logger.error(f"Failed to save video {video_data['video_id']}: {e}", exc_info=True)
         raise
+
+
+def store_video_rows(session: Session, rows: Sequence[VideoRow], new_ids: Collection[str] = ()) -> list[str]:
+    """
+    Write decoded rows in bulk: rows in new_ids (definitely new according to
+    app.services.seen_index) with a plain insert, the rest with an upsert. If
+    a batch fails for any database reason (a missing channel, an
+    out-of-range value, a dropped connection), fall back to per-video upserts
+    so one bad row doesn't drop the rest. Returns the IDs that were stored.
+    """
+    records = [drop_unknown_category(session, row._asdict()) for row in rows]
+    try:
+        bulk_insert_new_videos(session, [record for record in records if record["video_id"] in new_ids])
+        bulk_upsert_videos(session, [record for record in records if record["video_id"] not in new_ids])
+        return [record["video_id"] for record in records]
+    except SQLAlchemyError as e:
+        session.rollback()
+        logger.warning(f"Bulk video write failed, retrying one by one: {getattr(e, 'orig', None) or e}")
+
+    stored = []
+    for record in records:
+        try:
+            upsert_video(session, record)
+            stored.append(record["video_id"])
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Failed to save video {record['video_id']}: {e}")
+    return stored
@@ -1,25 +1,50 @@
 import os
 import requests
 import logging
+import threading
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 from app.services.exceptions import QuotaExceededError
+from app.services.instrumentation import metrics
+from app.services.video_decoder import VideoRow, decode_video_response
+from app.services.quota import (
+    CHANNELS_LIST_COST,
+    VIDEO_CATEGORIES_LIST_COST,
+    VIDEOS_LIST_COST,
+    quota,
+)
 
 load_dotenv()
 API_KEY = os.getenv("YT_API_KEY")
 
+_spend = threading.local()
+
+@contextmanager
+def api_spend_source(source: str):
+    """Label the API units spent by this thread, e.g. "refresh" for the metadata refresher."""
+    previous = getattr(_spend, "source", "crawl")
+    _spend.source = source
+    try:
+        yield
+    finally:
+        _spend.source = previous
+
 def get_video_id_from_url(video_url: str) -> str:
     return video_url.split("v=")[-1][:11]
 
 def get_video_ids_from_urls(video_urls: list) -> list:
     return [get_video_id_from_url(url) for url in video_urls]
 
-def _handle_api_response(response: requests.Response):
+def _handle_api_response(response: requests.Response, cost: int = 1):
+    quota.spend(cost)
+    metrics.increment("api_units", cost, source=getattr(_spend, "source", "crawl"))
     if response.status_code == 403:
         error_details = response.json()
         if 'error' in error_details and 'errors' in error_details['error']:
             for error in error_details['error']['errors']:
                 if error.get('reason') == 'quotaExceeded':
+                    quota.mark_exhausted()
                     raise QuotaExceededError("YouTube API quota exceeded.")
     response.raise_for_status()
 
@@ -31,11 +56,10 @@ def fetch_video_data(video_id: str) -> dict:
         f"&key={API_KEY}"
     )
     response = requests.get(api_url)
-    _handle_api_response(response)
+    _handle_api_response(response, VIDEOS_LIST_COST)
     return response.json()
 
-def call_youtube_api_multiple(video_ids: list) -> dict:
-    all_items = []
+def _iter_video_list_responses(video_ids: list):
     for i in range(0, len(video_ids), 50):
         chunk = video_ids[i:i + 50]
         ids_string = ",".join(chunk)
@@ -46,13 +70,26 @@ def call_youtube_api_multiple(video_ids: list) -> dict:
             f"&key={API_KEY}"
         )
         response = requests.get(api_url)
-        _handle_api_response(response)
+        _handle_api_response(response, VIDEOS_LIST_COST)
+        yield response
+
+def call_youtube_api_multiple(video_ids: list) -> dict:
+    all_items = []
+    for response in _iter_video_list_responses(video_ids):
         data = response.json()
         all_items.extend(data.get('items', []))
 
     return {'items': all_items}
 
 
+def fetch_video_rows(video_ids: list) -> list[VideoRow]:
+    """Like call_youtube_api_multiple, but decodes each page straight into validated VideoRows."""
+    rows = []
+    for response in _iter_video_list_responses(video_ids):
+        rows.extend(decode_video_response(response.content))
+    return rows
+
+
 def fetch_channel_details(channel_ids: list) -> dict:
     all_items = []
     for i in range(0, len(channel_ids), 50):
@@ -65,7 +102,7 @@ def fetch_channel_details(channel_ids: list) -> dict:
             f"&key={API_KEY}"
         )
         response = requests.get(api_url)
-        _handle_api_response(response)
+        _handle_api_response(response, CHANNELS_LIST_COST)
         data = response.json()
         all_items.extend(data.get('items', []))
 
@@ -80,7 +117,7 @@ def fetch_youtube_categories() -> dict:
         f"&key={API_KEY}"
     )
     response = requests.get(api_url)
-    _handle_api_response(response)
+    _handle_api_response(response, VIDEO_CATEGORIES_LIST_COST)
     return response.json()
 
 def fetch_video_data_from_urls(recommendations: list[dict]) -> dict:
@@ -90,6 +127,12 @@ def fetch_video_data_from_urls(recommendations: list[dict]) -> dict:
     logging.info(f"Fetching data for {len(unique_video_ids)} unique video IDs from API.")
     return call_youtube_api_multiple(unique_video_ids)
 
+def fetch_video_rows_from_urls(recommendations: list[dict]) -> list[VideoRow]:
+    video_ids = get_video_ids_from_urls([rec["url"] for rec in recommendations])
+    unique_video_ids = sorted(set(video_ids))
+    logging.info(f"Fetching data for {len(unique_video_ids)} unique video IDs from API.")
+    return fetch_video_rows(unique_video_ids)
+
 
 if __name__ == "__main__":
     sample_video_url = "https://www.youtube.com/watch?v=lV_QcwbTlZU"
@@ -4,6 +4,8 @@ import csv, time, datetime
 import random
 from urllib.parse import urljoin
 
+from app.services.instrumentation import metrics
+
 logging.basicConfig(level=logging.INFO)
 
 def launch_site(p, headless: bool = True):
@@ -83,17 +85,18 @@ def select_random_video_and_get_recommendations(page, iteration: int):
         logging.info("Waiting for video cards to load on the page...")
         videos = page.locator("a.yt-lockup-metadata-view-model__title")
 
-        count = videos.count()
-        logging.info(f"Found {count} video cards on this page.")
-        if count == 0:
-            logging.error("No video cards found on the page.")
-            return []
-        visible_indices = get_visible_video_indices(videos)
-        if not visible_indices:
-            logging.error("No visible video cards found on the page.")
-            return []
+        with metrics.stage("extraction"):
+            count = videos.count()
+            logging.info(f"Found {count} video cards on this page.")
+            if count == 0:
+                logging.error("No video cards found on the page.")
+                return []
+            visible_indices = get_visible_video_indices(videos)
+            if not visible_indices:
+                logging.error("No visible video cards found on the page.")
+                return []
 
-        recommended_video_urls = get_recommended_video_urls(videos)
+            recommended_video_urls = get_recommended_video_urls(videos)
 
         source_video_id = None
         if "watch?v=" in page.url:
@@ -109,7 +112,8 @@ def select_random_video_and_get_recommendations(page, iteration: int):
             for i in visible_indices
         ]
 
-        select_random_video(page, videos, visible_indices)
+        with metrics.stage("page_load"):
+            select_random_video(page, videos, visible_indices)
 
         return visible_recommended_urls
     except Exception as e:
@@ -151,15 +155,17 @@ def run_random_video_selection(page, iterations: int = 5):
 
 def run_yt_agent(headless: bool = True, iterations: int = 10):
     with sync_playwright() as p:
-        page, browser, context = launch_site(p, headless)
+        with metrics.stage("browser_launch"):
+            page, browser, context = launch_site(p, headless)
         if not page:
             logging.error("Failed to launch site, aborting agent run.")
             return []
 
         try:
-            accept_cookies(page)
-            click_youtube_shorts(page)
-            click_home(page)
+            with metrics.stage("page_load"):
+                accept_cookies(page)
+                click_youtube_shorts(page)
+                click_home(page)
             recommendations = run_random_video_selection(page, iterations)
 
             logging.info("Waiting for 10 seconds before closing the browser...")
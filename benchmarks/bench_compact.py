@@ -0,0 +1,111 @@
+"""
+Benchmark: memory of the merged, labeled analysis frame as loaded vs. after
+compact_dataset (with and without the per-video text columns), and the time
+compute_exposure_summary takes on each.
+
+The frame is synthetic but shaped like read_labeled_cache's output: ~20
+events per video, ~10 videos per channel, 600 events per run.
+
+    python -m benchmarks.bench_compact --rows 1000000 5000000
+"""
+import argparse
+import gc
+import logging
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from analysis.load_data import compact_dataset, frame_memory_mb
+from analysis.metrics import compute_exposure_summary
+from analysis.political_labeling import SIGNAL_COLUMNS
+
+WORDS = np.array(
+    "the a of and to in video today new best how why live full official music "
+    "review reaction highlights tutorial vlog game news update explained".split()
+)
+
+
+def make_videos(videos: int, rng: np.random.Generator) -> pd.DataFrame:
+    channels = max(1, videos // 10)
+    channel_of = rng.integers(0, channels, videos)
+    signals = rng.random((videos, len(SIGNAL_COLUMNS))) < 0.15
+    frame = pd.DataFrame({
+        'video_id': [f"v{i:010d}" for i in range(videos)],
+        'title': [" ".join(rng.choice(WORDS, 8)) for _ in range(videos)],
+        'description': [" ".join(rng.choice(WORDS, 60)) for _ in range(videos)],
+        'iteration_video': rng.integers(0, 30, videos).astype('int32'),
+        'channel_id': [f"UC{c:020d}" for c in channel_of],
+        'channel_title': [f"Channel {c}" for c in channel_of],
+        'tags': [list(rng.choice(WORDS, 6)) for _ in range(videos)],
+        'topic_categories': [['https://en.wikipedia.org/wiki/Society'] for _ in range(videos)],
+        'category_id': pd.array(rng.choice([10, 20, 22, 24, 25], videos), dtype='Int32'),
+        'language': rng.choice(['en', 'no', 'es', 'hi'], videos),
+        'view_count': pd.array(rng.integers(0, 10**7, videos), dtype='Int64'),
+        'title_channel': [f"Channel {c}" for c in channel_of],
+        'description_channel': [f"About channel {c} " * 5 for c in channel_of],
+        'topic_categories_channel': [['https://en.wikipedia.org/wiki/Politics'] for _ in range(videos)],
+        'country': rng.choice(['NO', 'US', 'IN', 'ES'], videos),
+        'category_name': rng.choice(['Music', 'Gaming', 'People & Blogs', 'News & Politics'], videos),
+    })
+    for j, column in enumerate(SIGNAL_COLUMNS):
+        frame[column] = signals[:, j]
+    frame['signal_count'] = signals.sum(axis=1)
+    frame['matched_keywords'] = [['election'] if row[3] else [] for row in signals]
+    return frame
+
+
+def make_dataset(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    videos = make_videos(max(1, rows // 20), rng)
+    runs = [str(uuid.UUID(int=int(i))) for i in rng.integers(0, 2**63, max(1, rows // 600))]
+    picks = rng.integers(0, len(videos), rows)
+    events = pd.DataFrame({
+        'id': np.arange(1, rows + 1),
+        'run_id': [runs[i // 600 % len(runs)] for i in range(rows)],
+        'iteration_rec': (np.arange(rows) // 20 % 30),
+        'source_video_id': videos['video_id'].to_numpy()[rng.integers(0, len(videos), rows)],
+        'position': pd.array(np.arange(rows) % 20, dtype='Int32'),
+        'collected_at': pd.Timestamp('2025-10-01', tz='UTC') + pd.to_timedelta(np.arange(rows), unit='s'),
+    })
+    # Same layout as merge_dataset: every event carries its video's columns
+    df = pd.concat([events, videos.take(picks).reset_index(drop=True)], axis=1)
+    df['is_political'] = df['signal_count'] >= 2
+    return df
+
+
+def timed_summary(df: pd.DataFrame) -> float:
+    start = time.perf_counter()
+    compute_exposure_summary(df)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="*", default=[1_000_000])
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    for rows in args.rows:
+        df = make_dataset(rows)
+        merged_mb, merged_s = frame_memory_mb(df), timed_summary(df)
+        with_text = compact_dataset(df, drop_text=False)
+        with_text_mb = frame_memory_mb(with_text)
+        del with_text
+        compact = compact_dataset(df)
+        del df
+        gc.collect()
+        compact_mb, compact_s = frame_memory_mb(compact), timed_summary(compact)
+        del compact
+        gc.collect()
+
+        print(f"{rows:,} events")
+        print(f"  merged frame:            {merged_mb:9,.0f} MB   summary {merged_s:6.2f} s")
+        print(f"  compact, text kept:      {with_text_mb:9,.0f} MB   ({merged_mb / with_text_mb:.1f}x smaller)")
+        print(f"  compact:                 {compact_mb:9,.0f} MB   summary {compact_s:6.2f} s"
+              f"   ({merged_mb / compact_mb:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
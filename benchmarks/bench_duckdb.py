@@ -0,0 +1,85 @@
+"""
+Benchmark: exposure summary in memory (reading the compact frame from
+Parquet, then compute_exposure_summary) vs. DuckDB over a Parquet snapshot
+laid out like analysis.snapshot's export, on the synthetic dataset of
+bench_compact. Checks that both summaries agree.
+
+    python -m benchmarks.bench_duckdb --rows 1000000
+"""
+import argparse
+import json
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analysis.duckdb_backend import compute_duckdb_exposure_summary
+from analysis.load_data import compact_dataset
+from analysis.metrics import compute_exposure_summary
+from analysis.snapshot import MANIFEST_FILE, arrow_schema, snapshot_tables, write_parts
+from benchmarks.bench_compact import make_dataset
+
+
+def write_snapshot(df: pd.DataFrame, root: Path, chunk_rows: int):
+    videos = df.drop_duplicates('video_id').rename(columns={'iteration_video': 'iteration'})
+    categories = df.drop_duplicates('category_id')[['category_id', 'category_name']]
+    tables = {
+        'rec_events': df.rename(columns={'iteration_rec': 'iteration'}),
+        'videos': videos,
+        'channels': videos.drop_duplicates('channel_id')[
+            ['channel_id', 'title_channel', 'description_channel', 'topic_categories_channel', 'country']
+        ].set_axis(['channel_id', 'title', 'description', 'topic_categories', 'country'], axis=1),
+        'categories': categories.rename(columns={'category_id': 'id', 'category_name': 'name'}),
+        'video_labels': videos.assign(config_hash='bench', labeled_at=pd.Timestamp.now(tz='UTC')),
+    }
+    for name, table_columns in snapshot_tables().items():
+        frame = tables[name]
+        frame = frame.assign(**{column: None for column in table_columns if column not in frame})[list(table_columns)]
+        chunks = (frame.iloc[start:start + chunk_rows] for start in range(0, len(frame), chunk_rows))
+        write_parts(chunks, root / name, arrow_schema(table_columns), partitioned=name == 'rec_events')
+    (root / MANIFEST_FILE).write_text(json.dumps({"exported_at": "bench", "tables": {}}), encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    df = make_dataset(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "snapshot"
+        write_snapshot(df, root, args.chunk_rows)
+        frame_file = Path(tmp) / "labeled.parquet"
+        compact_dataset(df).to_parquet(frame_file, index=False)
+        del df
+
+        start = time.perf_counter()
+        expected = compute_exposure_summary(pd.read_parquet(frame_file))
+        in_memory = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = compute_duckdb_exposure_summary(root)
+        duckdb = time.perf_counter() - start
+
+        files = sum(1 for _ in root.rglob("*.parquet"))
+        size = sum(path.stat().st_size for path in root.rglob("*.parquet")) / 2**20
+
+    assert all(np.isclose(result['overall'][key], value) for key, value in expected['overall'].items())
+    for key in ['by_iteration', 'by_position', 'by_run']:
+        pd.testing.assert_frame_equal(
+            result[key].reset_index(drop=True), expected[key].reset_index(drop=True),
+            check_dtype=False, check_categorical=False,
+        )
+
+    print(f"{args.rows:,} events, snapshot of {files:,} files ({size:,.0f} MB)")
+    print(f"  read frame + in memory:  {in_memory:7.2f} s")
+    print(f"  DuckDB over snapshot:    {duckdb:7.2f} s   ({in_memory / duckdb:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Import-time budget check for entry points, using `python -X importtime`.
+
+Each module is imported in a fresh interpreter (best of --repeats) and its
+cumulative import time compared with a budget. Exits non-zero when any entry
+point goes over budget or loads a module it should only load on demand.
+
+    python -m benchmarks.bench_import_time --repeats 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# module -> (budget in ms, modules that must not be loaded by the import alone)
+BUDGETS = {
+    "app.db": (150, ("sqlalchemy", "psycopg")),
+    "app.orchestrator": (150, ("sqlalchemy", "app.main")),
+    "analysis.analyze": (150, ("pandas", "matplotlib", "seaborn", "sqlalchemy")),
+    "analysis.load_data": (2500, ("matplotlib", "app.models")),
+    "app.main": (2000, ("pandas", "psycopg")),
+}
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    # The import must not depend on a configured database
+    env.pop("DB_URL", None)
+    env["PYTHONPATH"] = str(REPO_ROOT)
+    return env
+
+
+def import_time_ms(module: str) -> float:
+    """Cumulative import time of module in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=REPO_ROOT, env=_env(), check=True,
+    )
+    for line in reversed(result.stderr.splitlines()):
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"No importtime entry for {module}")
+
+
+def loaded_modules(module: str, candidates) -> list[str]:
+    """Which of candidates (or their submodules) importing module pulls in."""
+    code = (
+        "import sys, importlib; importlib.import_module(sys.argv[1]); "
+        "print('\\n'.join(name for name in sys.argv[2:] "
+        "if any(m == name or m.startswith(name + '.') for m in sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code, module, *candidates],
+        capture_output=True, text=True, cwd=REPO_ROOT, env=_env(), check=True,
+    )
+    return result.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS))
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<22}{'best ms':>10}{'budget':>10}  eager imports")
+    for module in args.modules:
+        budget, lazy = BUDGETS.get(module, (float("inf"), ()))
+        best = min(import_time_ms(module) for _ in range(args.repeats))
+        eager = loaded_modules(module, lazy)
+        over = best > budget or bool(eager)
+        failed |= over
+        print(f"{module:<22}{best:>10.1f}{budget:>10}  {', '.join(eager) or '-'}{'  OVER' if over else ''}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark: keyword labeling per recommendation event vs. once per unique
+video with the signals broadcast back to events, and the per-keyword regex
+scan vs. the compiled keyword automaton on the unique videos' texts, and
+matching every video against all languages' keywords vs. its own language's.
+With --workers N the unique videos are also labeled across N processes.
+
+    python -m benchmarks.bench_labeling --events 100000 --videos 5000
+    python -m benchmarks.bench_labeling --events 2000000 --videos 200000 --workers 8
+"""
+import argparse
+import logging
+import random
+import re
+import time
+
+import pandas as pd
+
+from analysis.political_labeling import (
+    SIGNAL_COLUMNS,
+    _as_text,
+    compute_signals,
+    compute_signals_parallel,
+    get_keyword_matcher,
+    get_keywords_by_language,
+    get_political_keywords,
+    label_political_content,
+)
+
+WORDS = (
+    "the a of and to in video today new best how why live full official music "
+    "review reaction highlights tutorial vlog game news update explained"
+).split()
+
+
+def make_events(events: int, videos: int, seed: int = 0) -> pd.DataFrame:
+    rng = random.Random(seed)
+    by_language = {code: sorted(words) for code, words in get_keywords_by_language().items()}
+    video_rows = []
+    for v in range(videos):
+        political = rng.random() < 0.2
+        language = rng.choice(sorted(by_language))
+        title = " ".join(rng.choices(WORDS, k=8) + ([rng.choice(by_language[language])] if political else []))
+        video_rows.append({
+            'video_id': f"vid{v:07d}",
+            'title': title,
+            'description': " ".join(rng.choices(WORDS, k=120)),
+            'tags': rng.choices(WORDS, k=6),
+            'topic_categories': ['https://en.wikipedia.org/wiki/Politics'] if political and rng.random() < 0.5 else None,
+            'topic_categories_channel': None,
+            'category_id': 25 if political else rng.choice([10, 20, 22, 24]),
+            'language': language,
+        })
+    # Popular videos get most recommendations, as in real crawls
+    weights = [1 / (rank + 1) for rank in range(videos)]
+    picks = rng.choices(range(videos), weights=weights, k=events)
+    df = pd.DataFrame([video_rows[v] for v in picks])
+    df.insert(0, 'id', range(1, events + 1))
+    return df
+
+
+def regex_scan_contains(text, keywords):
+    """The matcher as it was: a loop over every keyword, building a regex per multi-word hit."""
+    if pd.isna(text) or not text:
+        return False
+    text_lower = text.lower()
+    words = set(re.findall(r'\b\w+\b', text_lower))
+    for keyword in keywords:
+        if ' ' in keyword:
+            if keyword in text_lower and re.search(r'\b' + re.escape(keyword) + r'\b', text_lower):
+                return True
+        elif keyword in words:
+            return True
+    return False
+
+
+def per_event(df):
+    keywords = get_political_keywords()
+    return compute_signals(df, keywords, get_keywords_by_language())[SIGNAL_COLUMNS]
+
+
+def per_video(df):
+    return label_political_content(df)[SIGNAL_COLUMNS]
+
+
+def best_of(fn, df, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--videos", type=int, default=5_000)
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=0, help="also label across this many processes")
+    parser.add_argument("--chunk-rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    df = make_events(args.events, args.videos)
+    unique = df['video_id'].nunique()
+
+    baseline, expected = best_of(per_event, df, args.repeats)
+    deduped, result = best_of(per_video, df, args.repeats)
+    assert (expected.to_numpy() == result.to_numpy()).all()
+
+    keywords = get_political_keywords()
+    videos = df.drop_duplicates('video_id')
+    texts = [_as_text(value) for column in ('title', 'description', 'tags') for value in videos[column]]
+    get_keyword_matcher(keywords)
+    scan, _ = best_of(lambda items: [regex_scan_contains(text, keywords) for text in items], texts, args.repeats)
+    automaton, _ = best_of(lambda items: [get_keyword_matcher(keywords).matches(text) for text in items], texts, args.repeats)
+
+    print(f"{args.events:,} events over {unique:,} unique videos (best of {args.repeats})")
+    print(f"  signals per event:          {baseline * 1000:9.1f} ms  ({args.events / baseline:,.0f} events/s)")
+    print(f"  signals per video + join:   {deduped * 1000:9.1f} ms  ({args.events / deduped:,.0f} events/s)")
+    print(f"  speedup: {baseline / deduped:.1f}x")
+    print(f"{len(texts):,} texts, {len(keywords)} keywords")
+    print(f"  per-keyword regex scan:     {scan * 1000:9.1f} ms  ({len(texts) / scan:,.0f} texts/s)")
+    print(f"  keyword automaton:          {automaton * 1000:9.1f} ms  ({len(texts) / automaton:,.0f} texts/s)")
+    print(f"  speedup: {scan / automaton:.1f}x")
+
+    by_language = get_keywords_by_language()
+    combined, everywhere = best_of(lambda frame: compute_signals(frame, keywords), videos, args.repeats)
+    per_language, own = best_of(lambda frame: compute_signals(frame, keywords, by_language), videos, args.repeats)
+    cross_language = (everywhere['matched_keywords'] != own['matched_keywords']).sum()
+    print(f"{len(videos):,} unique videos in {len(by_language)} languages")
+    print(f"  all languages' keywords:    {combined * 1000:9.1f} ms  ({len(videos) / combined:,.0f} videos/s)")
+    print(f"  video language's keywords:  {per_language * 1000:9.1f} ms  ({len(videos) / per_language:,.0f} videos/s)")
+    print(f"  videos with cross-language keyword matches: {cross_language:,}")
+
+    if args.workers:
+        serial, expected = best_of(lambda frame: compute_signals(frame, keywords, by_language), videos, args.repeats)
+        parallel, result = best_of(
+            lambda frame: compute_signals_parallel(
+                frame, keywords, by_language, workers=args.workers, chunk_rows=args.chunk_rows
+            ),
+            videos, args.repeats,
+        )
+        assert expected.equals(result)
+        print(f"{len(videos):,} unique videos, chunks of {args.chunk_rows:,}")
+        print(f"  1 process:                  {serial * 1000:9.1f} ms  ({len(videos) / serial:,.0f} videos/s)")
+        label = f"{args.workers} processes:"
+        print(f"  {label:<28}{parallel * 1000:9.1f} ms  ({len(videos) / parallel:,.0f} videos/s)")
+        print(f"  speedup: {serial / parallel:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmark: ORM-object loading vs. the columnar streaming loader for
+rec_events, reporting wall time and peak RSS of each in a fresh process.
+
+Without --url a synthetic SQLite database with the rec_events schema is
+generated per size (and reused from --data-dir on later runs). With --url the
+loaders read the existing rec_events table of that database.
+
+    python -m benchmarks.bench_load_data --rows 1000000 10000000
+    python -m benchmarks.bench_load_data --url postgresql+psycopg://... --methods columnar
+"""
+import argparse
+import json
+import logging
+import random
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+METHODS = ("orm", "columnar")
+
+
+def orm_load_rec_events(engine):
+    """The loader as it was: full ORM objects, then a list of dicts."""
+    import pandas as pd
+    from sqlalchemy import select
+    from sqlalchemy.orm import Session
+    from app.models.rec_event import RecEvent
+
+    with Session(engine) as session:
+        events = session.execute(select(RecEvent)).scalars().all()
+
+    data = [{
+        'id': e.id,
+        'run_id': str(e.run_id),
+        'iteration': e.iteration,
+        'source_video_id': e.source_video_id,
+        'video_id': e.video_id,
+        'position': e.position,
+        'collected_at': e.collected_at
+    } for e in events]
+    return pd.DataFrame(data)
+
+
+def build_sqlite_dataset(path: Path, rows: int, seed: int = 0):
+    """rec_events-shaped table: 30 iterations, 20 positions, ~rows/20 distinct videos."""
+    from sqlalchemy import create_engine
+    import app.models.video  # noqa: F401  (rec_events references videos)
+    from app.models.rec_event import RecEvent
+
+    engine = create_engine(f"sqlite:///{path}")
+    RecEvent.__table__.create(engine)
+    engine.dispose()
+
+    rng = random.Random(seed)
+    videos = max(1, rows // 20)
+    run_ids = [uuid.UUID(int=rng.getrandbits(128)).hex for _ in range(max(1, rows // 600))]
+    conn = sqlite3.connect(path)
+    batch = []
+    for i in range(1, rows + 1):
+        batch.append((
+            i,
+            run_ids[(i - 1) // 600 % len(run_ids)],
+            (i // 20) % 30,
+            None if i % 600 < 20 else f"src{rng.randrange(videos):09d}",
+            f"vid{rng.randrange(videos):09d}",
+            i % 20,
+            f"2025-10-{1 + i % 28:02d} 12:{i % 60:02d}:00.000000",
+        ))
+        if len(batch) == 100_000:
+            conn.executemany("INSERT INTO rec_events VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+            batch = []
+    if batch:
+        conn.executemany("INSERT INTO rec_events VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+    conn.commit()
+    conn.close()
+
+
+def run_child(method: str, url: str):
+    from sqlalchemy import create_engine
+    from analysis.load_data import load_rec_events
+
+    engine = create_engine(url)
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    df = orm_load_rec_events(engine) if method == "orm" else load_rec_events(engine)
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        "rows": len(df),
+        "seconds": seconds,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "baseline_rss_mb": baseline_kb / 1024,
+        "frame_mb": df.memory_usage(deep=True).sum() / 2**20,
+    }))
+
+
+def measure(method: str, url: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_load_data", "--child", method, "--url", url],
+        capture_output=True, text=True, cwd=REPO_ROOT,
+    )
+    if result.returncode != 0:
+        # Typically the OOM killer (-9) for the ORM path at large sizes
+        return {"error": f"exit {result.returncode}"}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def report(label: str, method: str, stats: dict):
+    if "error" in stats:
+        print(f"  {label:>12} {method:<9} failed ({stats['error']})")
+        return
+    print(
+        f"  {label:>12} {method:<9} {stats['seconds']:8.2f} s  {stats['rows'] / stats['seconds']:>11,.0f} rows/s  "
+        f"peak RSS {stats['peak_rss_mb']:8.0f} MB (+{stats['peak_rss_mb'] - stats['baseline_rss_mb']:.0f})  "
+        f"frame {stats['frame_mb']:6.0f} MB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="*", default=[1_000_000, 10_000_000])
+    parser.add_argument("--methods", nargs="*", choices=METHODS, default=list(METHODS))
+    parser.add_argument("--url", help="read rec_events from this database instead of synthetic data")
+    parser.add_argument("--data-dir", type=Path, default=Path(tempfile.gettempdir()) / "yt_bench_load_data")
+    parser.add_argument("--child", choices=METHODS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    if args.child:
+        run_child(args.child, args.url)
+        return
+
+    if args.url:
+        targets = [("database", args.url)]
+    else:
+        args.data_dir.mkdir(parents=True, exist_ok=True)
+        targets = []
+        for rows in args.rows:
+            path = args.data_dir / f"rec_events_{rows}.sqlite"
+            if not path.exists():
+                print(f"Generating {rows:,} synthetic rec_events in {path} ...")
+                build_sqlite_dataset(path, rows)
+            targets.append((f"{rows:,}", f"sqlite:///{path}"))
+
+    for label, url in targets:
+        for method in args.methods:
+            report(label, method, measure(method, url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: threshold comparison as it was (re-filtering the frame once per
+threshold) vs. threshold_sensitivity's single histogram, and a run-level
+cluster bootstrap done naively (resampling runs and regrouping the events
+for every replicate) vs. cluster_bootstrap's matrix products, on the compact
+synthetic frame of bench_compact.
+
+    python -m benchmarks.bench_sensitivity --rows 2000000 --replicates 2000
+"""
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis.load_data import compact_dataset
+from analysis.sensitivity import cluster_bootstrap, threshold_sensitivity
+from benchmarks.bench_compact import make_dataset
+
+
+def loop_thresholds(df: pd.DataFrame, max_threshold: int = 6) -> pd.DataFrame:
+    results = []
+    for threshold in range(1, max_threshold + 1):
+        is_political = df['signal_count'] >= threshold
+        results.append({
+            'threshold': threshold,
+            'political_count': is_political.sum(),
+            'political_percentage': is_political.mean() * 100,
+            'unique_videos': df[is_political]['video_id'].nunique(),
+        })
+    return pd.DataFrame(results)
+
+
+def naive_bootstrap(df: pd.DataFrame, replicates: int, seed: int = 0) -> np.ndarray:
+    """Resample runs, then regroup the sampled runs' events by iteration, once per replicate."""
+    rng = np.random.default_rng(seed)
+    by_run = {run: events for run, events in df.groupby('run_id', observed=True)[['iteration_rec', 'is_political']]}
+    runs = list(by_run)
+    shares = []
+    for _ in range(replicates):
+        sample = pd.concat([by_run[runs[i]] for i in rng.integers(0, len(runs), len(runs))])
+        shares.append(sample.groupby('iteration_rec')['is_political'].mean().to_numpy())
+    return np.array(shares)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--replicates", type=int, default=2000)
+    parser.add_argument("--naive-replicates", type=int, default=10, help="naive replicates to time and extrapolate from")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    df = compact_dataset(make_dataset(args.rows))
+    runs = df['run_id'].nunique()
+
+    loop, expected = timed(loop_thresholds, df)
+    histogram, result = timed(threshold_sensitivity, df)
+    assert (expected[['political_count', 'unique_videos']].to_numpy()
+            == result[['political_count', 'unique_videos']].to_numpy()).all()
+
+    naive, _ = timed(naive_bootstrap, df, args.naive_replicates)
+    vectorized, _ = timed(cluster_bootstrap, df, 'iteration_rec', 'iteration', replicates=args.replicates)
+    naive_total = naive / args.naive_replicates * args.replicates
+
+    print(f"{args.rows:,} events, {runs:,} runs")
+    print(f"  thresholds 1-6, per-threshold filter:  {loop * 1000:9.1f} ms")
+    print(f"  thresholds 1-6, one histogram:         {histogram * 1000:9.1f} ms   ({loop / histogram:.0f}x)")
+    print(f"  {args.replicates:,} bootstrap replicates by iteration")
+    print(f"    naive resample + groupby:  {naive_total:8.1f} s  (extrapolated from {args.naive_replicates})")
+    print(f"    matrix products:           {vectorized:8.2f} s   ({naive_total / vectorized:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: exposure summary in memory (compute_exposure_summary on the
+compact frame) vs. streamed through ExposureAccumulator in chunks, on the
+synthetic dataset of bench_compact. Reports time, the memory each holds and
+checks that both summaries agree.
+
+    python -m benchmarks.bench_streaming --rows 1000000 --chunk-rows 100000
+"""
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis.load_data import compact_dataset, frame_memory_mb
+from analysis.metrics import compute_exposure_summary
+from analysis.streaming import ExposureAccumulator
+from benchmarks.bench_compact import make_dataset
+
+
+def accumulator_mb(accumulator: ExposureAccumulator) -> float:
+    arrays = [
+        accumulator.video_recommendations, accumulator.video_iteration_sum,
+        accumulator.video_position_sum, accumulator.video_position_count,
+    ]
+    sets = [seen for videos in (accumulator.iteration_videos, accumulator.position_videos) for seen in videos._seen.values()]
+    total = sum(array.nbytes for array in arrays + sets) + accumulator.run_videos._seen.nbytes
+    return (total + accumulator.videos.memory_usage(deep=True).sum()) / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    df = make_dataset(args.rows)
+    videos = df.drop_duplicates('video_id')[['video_id', 'channel_id', 'channel_title', 'is_political']]
+    # Ordered by run, then id, as compute_streaming_exposure_summary queries them
+    events = df[['run_id', 'iteration_rec', 'video_id', 'position']].rename(columns={'iteration_rec': 'iteration'})
+    events = events.sort_values('run_id', kind='stable')
+    details = df.drop_duplicates('video_id').set_index('video_id')[['title', 'view_count', 'category_name']]
+    compact = compact_dataset(df)
+    del df
+
+    start = time.perf_counter()
+    expected = compute_exposure_summary(compact)
+    in_memory = time.perf_counter() - start
+
+    start = time.perf_counter()
+    accumulator = ExposureAccumulator(videos)
+    for offset in range(0, len(events), args.chunk_rows):
+        accumulator.add(events.iloc[offset:offset + args.chunk_rows])
+    streamed = accumulator.summary(
+        lambda ids: details.loc[ids].rename(columns={'category_name': 'category'}).reset_index()
+    )
+    streaming = time.perf_counter() - start
+
+    assert streamed['overall'] == expected['overall'] or all(
+        np.isclose(streamed['overall'][key], value) for key, value in expected['overall'].items()
+    )
+    for key in ['by_iteration', 'by_position', 'by_run']:
+        pd.testing.assert_frame_equal(
+            streamed[key].reset_index(drop=True), expected[key].reset_index(drop=True),
+            check_dtype=False, check_categorical=False,
+        )
+
+    print(f"{args.rows:,} events, {len(videos):,} videos, chunks of {args.chunk_rows:,}")
+    print(f"  in memory (compact frame): {in_memory:7.2f} s   frame {frame_memory_mb(compact):8,.0f} MB")
+    print(f"  streamed:                  {streaming:7.2f} s   state {accumulator_mb(accumulator):8,.0f} MB"
+          f" + one chunk")
+
+
+if __name__ == "__main__":
+    main()
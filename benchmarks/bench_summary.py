@@ -0,0 +1,86 @@
+"""
+Benchmark: compute_exposure_summary's tables built by the six per-table
+functions (each re-filtering and copying the frame and grouping it again)
+vs. summarize_exposure's single pass over shared codes, on the compact
+synthetic frame of bench_compact. Reports time and peak memory allocated
+on top of the frame (tracemalloc) and checks that both agree.
+
+    python -m benchmarks.bench_summary --rows 2000000 5000000
+"""
+import argparse
+import gc
+import logging
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from analysis.load_data import compact_dataset
+from analysis.metrics import (
+    compute_exposure_by_iteration,
+    compute_exposure_by_position,
+    compute_exposure_by_run,
+    compute_overall_exposure,
+    compute_top_political_channels,
+    compute_top_political_videos,
+    summarize_exposure,
+)
+from benchmarks.bench_compact import make_dataset
+
+
+def per_table(df: pd.DataFrame) -> dict:
+    return {
+        'overall': compute_overall_exposure(df),
+        'by_iteration': compute_exposure_by_iteration(df),
+        'by_position': compute_exposure_by_position(df),
+        'by_run': compute_exposure_by_run(df),
+        'top_videos': compute_top_political_videos(df),
+        'top_channels': compute_top_political_channels(df),
+    }
+
+
+def measure(fn, df):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(df)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="*", default=[2_000_000])
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    for rows in args.rows:
+        df = compact_dataset(make_dataset(rows))
+        gc.collect()
+
+        # Timed without tracemalloc, which slows allocation-heavy code
+        baseline = min(measure(per_table, df)[0] for _ in range(2))
+        single = min(measure(summarize_exposure, df)[0] for _ in range(2))
+        tracemalloc_baseline = measure(per_table, df)
+        tracemalloc_single = measure(summarize_exposure, df)
+
+        expected, result = tracemalloc_baseline[2], tracemalloc_single[2]
+        assert all(np.isclose(result['overall'][key], value) for key, value in expected['overall'].items())
+        for key in ['by_iteration', 'by_position', 'by_run']:
+            pd.testing.assert_frame_equal(
+                result[key], expected[key], check_dtype=False, check_categorical=False
+            )
+
+        print(f"{rows:,} events")
+        print(f"  six per-table passes:  {baseline:6.2f} s   peak {tracemalloc_baseline[1]:8,.0f} MB")
+        print(f"  single pass:           {single:6.2f} s   peak {tracemalloc_single[1]:8,.0f} MB")
+        print(f"  speedup: {baseline / single:.1f}x, {tracemalloc_baseline[1] / tracemalloc_single[1]:.1f}x less peak memory")
+        del df
+        gc.collect()
+
+
+if __name__ == "__main__":
+    main()
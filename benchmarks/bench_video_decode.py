@@ -0,0 +1,86 @@
+"""
+Microbenchmark: per-item dict walking vs. the schema-driven decoder for
+videos.list responses.
+
+    python -m benchmarks.bench_video_decode --pages 200
+"""
+import argparse
+import json
+import logging
+import time
+
+from app.services.video_decoder import decode_video_response
+from app.services.video_processing import build_video_row, is_video_data_valid
+
+
+def make_page(page: int, items_per_page: int = 50) -> bytes:
+    items = []
+    for i in range(items_per_page):
+        items.append({
+            "kind": "youtube#video",
+            "etag": f"etag-{page}-{i}",
+            "id": f"vid{page:05d}{i:03d}",
+            "snippet": {
+                "publishedAt": "2025-10-18T22:00:00Z",
+                "channelId": f"UC{page:020d}",
+                "title": f"Video {page}/{i} about elections and the economy",
+                "description": "A fairly long description. " * 20,
+                "thumbnails": {"default": {"url": "https://i.ytimg.com/vi/x/default.jpg", "width": 120, "height": 90}},
+                "channelTitle": f"Channel {page}",
+                "tags": ["news", "politics", "economy", "debate"],
+                "categoryId": "25",
+                "liveBroadcastContent": "none",
+                "defaultAudioLanguage": "en",
+            },
+            "contentDetails": {"duration": "PT10M5S", "dimension": "2d", "definition": "hd"},
+            "statistics": {"viewCount": "123456", "likeCount": "4321", "favoriteCount": "0", "commentCount": "210"},
+            "topicDetails": {"topicCategories": ["https://en.wikipedia.org/wiki/Politics"]},
+        })
+    return json.dumps({"kind": "youtube#videoListResponse", "items": items}).encode()
+
+
+def per_item_path(pages):
+    rows = []
+    for raw in pages:
+        data = json.loads(raw)
+        rows.extend(build_video_row(item) for item in data["items"] if is_video_data_valid(item))
+    return rows
+
+
+def decoder_path(pages):
+    rows = []
+    for raw in pages:
+        rows.extend(decode_video_response(raw))
+    return rows
+
+
+def best_of(fn, pages, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        rows = fn(pages)
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200, help="number of 50-item responses")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    pages = [make_page(p) for p in range(args.pages)]
+
+    baseline, n = best_of(per_item_path, pages, args.repeats)
+    decoded, m = best_of(decoder_path, pages, args.repeats)
+    assert n == m
+
+    print(f"{n:,} items in {args.pages} responses (best of {args.repeats})")
+    print(f"  json + is_video_data_valid + build_video_row: {baseline * 1000:8.1f} ms  ({n / baseline:,.0f} items/s)")
+    print(f"  decode_video_response:                       {decoded * 1000:8.1f} ms  ({n / decoded:,.0f} items/s)")
+    print(f"  speedup: {baseline / decoded:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
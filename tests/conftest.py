@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def make_exposure_data(seed=0, ties=False):
+    """
+    Synthetic videos and rec_events for comparing exposure summaries across
+    backends. Without ties video i is recommended 40 - i times, so top-N
+    rankings are unambiguous. With ties videos 0-41 are recommended 6 times
+    each and spread over 30 channels, so the rankings are decided by the ID
+    tie-breaks alone (numpy sorts fewer than 17 rows stably either way).
+    """
+    rng = np.random.default_rng(seed)
+    channels = 30 if ties else 7
+    videos = pd.DataFrame({
+        'video_id': [f"v{i:03d}" for i in range(60)],
+        'title': [f"Video {i}" for i in range(60)],
+        'channel_id': [f"c{i % channels:02d}" for i in range(60)],
+        'channel_title': [None if i == 5 else f"Channel {i % channels}" for i in range(60)],
+        'view_count': pd.array(range(60), dtype='Int64'),
+        'category_id': pd.array([25 if i % 3 else 10 for i in range(60)], dtype='Int32'),
+        'category_name': ['News & Politics' if i % 3 else 'Music' for i in range(60)],
+        'signal_count': rng.integers(0, 5, 60).astype('int16'),
+    })
+    counts = np.full(42, 6) if ties else np.arange(40, 0, -1)
+    picks = rng.permutation(np.repeat(np.arange(len(counts)), counts))
+    rows = len(picks)
+    events = pd.DataFrame({
+        'id': np.arange(1, rows + 1),
+        'run_id': [f"run-{i // 37}" for i in range(rows)],
+        'iteration': rng.integers(0, 12, rows).astype('int32'),
+        'video_id': videos['video_id'].to_numpy()[picks],
+        'position': pd.array([None if i % 11 == 0 else int(p) for i, p in enumerate(rng.integers(0, 25, rows))], dtype='Int32'),
+        'collected_at': pd.Timestamp('2025-10-01', tz='UTC') + pd.to_timedelta(np.arange(rows) * 300, unit='s'),
+    })
+    return videos, events
+
+
+def labeled_frame(videos, events, min_signals=2):
+    """The analysis frame compute_exposure_summary expects: events joined with their video."""
+    df = events.rename(columns={'iteration': 'iteration_rec'}).merge(
+        videos.drop(columns='category_id'), on='video_id', how='left'
+    )
+    df['is_political'] = df['signal_count'] >= min_signals
+    return df
+
+
+@pytest.fixture
+def exposure_data():
+    return make_exposure_data
+
+
+@pytest.fixture
+def exposure_frame():
+    return labeled_frame
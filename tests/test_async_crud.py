@@ -0,0 +1,55 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from app.crud.channel import get_existing_channel_ids_async
+from app.crud.rec_event import insert_rec_events_async
+from app.crud.video import BULK_UPSERT_CHUNK_SIZE, bulk_upsert_videos_async, touch_videos_async
+
+
+def _session():
+    session = MagicMock()
+    session.execute = AsyncMock()
+    session.commit = AsyncMock()
+    session.scalars = AsyncMock(return_value=["UC1"])
+    return session
+
+
+def test_bulk_upsert_videos_async_chunks_and_commits_once():
+    session = _session()
+    videos = [{"video_id": f"v{i}", "title": "t"} for i in range(BULK_UPSERT_CHUNK_SIZE + 1)]
+
+    written = asyncio.run(bulk_upsert_videos_async(session, videos))
+
+    assert written == len(videos)
+    assert session.execute.await_count == 2
+    session.commit.assert_awaited_once()
+
+
+def test_async_variants_skip_empty_input():
+    session = _session()
+
+    assert asyncio.run(bulk_upsert_videos_async(session, [])) == 0
+    assert asyncio.run(touch_videos_async(session, [])) == 0
+    assert asyncio.run(get_existing_channel_ids_async(session, [])) == set()
+    session.execute.assert_not_awaited()
+
+
+def test_get_existing_channel_ids_async():
+    session = _session()
+
+    assert asyncio.run(get_existing_channel_ids_async(session, ["UC1", "UC2"])) == {"UC1"}
+
+
+def test_insert_rec_events_async_adds_all_and_commits():
+    session = _session()
+    events = [
+        {"run_id": None, "iteration": 0, "source_video_id": "a", "video_id": video_id, "position": 1}
+        for video_id in ["c", "b", "c"]
+    ]
+
+    inserted = asyncio.run(insert_rec_events_async(session, events))
+
+    session.add_all.assert_called_once_with(inserted)
+    session.commit.assert_awaited_once()
+    _, counts = session.execute.await_args.args
+    assert counts == [{"counted_video_id": "b", "added": 1}, {"counted_video_id": "c", "added": 2}]
@@ -0,0 +1,30 @@
+from unittest.mock import MagicMock, patch
+
+from app.services import coordination
+from app.services.coordination import Coordinator
+
+
+def _coordinator(timeout=10):
+    return Coordinator(engine=None, worker_id="me", wait_timeout_seconds=timeout, poll_seconds=0)
+
+
+def test_released_claims_end_the_wait_and_only_expired_ones_are_returned():
+    polls = [
+        {"a": True, "b": True, "c": False},
+        {"a": True},
+        {},
+    ]
+    with patch.object(coordination, 'foreign_claims', side_effect=polls) as foreign_claims:
+        abandoned = _coordinator().wait_for_claims(MagicMock(), {"a", "b", "c", "d"})
+
+    # b was released without ever being stored (e.g. a private video); it is not refetched
+    assert abandoned == {"c"}
+    assert foreign_claims.call_count == 3
+    assert foreign_claims.call_args_list[1].args[1] == {"a", "b"}
+
+
+def test_live_claims_are_left_to_their_owner_after_timeout():
+    with patch.object(coordination, 'foreign_claims', return_value={"a": True}):
+        abandoned = _coordinator(timeout=0).wait_for_claims(MagicMock(), {"a"})
+
+    assert abandoned == set()
@@ -0,0 +1,25 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from app import db
+
+
+def test_concurrent_first_use_creates_one_engine():
+    def slow_create_engine(*args, **kwargs):
+        time.sleep(0.05)
+        return MagicMock()
+
+    with patch.object(db, '_engine', None), patch.object(db, '_sessionmaker', None), \
+         patch('sqlalchemy.create_engine', side_effect=slow_create_engine) as create_engine, \
+         patch('app.services.profiling.profiler.attach_to_engine') as attach:
+        engines = []
+        threads = [threading.Thread(target=lambda: engines.append(db.get_engine())) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert create_engine.call_count == 1
+    assert attach.call_count == 1
+    assert all(engine is engines[0] for engine in engines)
@@ -0,0 +1,106 @@
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from analysis import duckdb_backend, snapshot
+from analysis.load_data import merge_dataset
+from analysis.metrics import compute_exposure_summary
+from analysis.political_labeling import add_custom_political_labels
+
+pytest.importorskip('duckdb')
+
+
+def _tables(videos, events):
+    """The snapshot tables holding the conftest videos and events; every sixth video is unlabeled."""
+    n = len(videos)
+    channel_ids = videos['channel_id'].drop_duplicates()
+    labeled = videos[videos.index % 6 != 0]
+    return {
+        'rec_events': events.assign(source_video_id=None),
+        'videos': pd.DataFrame({
+            'video_id': videos['video_id'],
+            'title': videos['title'],
+            'description': [None] * n,
+            'iteration': [0] * n,
+            'channel_id': videos['channel_id'],
+            'channel_title': videos['channel_title'],
+            'tags': [[f"tag{i}"] if i % 2 else None for i in range(n)],
+            'topic_categories': [None] * n,
+            'category_id': videos['category_id'],
+            'published_at': pd.Series([pd.NaT] * n, dtype='datetime64[us, UTC]'),
+            'language': ['en'] * n,
+            'duration_iso': [None] * n,
+            'view_count': videos['view_count'],
+            'like_count': pd.array([None] * n, dtype='Int64'),
+            'comment_count': pd.array([None] * n, dtype='Int64'),
+            'metadata_refreshed_at': pd.Series([pd.NaT] * n, dtype='datetime64[us, UTC]'),
+        }),
+        'channels': pd.DataFrame({
+            'channel_id': channel_ids.to_numpy(),
+            'title': [f"Channel {c}" for c in range(len(channel_ids))],
+            'description': [None] * len(channel_ids),
+            'topic_categories': [None] * len(channel_ids),
+            'country': ['NO'] * len(channel_ids),
+        }),
+        'categories': pd.DataFrame({'id': pd.array([10, 25], dtype='int32'), 'name': ['Music', 'News & Politics']}),
+        'video_labels': pd.DataFrame({
+            'video_id': labeled['video_id'].to_numpy(),
+            **{name: (labeled['signal_count'] > k).to_numpy() for k, name in enumerate((
+                'signal_category', 'signal_topic', 'signal_channel_topic',
+                'signal_title', 'signal_description', 'signal_tags',
+            ))},
+            'signal_count': labeled['signal_count'].to_numpy(),
+            'config_hash': ['abc'] * len(labeled),
+            'labeled_at': pd.Timestamp('2025-10-01', tz='UTC'),
+        }),
+    }
+
+
+def _export(tables, path, chunk_rows=100):
+    def chunks(engine, query, dtypes, chunk_rows):
+        frame = pending.pop(0)
+        return (frame.iloc[start:start + chunk_rows] for start in range(0, len(frame), chunk_rows))
+
+    pending = [tables[name] for name in snapshot.snapshot_tables()]
+    with patch.object(snapshot, 'iter_columns', side_effect=chunks):
+        return snapshot.export_snapshot(engine=object(), snapshot_dir=path, chunk_rows=chunk_rows)
+
+
+def _in_memory(tables, min_signals=2, channels=None):
+    df = merge_dataset(tables['rec_events'], tables['videos'], tables['channels'], tables['categories'])
+    df = df.merge(tables['video_labels'][['video_id', 'signal_count']], on='video_id', how='left')
+    df['is_political'] = df['signal_count'].fillna(0) >= min_signals
+    if channels:
+        df = add_custom_political_labels(df, channel_ids=channels)
+    return compute_exposure_summary(df)
+
+
+def test_export_writes_hive_partitioned_events(tmp_path, exposure_data):
+    tables = _tables(*exposure_data())
+    manifest = _export(tables, tmp_path / 'snapshot')
+
+    assert manifest['tables']['rec_events'] == len(tables['rec_events'])
+    partitions = sorted(p.name for p in (tmp_path / 'snapshot' / 'rec_events').iterdir())
+    assert partitions == ['collected_date=2025-10-01', 'collected_date=2025-10-02', 'collected_date=2025-10-03']
+    assert not (tmp_path / 'snapshot.tmp').exists()
+
+
+@pytest.mark.parametrize('channels, ties', [(None, False), (['c03'], False), (None, True)])
+def test_duckdb_summary_matches_in_memory(tmp_path, exposure_data, channels, ties):
+    tables = _tables(*exposure_data(ties=ties))
+    _export(tables, tmp_path / 'snapshot')
+
+    result = duckdb_backend.compute_duckdb_exposure_summary(tmp_path / 'snapshot', custom_political_channels=channels)
+    expected = _in_memory(tables, channels=channels)
+
+    assert result['overall'] == pytest.approx(expected['overall'])
+    for key in ['by_iteration', 'by_position', 'by_run', 'top_videos', 'top_channels']:
+        pd.testing.assert_frame_equal(
+            result[key].reset_index(drop=True), expected[key].reset_index(drop=True), check_dtype=False
+        )
+
+
+def test_missing_snapshot_is_reported(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        duckdb_backend.compute_duckdb_exposure_summary(tmp_path / 'nowhere')
@@ -0,0 +1,100 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.services import id_cache
+from app.services.channel_processing import process_and_insert_channels_from_videos
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    id_cache.clear_all()
+    yield
+    id_cache.clear_all()
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = id_cache.LRUCache("test", maxsize=2)
+    cache.put("a")
+    cache.put("b")
+    assert "a" in cache  # touch a so b becomes the oldest
+    cache.put("c")
+
+    assert "b" not in cache
+    assert "a" in cache
+    assert "c" in cache
+    assert len(cache) == 2
+
+
+def test_lru_cache_counts_hits_and_misses():
+    cache = id_cache.LRUCache("test", maxsize=10)
+    cache.put("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+    cache.invalidate("a")
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
+
+
+@patch('app.services.channel_processing.fetch_channel_details')
+@patch('app.services.channel_processing.get_existing_channel_ids')
+def test_cached_channels_skip_database(mock_existing, mock_fetch):
+    id_cache.channel_ids.put("known_channel")
+    mock_existing.return_value = {"db_channel"}
+    videos = [
+        {"snippet": {"channelId": "known_channel"}},
+        {"snippet": {"channelId": "db_channel"}},
+    ]
+
+    process_and_insert_channels_from_videos(MagicMock(), videos)
+
+    mock_existing.assert_called_once()
+    assert mock_existing.call_args[0][1] == ["db_channel"]
+    mock_fetch.assert_not_called()
+    assert "db_channel" in id_cache.channel_ids
+
+
+@patch('app.services.channel_processing.upsert_channel')
+@patch('app.services.channel_processing.fetch_channel_details')
+@patch('app.services.channel_processing.get_existing_channel_ids', return_value=set())
+def test_inserted_channels_are_cached(mock_existing, mock_fetch, mock_upsert):
+    mock_fetch.return_value = {"items": [{"id": "new_channel", "snippet": {"title": "New"}}]}
+
+    process_and_insert_channels_from_videos(MagicMock(), [{"snippet": {"channelId": "new_channel"}}])
+
+    mock_upsert.assert_called_once()
+    assert "new_channel" in id_cache.channel_ids
+
+
+@patch('app.services.id_cache.get_category_by_id', return_value=None)
+@patch('app.services.id_cache.list_categories')
+def test_category_lookup_loads_table_once(mock_list, mock_get_by_id):
+    category = MagicMock(id=25, name="News & Politics")
+    category.name = "News & Politics"
+    mock_list.return_value = [category]
+    session = MagicMock()
+
+    assert id_cache.is_known_category_id(session, 25)
+    assert id_cache.is_known_category_id(session, 25)
+    assert not id_cache.is_known_category_id(session, 99)
+    assert not id_cache.is_known_category_id(session, 99)
+
+    mock_list.assert_called_once_with(session)
+    mock_get_by_id.assert_called_once_with(session, 99)
+    assert id_cache.category_ids_by_name.get("News & Politics") == 25
+
+
+@patch('app.services.id_cache.get_category_by_id', return_value=None)
+@patch('app.services.id_cache.list_categories', return_value=[])
+def test_synced_category_clears_negative_cache(mock_list, mock_get_by_id):
+    session = MagicMock()
+    assert not id_cache.is_known_category_id(session, 30)
+
+    id_cache.remember_category(30, "Movies")
+
+    assert id_cache.is_known_category_id(session, 30)
+    mock_get_by_id.assert_called_once_with(session, 30)
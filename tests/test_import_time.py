@@ -0,0 +1,10 @@
+import pytest
+
+from benchmarks.bench_import_time import BUDGETS, loaded_modules
+
+
+@pytest.mark.parametrize("module", ["app.db", "app.orchestrator", "analysis.analyze"])
+def test_entry_points_defer_heavy_imports(module):
+    _, lazy = BUDGETS[module]
+
+    assert loaded_modules(module, lazy) == []
@@ -0,0 +1,71 @@
+import json
+import urllib.request
+
+import pytest
+
+from app.services.instrumentation import CollectorMetrics, metrics as global_metrics, start_metrics_server
+
+
+@pytest.fixture
+def collector_metrics():
+    return CollectorMetrics()
+
+
+def test_stage_records_time_and_count(collector_metrics):
+    with collector_metrics.stage("api_fetch"):
+        pass
+    collector_metrics.observe_stage("api_fetch", 0.5)
+
+    text = collector_metrics.render_prometheus()
+
+    assert 'yt_collector_stage_seconds_count{stage="api_fetch"} 2' in text
+    assert 'yt_collector_stage_seconds_max{stage="api_fetch"} 0.500000' in text
+
+
+def test_counters_and_gauges_render_with_labels(collector_metrics):
+    collector_metrics.increment("db_rows", 3, table="videos")
+    collector_metrics.increment("db_rows", 2, table="videos")
+    collector_metrics.set_gauge("last_cycle_recs_per_minute", 12.5)
+
+    text = collector_metrics.render_prometheus()
+
+    assert "# TYPE yt_collector_db_rows_total counter" in text
+    assert 'yt_collector_db_rows_total{table="videos"} 5' in text
+    assert "yt_collector_last_cycle_recs_per_minute 12.5" in text
+
+
+def test_end_cycle_logs_one_json_record(collector_metrics, caplog):
+    collector_metrics.increment("recommendations", 100)
+    collector_metrics.begin_cycle()
+    collector_metrics.increment("recommendations", 30)
+    collector_metrics.increment("api_units", 2, source="crawl")
+    collector_metrics.increment("api_units", 3, source="refresh")
+    collector_metrics.increment("db_rows", 30, table="rec_events")
+    collector_metrics.observe_stage("video_ingest", 0.25)
+
+    with caplog.at_level("INFO", logger="app.services.instrumentation"):
+        record = collector_metrics.end_cycle("ok")
+
+    logged = json.loads(caplog.records[-1].getMessage())
+    assert logged == record
+    assert record["recommendations"] == 30
+    assert record["api_units"] == 2
+    assert record["refresh_api_units"] == 3
+    assert record["db_rows"] == {"rec_events": 30}
+    assert record["stages"] == {"video_ingest": 0.25}
+    assert record["recs_per_minute"] > 0
+    assert collector_metrics.counter_value("cycles", status="ok") == 1
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    global_metrics.increment("recommendations", 1)
+    server = start_metrics_server(port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            body = response.read().decode()
+            assert response.headers["Content-Type"].startswith("text/plain")
+    finally:
+        server.shutdown()
+
+    assert "yt_collector_recommendations_total" in body
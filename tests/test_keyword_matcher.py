@@ -0,0 +1,45 @@
+from analysis.keyword_matcher import KeywordMatcher
+from analysis.political_labeling import contains_political_keywords, get_political_keywords
+
+
+def test_finds_single_and_multi_word_keywords_in_order():
+    matcher = KeywordMatcher(['vote', 'supreme court', 'court ruling', 'election'])
+
+    assert matcher.find_all('Supreme Court ruling on the vote, then a vote recount') == [
+        'supreme court', 'court ruling', 'vote',
+    ]
+
+
+def test_matches_whole_tokens_only():
+    matcher = KeywordMatcher(['vote', 'gun control'])
+
+    assert matcher.find_all('A devoted voter') == []
+    assert matcher.find_all('shotgun controller') == []
+    assert matcher.matches('Gun   control,\nvote!')
+
+
+def test_overlapping_prefixes_use_failure_links():
+    matcher = KeywordMatcher(['a b c', 'b c d', 'c'])
+
+    assert matcher.find_all('a b x b c d') == ['c', 'b c d']
+
+
+def test_hyphenated_and_devanagari_keywords():
+    matcher = KeywordMatcher(['anti-semitism', 'चुनाव'])
+
+    assert matcher.find_all('Rising anti semitism') == ['anti-semitism']
+    assert matcher.find_all('लोकसभा चुनाव 2024') == ['चुनाव']
+
+
+def test_non_text_is_no_match():
+    matcher = KeywordMatcher(['vote'])
+
+    assert matcher.find_all(None) == []
+    assert matcher.find_all(float('nan')) == []
+    assert not contains_political_keywords(None, get_political_keywords())
+
+
+def test_decomposed_accents_match_precomposed_keywords():
+    matcher = KeywordMatcher(['elección'])
+
+    assert matcher.find_all('La eleccio\u0301n presidencial') == ['elección']
@@ -0,0 +1,185 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from analysis import labeled_cache, political_labeling
+from analysis.labeled_cache import (
+    evict_cache,
+    get_cached_labeled_dataset,
+    read_labeled_cache,
+    read_video_text,
+    update_events_cache,
+)
+
+START = datetime(2025, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+VIDEOS = pd.DataFrame({
+    'video_id': ['a', 'b', 'c'],
+    'title': ['Election debate tonight', 'Cooking pasta', 'Parliament vote'],
+    'description': ['', '', ''],
+    'iteration': [0, 0, 0],
+    'channel_id': ['UC1', 'UC2', 'UC1'],
+    'channel_title': ['News', 'Food', 'News'],
+    'tags': [None, None, None],
+    'topic_categories': [None, None, None],
+    'category_id': [25, 26, 25],
+    'metadata_refreshed_at': pd.to_datetime([START] * 3, utc=True),
+})
+CHANNELS = pd.DataFrame({'channel_id': ['UC1', 'UC2'], 'title': ['News', 'Food'], 'topic_categories': [None, None]})
+CATEGORIES = pd.DataFrame({'id': [25, 26], 'name': ['News & Politics', 'Howto & Style']})
+
+
+def events(rows):
+    return pd.DataFrame({
+        'id': [row[0] for row in rows],
+        'run_id': ['run'] * len(rows),
+        'iteration': [0] * len(rows),
+        'source_video_id': [None] * len(rows),
+        'video_id': [row[1] for row in rows],
+        'position': list(range(len(rows))),
+        'collected_at': pd.to_datetime([START + timedelta(minutes=row[0]) for row in rows], utc=True),
+    })
+
+
+def select_videos(videos, video_ids=None, refreshed_after=None):
+    if video_ids is not None:
+        videos = videos[videos.video_id.isin(video_ids)]
+    if refreshed_after is not None:
+        videos = videos[videos.metadata_refreshed_at > refreshed_after]
+    return videos
+
+
+@pytest.fixture
+def loaders(tmp_path):
+    videos = VIDEOS.copy()
+    with patch.object(labeled_cache, 'get_cache_dir', return_value=tmp_path), \
+         patch.object(labeled_cache, 'load_rec_events') as load_rec_events, \
+         patch.object(labeled_cache, 'load_videos', side_effect=lambda engine, **kwargs: select_videos(videos, **kwargs)), \
+         patch.object(labeled_cache, 'load_channels', return_value=CHANNELS), \
+         patch.object(labeled_cache, 'load_categories', return_value=CATEGORIES):
+        # Tests edit loaders.videos in place to simulate a metadata refresh
+        load_rec_events.videos = videos
+        yield load_rec_events
+
+
+def _label_spy():
+    return patch.object(political_labeling, 'label_political_content', wraps=political_labeling.label_political_content)
+
+
+def test_second_update_only_loads_and_labels_the_delta(loaders):
+    loaders.return_value = events([(1, 'a'), (2, 'b'), (3, 'a')])
+    first = update_events_cache(engine=object())
+    read_labeled_cache(2)
+
+    loaders.return_value = events([(4, 'a'), (5, 'c')])
+    second = update_events_cache(engine=object())
+    with _label_spy() as label:
+        df = read_labeled_cache(2)
+
+    assert first["max_id"] == 3
+    assert loaders.call_args.kwargs["newer_than_id"] == 3
+    assert label.call_args.args[0]['video_id'].tolist() == ['c']
+    assert [p["rows"] for p in second["partitions"]] == [3, 2]
+    assert df['id'].tolist() == [1, 2, 3, 4, 5]
+    assert df.set_index('id')['is_political'].to_dict() == {1: True, 2: False, 3: True, 4: True, 5: True}
+
+
+def test_refreshed_video_metadata_reaches_cached_events_and_labels(loaders):
+    loaders.return_value = events([(1, 'b'), (2, 'a')])
+    update_events_cache(engine=object())
+    before = read_labeled_cache(2)
+
+    refreshed = loaders.videos.video_id == 'b'
+    loaders.videos.loc[refreshed, 'title'] = 'Election results'
+    loaders.videos.loc[refreshed, 'category_id'] = 25
+    loaders.videos.loc[refreshed, 'metadata_refreshed_at'] = pd.Timestamp(START + timedelta(hours=1))
+    loaders.return_value = events([(3, 'a')])
+    update_events_cache(engine=object())
+    with _label_spy() as label:
+        after = read_labeled_cache(2)
+
+    assert label.call_args.args[0]['video_id'].tolist() == ['b']
+    assert before.set_index('id')['is_political'].to_dict() == {1: False, 2: True}
+    assert after.set_index('id')['title'].to_dict() == {1: 'Election results', 2: 'Election debate tonight', 3: 'Election debate tonight'}
+    assert after.set_index('id')['is_political'].to_dict() == {1: True, 2: True, 3: True}
+
+
+def test_min_signals_is_applied_at_read_time(loaders):
+    loaders.return_value = events([(1, 'a'), (2, 'c')])
+    update_events_cache(engine=object())
+
+    lenient = read_labeled_cache(1)
+    with _label_spy() as label:
+        strict = read_labeled_cache(6)
+
+    label.assert_not_called()
+    assert lenient['is_political'].all()
+    assert not strict['is_political'].any()
+
+
+def test_late_rows_below_watermark_are_added_once(loaders):
+    loaders.return_value = events([(1, 'a'), (3, 'b')])
+    update_events_cache(engine=object())
+
+    # id 2 committed after id 3 was cached; id 3 comes back from the re-scan window
+    loaders.return_value = events([(2, 'b'), (3, 'b')])
+    manifest = update_events_cache(engine=object())
+
+    assert manifest["rows"] == 3
+    assert sorted(read_labeled_cache(2)['id']) == [1, 2, 3]
+
+
+def test_changed_labeling_config_gets_its_own_entry(loaders, tmp_path):
+    loaders.return_value = events([(1, 'a'), (2, 'b')])
+    before = get_cached_labeled_dataset(min_signals=2, engine=object())
+
+    with patch.object(political_labeling, 'POLITICAL_CATEGORY_IDS', {26}):
+        after = get_cached_labeled_dataset(min_signals=1, engine=object())
+
+    assert loaders.call_count == 1
+    assert len(list(tmp_path.glob('labels-*'))) == 2
+    assert before.set_index('video_id')['signal_category'].to_dict() == {'a': True, 'b': False}
+    assert after.set_index('video_id')['signal_category'].to_dict() == {'a': False, 'b': True}
+
+
+def test_evict_cache_removes_least_recently_used_entries(tmp_path):
+    with patch.object(labeled_cache, 'get_cache_dir', return_value=tmp_path):
+        (tmp_path / 'events').mkdir()
+        (tmp_path / 'events' / 'part-00000.parquet').write_bytes(b'x' * 100)
+        for i, name in enumerate(['labels-old', 'labels-mid', 'labels-new']):
+            entry = tmp_path / name
+            entry.mkdir()
+            (entry / 'video_labels.parquet').write_bytes(b'x' * 100)
+            labeled_cache.write_manifest(entry, {"last_used_at": (START + timedelta(hours=i)).isoformat()})
+
+        evicted = evict_cache(max_bytes=450, keep=('labels-old',))
+
+    assert evicted == ['labels-mid']
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['events', 'labels-new', 'labels-old']
+
+
+def test_compact_read_leaves_text_out_and_labels_from_cache(loaders):
+    loaders.return_value = events([(1, 'a'), (2, 'b'), (3, 'a')])
+    update_events_cache(engine=object())
+
+    compact = read_labeled_cache(2, compact=True)
+    full = read_labeled_cache(2)
+
+    assert 'description' not in compact and 'matched_keywords' not in compact
+    assert isinstance(compact['video_id'].dtype, pd.CategoricalDtype)
+    assert compact['is_political'].tolist() == full['is_political'].tolist() == [True, False, True]
+
+
+def test_video_text_restores_what_the_compact_read_leaves_out(loaders):
+    loaders.return_value = events([(1, 'a'), (2, 'b'), (3, 'a')])
+    update_events_cache(engine=object())
+
+    compact = read_labeled_cache(2, compact=True)
+    text = read_video_text(compact['video_id'])
+
+    assert text['video_id'].tolist() == ['a', 'b']
+    assert {'description', 'tags', 'title_channel', 'topic_categories_channel', 'matched_keywords'} <= set(text)
+    assert text.set_index('video_id')['title_channel'].to_dict() == {'a': 'News', 'b': 'Food'}
+    assert len(text.set_index('video_id').loc['a', 'matched_keywords']) > 0
@@ -0,0 +1,115 @@
+import uuid
+from datetime import datetime, timezone
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, insert
+
+import app.models.video  # noqa: F401  (rec_events references videos)
+from analysis.load_data import compact_dataset, frame_memory_mb, load_rec_events, read_columns
+from analysis.metrics import compute_exposure_summary
+from app.models.rec_event import RecEvent
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    RecEvent.__table__.create(engine)
+    collected = datetime(2025, 10, 18, 22, 0, tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(insert(RecEvent), [
+            {
+                "id": i,
+                "run_id": uuid.UUID(int=i // 5),
+                "iteration": i % 3,
+                "source_video_id": None if i % 4 == 0 else f"src{i}",
+                "video_id": f"vid{i % 7}",
+                "position": None if i == 3 else i % 20,
+                "collected_at": collected,
+            }
+            for i in range(1, 26)
+        ])
+    return engine
+
+
+def test_load_rec_events_builds_typed_columns(engine):
+    df = load_rec_events(engine)
+
+    assert len(df) == 25
+    assert df["id"].dtype == "int64"
+    assert df["iteration"].dtype == "int32"
+    assert df["position"].dtype == "Int32"
+    assert df["position"].isna().sum() == 1
+    assert isinstance(df["collected_at"].dtype, pd.DatetimeTZDtype)
+    assert df["source_video_id"].isna().sum() == 6
+
+
+def test_load_rec_events_projects_and_filters(engine):
+    df = load_rec_events(engine, iteration=0, columns=["video_id", "iteration"])
+
+    assert list(df.columns) == ["video_id", "iteration"]
+    assert (df["iteration"] == 0).all()
+    with pytest.raises(ValueError):
+        load_rec_events(engine, columns=["nope"])
+
+
+def test_read_columns_concatenates_chunks_and_handles_empty(engine):
+    from sqlalchemy import select
+
+    chunked = read_columns(engine, select(RecEvent.id, RecEvent.position), {"id": "int64", "position": "Int32"}, chunk_rows=4)
+    empty = load_rec_events(engine, iteration=99)
+
+    assert chunked["id"].tolist() == list(range(1, 26))
+    assert chunked["position"].dtype == "Int32"
+    assert len(empty) == 0
+    assert empty["position"].dtype == "Int32"
+    assert list(empty.columns) == list(load_rec_events(engine).columns)
+
+
+def _labeled_events(rows):
+    videos = [f"vid{i % 50:03d}" for i in range(rows)]
+    return pd.DataFrame({
+        'id': range(1, rows + 1),
+        'run_id': [str(uuid.UUID(int=i // 100)) for i in range(rows)],
+        'iteration_rec': [(i // 20) % 30 for i in range(rows)],
+        'source_video_id': [None] * rows,
+        'video_id': videos,
+        'position': pd.array([i % 20 for i in range(rows)], dtype='Int32'),
+        'title': [f"Title of {video}" for video in videos],
+        'description': [f"A long description of {video} " * 20 for video in videos],
+        'channel_id': [f"UC{video[-1]}" for video in videos],
+        'channel_title': [f"Channel {video[-1]}" for video in videos],
+        'tags': [['news', video] for video in videos],
+        'view_count': pd.array([1000] * rows, dtype='Int64'),
+        'category_name': ['News & Politics'] * rows,
+        'signal_count': [int(video[-1]) % 4 for video in videos],
+        'is_political': [int(video[-1]) % 4 >= 2 for video in videos],
+    })
+
+
+def test_compact_dataset_shrinks_frame_and_keeps_metrics():
+    df = _labeled_events(2000)
+
+    compact = compact_dataset(df)
+
+    assert 'description' not in compact and 'tags' not in compact
+    assert isinstance(compact['video_id'].dtype, pd.CategoricalDtype)
+    assert compact['iteration_rec'].dtype == 'int16'
+    assert compact['position'].dtype == 'Int16'
+    assert compact['signal_count'].dtype == 'int8'
+    assert frame_memory_mb(compact) < frame_memory_mb(df) / 5
+
+    expected, actual = compute_exposure_summary(df), compute_exposure_summary(compact)
+    assert actual['overall'] == pytest.approx(expected['overall'])
+    for key in ['by_iteration', 'by_position', 'by_run', 'top_videos', 'top_channels']:
+        pd.testing.assert_frame_equal(
+            actual[key].reset_index(drop=True), expected[key].reset_index(drop=True),
+            check_dtype=False, check_categorical=False,
+        )
+
+
+def test_compact_dataset_keeps_lists_as_arrow_when_text_is_kept():
+    compact = compact_dataset(_labeled_events(10), drop_text=False)
+
+    assert str(compact['tags'].dtype).startswith('list<item: string>')
+    assert list(compact['tags'])[0] == ['news', 'vid000']
@@ -0,0 +1,153 @@
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock, patch
+
+from analysis import materialized_views
+from analysis.metrics import compute_exposure_summary
+from sqlalchemy.dialects import postgresql
+
+
+@pytest.fixture
+def labeled_df():
+    videos = pd.DataFrame({
+        'video_id': ['v1', 'v2', 'v3', 'v4'],
+        'signal_count': [3, 2, 1, 0],
+        'channel_id': ['c1', 'c1', 'c2', 'c3'],
+        'channel_title': ['Chan 1', 'Chan 1', 'Chan 2', 'Chan 3'],
+        'title': ['Video 1', 'Video 2', 'Video 3', 'Video 4'],
+        'view_count': [100, 200, 300, 400],
+        'category_name': ['News & Politics', 'News & Politics', 'Music', 'Gaming'],
+    })
+    events = pd.DataFrame({
+        'id': range(1, 11),
+        'run_id': ['r1'] * 6 + ['r2'] * 4,
+        'iteration_rec': [1, 1, 2, 2, 3, 3, 1, 2, 2, 4],
+        'position': [0, 1, 0, 2, 1, 0, 0, 1, 3, 2],
+        'video_id': ['v1', 'v3', 'v1', 'v2', 'v4', 'v2', 'v2', 'v4', 'v1', 'v3'],
+    })
+    df = events.merge(videos, on='video_id')
+    df['is_political'] = df['signal_count'] >= 2
+    return df.sort_values('id').reset_index(drop=True)
+
+
+def _views_from_df(df):
+    """Mirror the SQL in the 5c1e7d9a2b44 migration with pandas."""
+    events = df.rename(columns={'iteration_rec': 'iteration'})
+
+    def grouped(keys, **extra):
+        return events.groupby(keys).agg(
+            recommendations=('id', 'count'),
+            unique_videos=('video_id', 'nunique'),
+            **extra
+        ).reset_index()
+
+    by_video = events.groupby(
+        ['video_id', 'signal_count', 'title', 'channel_title', 'view_count', 'category_name']
+    ).agg(
+        recommendations=('id', 'count'),
+        iteration_sum=('iteration', 'sum'),
+        position_sum=('position', 'sum'),
+        position_count=('position', 'count'),
+    ).reset_index()
+
+    return {
+        'mv_exposure_overall': grouped(['signal_count']),
+        'mv_exposure_by_iteration': grouped(['iteration', 'signal_count']),
+        'mv_exposure_by_position': grouped(['position', 'signal_count']),
+        'mv_exposure_by_run': grouped(['run_id', 'signal_count'], max_iteration=('iteration', 'max')),
+        'mv_exposure_by_video': by_video,
+        'mv_exposure_by_channel': grouped(
+            ['channel_id', 'channel_title', 'signal_count'], iteration_sum=('iteration', 'sum')
+        ),
+    }
+
+
+def test_summary_from_views_matches_dataframe_summary(labeled_df):
+    views = _views_from_df(labeled_df)
+    engine = MagicMock()
+
+    with patch.object(materialized_views, '_read_view', side_effect=lambda conn, name: views[name]):
+        from_views = compute_exposure_summary(engine=engine, min_signals=2)
+    from_df = compute_exposure_summary(labeled_df)
+
+    assert from_views['overall'] == pytest.approx(from_df['overall'])
+
+    for key in ['by_iteration', 'by_position', 'by_run']:
+        pd.testing.assert_frame_equal(
+            from_views[key].reset_index(drop=True),
+            from_df[key].reset_index(drop=True),
+            check_dtype=False,
+        )
+
+    top_videos = from_df['top_videos'].sort_values('video_id').reset_index(drop=True)
+    pd.testing.assert_frame_equal(
+        from_views['top_videos'].sort_values('video_id').reset_index(drop=True),
+        top_videos,
+        check_dtype=False,
+    )
+    pd.testing.assert_frame_equal(
+        from_views['top_channels'].reset_index(drop=True),
+        from_df['top_channels'].reset_index(drop=True),
+        check_dtype=False,
+    )
+
+
+def test_summary_from_views_respects_threshold(labeled_df):
+    views = _views_from_df(labeled_df)
+
+    with patch.object(materialized_views, '_read_view', side_effect=lambda conn, name: views[name]):
+        summary = materialized_views.load_exposure_summary_from_views(MagicMock(), min_signals=1)
+
+    assert summary['overall']['political_recommendations'] == 8
+    assert summary['overall']['unique_political_videos'] == 3
+
+
+def test_persist_video_labels_writes_signals_and_config_hash():
+    labeled = pd.DataFrame({
+        'video_id': ['v1', 'v1', 'v2'],
+        **{column: [True, True, False] for column in materialized_views.SIGNAL_COLUMNS},
+        'signal_count': [6, 6, 0],
+    })
+    engine = MagicMock()
+
+    assert materialized_views.persist_video_labels(labeled, engine=engine, config_hash='abc123') == 2
+
+    stmt = engine.begin.return_value.__enter__.return_value.execute.call_args.args[0]
+    params = stmt.compile().params
+    assert params['video_id_m0'] == 'v1' and params['video_id_m1'] == 'v2'
+    assert params['signal_tags_m0'] is True and params['signal_tags_m1'] is False
+    assert params['config_hash_m1'] == 'abc123'
+    assert 'config_hash = excluded.config_hash' in str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_sync_video_labels_labels_only_stale_videos_in_batches():
+    videos = pd.DataFrame({
+        'video_id': ['v1', 'v2', 'v3'],
+        'title': ['Election night', 'Cooking pasta', 'Travel vlog'],
+        'description': ['', '', None],
+        'tags': [['politics'], None, []],
+        'topic_categories': [None, None, None],
+        'category_id': [25, 26, 19],
+        'channel_id': ['c1', 'c2', 'c3'],
+    })
+    channels = pd.DataFrame({'channel_id': ['c1'], 'topic_categories': [['https://en.wikipedia.org/wiki/Politics']]})
+    engine = MagicMock()
+    persisted = []
+
+    def load(engine, columns, video_ids):
+        return videos[videos['video_id'].isin(video_ids)].reset_index(drop=True)
+
+    with patch.object(materialized_views, 'stale_video_ids', return_value=['v1', 'v2', 'v3']), \
+            patch.object(materialized_views, 'load_videos', side_effect=load) as load_videos, \
+            patch.object(materialized_views, 'load_channels', return_value=channels), \
+            patch.object(materialized_views, 'persist_video_labels',
+                         side_effect=lambda labels, **kwargs: persisted.append((labels, kwargs))):
+        assert materialized_views.sync_video_labels(engine, batch_size=2) == 3
+
+    assert [call.kwargs['video_ids'] for call in load_videos.call_args_list] == [['v1', 'v2'], ['v3']]
+    labels = pd.concat([labels for labels, _ in persisted], ignore_index=True)
+    assert labels['video_id'].tolist() == ['v1', 'v2', 'v3']
+    assert labels.loc[0, 'signal_channel_topic']
+    assert labels['signal_count'].tolist() == [4, 0, 0]
+    started_at = engine.connect.return_value.__enter__.return_value.execute.return_value.scalar_one.return_value
+    assert all(kwargs['labeled_at'] is started_at for _, kwargs in persisted)
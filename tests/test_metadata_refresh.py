@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+from app.crud.video import list_stale_video_ids
+from app.services import metadata_refresh
+from app.services.metadata_refresh import plan_refresh_batches, refresh_stale_videos
+
+
+def test_plan_refresh_batches_keeps_only_full_batches():
+    ids = [f"v{i}" for i in range(120)]
+
+    batches = plan_refresh_batches(ids, max_batches=5)
+
+    assert [len(batch) for batch in batches] == [50, 50]
+
+
+def test_plan_refresh_batches_sends_small_backlog():
+    assert plan_refresh_batches(["v1", "v2"], max_batches=5) == [["v1", "v2"]]
+
+
+def test_plan_refresh_batches_respects_budget():
+    ids = [f"v{i}" for i in range(500)]
+
+    assert len(plan_refresh_batches(ids, max_batches=3)) == 3
+
+
+@patch.object(metadata_refresh, 'fetch_video_rows')
+@patch.object(metadata_refresh, 'list_stale_video_ids')
+def test_refresh_skips_without_spare_quota(mock_list, mock_fetch):
+    with patch.object(metadata_refresh.quota, 'spare', return_value=0):
+        assert refresh_stale_videos(MagicMock()) == 0
+
+    mock_list.assert_not_called()
+    mock_fetch.assert_not_called()
+
+
+@patch.object(metadata_refresh, 'touch_videos')
+@patch.object(metadata_refresh, 'store_video_rows', side_effect=lambda session, rows: [row.video_id for row in rows])
+@patch.object(metadata_refresh, 'fetch_video_rows')
+@patch.object(metadata_refresh, 'list_stale_video_ids')
+def test_refresh_upserts_returned_videos_and_touches_missing(mock_list, mock_fetch, mock_store, mock_touch):
+    stale_ids = [f"v{i}" for i in range(60)]
+    mock_list.return_value = stale_ids
+    mock_fetch.return_value = [MagicMock(video_id=video_id) for video_id in stale_ids[:49]]
+    session = MagicMock()
+
+    with patch.object(metadata_refresh.quota, 'spare', return_value=2):
+        written = refresh_stale_videos(session, max_batches=10)
+
+    assert mock_list.call_args.kwargs["limit"] == 100
+    mock_fetch.assert_called_once_with(stale_ids[:50])
+    assert written == 49
+    mock_touch.assert_called_once_with(session, ["v49"])
+
+
+def test_stale_video_priority_reads_the_stored_rec_count():
+    session = MagicMock()
+
+    list_stale_video_ids(session, datetime(2026, 1, 1, tzinfo=timezone.utc), limit=100)
+
+    sql = str(session.scalars.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "rec_count" in sql
+    assert "rec_events" not in sql
@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+from analysis.load_data import compact_dataset
+from analysis.metrics import (
+    compute_exposure_by_iteration,
+    compute_exposure_by_position,
+    compute_exposure_by_run,
+    compute_overall_exposure,
+    compute_top_political_channels,
+    compute_top_political_videos,
+    summarize_exposure,
+)
+
+
+@pytest.fixture
+def dataset(exposure_data, exposure_frame):
+    videos, events = exposure_data()
+    # A video without a title is left out of top_videos; one without a view count is kept
+    videos.loc[8, 'title'] = None
+    videos.loc[3, 'view_count'] = pd.NA
+    return exposure_frame(videos, events)
+
+
+def _reference(df):
+    return {
+        'overall': compute_overall_exposure(df),
+        'by_iteration': compute_exposure_by_iteration(df),
+        'by_position': compute_exposure_by_position(df),
+        'by_run': compute_exposure_by_run(df),
+        'top_videos': compute_top_political_videos(df),
+        'top_channels': compute_top_political_channels(df),
+    }
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_single_pass_summary_matches_per_table_functions(dataset, compact):
+    df = dataset
+    if compact:
+        df = compact_dataset(df)
+
+    result = summarize_exposure(df)
+    expected = _reference(df)
+
+    assert result['overall'] == pytest.approx(expected['overall'])
+    for key in ['by_iteration', 'by_position', 'by_run', 'top_videos', 'top_channels']:
+        pd.testing.assert_frame_equal(
+            result[key].reset_index(drop=True), expected[key].reset_index(drop=True),
+            check_dtype=False, check_categorical=False,
+        )
+
+
+def test_single_pass_summary_of_frame_without_political_events(dataset):
+    df = dataset.assign(is_political=False)
+
+    result = summarize_exposure(df)
+
+    assert result['overall']['political_recommendations'] == 0
+    assert result['overall']['median_political_depth'] == 0
+    assert result['top_videos'].empty and result['top_channels'].empty
+    assert result['by_iteration']['political_count'].sum() == 0
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_top_tables_break_ties_by_id(exposure_data, exposure_frame, compact):
+    df = exposure_frame(*exposure_data(ties=True))
+    if compact:
+        df = compact_dataset(df)
+
+    result = summarize_exposure(df, top_n=60)
+
+    top_videos, top_channels = result['top_videos'], result['top_channels']
+    assert (top_videos['recommendation_count'] == 6).all()
+    assert top_videos['video_id'].astype(str).tolist() == sorted(top_videos['video_id'].astype(str))
+    expected = top_channels.astype({'channel_id': str}).sort_values(
+        ['total_recommendations', 'channel_id'], ascending=[False, True]
+    )
+    assert top_channels['channel_id'].astype(str).tolist() == expected['channel_id'].tolist()
+    assert top_channels['total_recommendations'].duplicated().any()
@@ -0,0 +1,50 @@
+from unittest.mock import MagicMock
+
+from app.orchestrator import Supervisor, worker_env
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _factory(processes):
+    def make(index, headless):
+        process = MagicMock(pid=1000 + len(processes), exitcode=1)
+        process.is_alive.return_value = True
+        processes.append(process)
+        return process
+    return make
+
+
+def test_crashed_worker_restarts_alone_with_backoff():
+    processes, clock = [], FakeClock()
+    supervisor = Supervisor(2, process_factory=_factory(processes), clock=clock, backoff_seconds=5)
+    supervisor.start()
+
+    processes[0].is_alive.return_value = False
+    clock.now = 10
+    supervisor.poll()
+    assert len(processes) == 2
+
+    clock.now = 16
+    supervisor.poll()
+    assert len(processes) == 3
+    assert supervisor.slots[0].process is processes[2]
+    assert supervisor.slots[1].process is processes[1]
+
+    processes[2].is_alive.return_value = False
+    clock.now = 20
+    supervisor.poll()
+    assert supervisor.slots[0].restart_at == 30
+
+
+def test_worker_env_offsets_ports_and_files():
+    env = worker_env(2, {"METRICS_PORT": "9108", "SEEN_INDEX_PATH": "data/seen.bloom"})
+
+    assert env["METRICS_PORT"] == "9110"
+    assert env["SEEN_INDEX_PATH"] == "data/seen.w2.bloom"
+    assert env["COLLECTOR_WORKER_ID"].endswith("-w2")
@@ -0,0 +1,75 @@
+from unittest.mock import patch
+
+import pandas as pd
+
+from analysis import political_labeling
+from analysis.political_labeling import (
+    SIGNAL_COLUMNS,
+    compute_signals,
+    compute_signals_parallel,
+    get_political_keywords,
+    label_political_content,
+)
+
+
+def _events():
+    return pd.DataFrame({
+        'id': [1, 2, 3, 4, 5],
+        'video_id': ['a', 'b', 'a', 'c', 'a'],
+        'title': ['Election debate tonight', 'Cooking pasta', 'Election debate tonight', 'Travel vlog', 'Election debate tonight'],
+        'description': ['', 'A recipe', '', None, ''],
+        'tags': [['politics'], None, ['politics'], [], ['politics']],
+        'topic_categories': [None, None, None, ['https://en.wikipedia.org/wiki/Politics'], None],
+        'category_id': [25, 26, 25, 19, 25],
+    })
+
+
+def test_signals_are_computed_once_per_video():
+    df = _events()
+
+    with patch.object(political_labeling, 'compute_signals', wraps=compute_signals) as spy:
+        labeled = label_political_content(df, min_signals=2)
+
+    assert spy.call_args.args[0]['video_id'].tolist() == ['a', 'b', 'c']
+    per_row = compute_signals(df, get_political_keywords())[SIGNAL_COLUMNS]
+    assert (labeled[SIGNAL_COLUMNS].to_numpy() == per_row.to_numpy()).all()
+    assert labeled['is_political'].tolist() == [True, False, True, False, True]
+    assert labeled['id'].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_matched_keywords_explain_keyword_signals():
+    labeled = label_political_content(_events())
+
+    assert labeled['matched_keywords'].iloc[0] == ['election', 'politics']
+    assert labeled['matched_keywords'].iloc[1] == []
+    assert labeled['matched_keywords'].iloc[4] == ['election', 'politics']
+
+
+def test_parallel_labeling_matches_serial():
+    df = pd.concat([_events()] * 4, ignore_index=True)
+    df['video_id'] = [f"{video_id}{i // 5}" for i, video_id in enumerate(df['video_id'])]
+
+    serial = label_political_content(df, workers=1)
+    parallel = compute_signals_parallel(df.drop_duplicates('video_id'), get_political_keywords(), workers=2, chunk_rows=3)
+
+    expected = serial.drop_duplicates('video_id')
+    assert (parallel[SIGNAL_COLUMNS].to_numpy() == expected[SIGNAL_COLUMNS].to_numpy()).all()
+    assert parallel['matched_keywords'].tolist() == expected['matched_keywords'].tolist()
+    assert parallel.index.tolist() == expected.index.tolist()
+
+
+def test_keywords_are_selected_by_video_language():
+    videos = pd.DataFrame({
+        'title': ['Valg 2025', 'Valg 2025', 'Valg 2025', 'Valg 2025'],
+        'description': [None] * 4,
+        'tags': [None] * 4,
+        'topic_categories': [None] * 4,
+        'category_id': [22] * 4,
+        'language': ['en-US', 'nb', None, 'zxx'],
+    })
+
+    signals = compute_signals(videos, get_political_keywords(), political_labeling.get_keywords_by_language())
+
+    # English-only keyword set for en-US; Norwegian for nb; the combined set otherwise
+    assert signals['signal_title'].tolist() == [False, True, True, True]
+    assert signals['matched_keywords'].tolist() == [[], ['valg'], ['valg'], ['valg']]
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.services.profiling import CycleProfiler
+
+
+def test_disabled_profiler_writes_nothing(tmp_path):
+    profiler = CycleProfiler(enabled=False, output_dir=tmp_path)
+
+    with profiler.profile("cycle") as active:
+        assert active is None
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profile_records_sql_and_dumps_files(tmp_path):
+    engine = create_engine("sqlite://")
+    profiler = CycleProfiler(enabled=True, output_dir=tmp_path)
+    profiler.attach_to_engine(engine)
+
+    with profiler.profile("cycle"):
+        with engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT 1"))
+
+    summaries = list(tmp_path.glob("cycle-*.json"))
+    assert len(summaries) == 1
+    assert len(list(tmp_path.glob("cycle-*.prof"))) == 1
+    summary = json.loads(summaries[0].read_text())
+    assert summary["sql"]["top"][0] == {**summary["sql"]["top"][0], "statement": "SELECT 1", "count": 3}
+
+
+def test_statements_outside_a_profiled_cycle_are_ignored(tmp_path):
+    engine = create_engine("sqlite://")
+    profiler = CycleProfiler(enabled=True, output_dir=tmp_path)
+    profiler.attach_to_engine(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert profiler.queries.summary()["statements"] == 0
+    assert profiler.toggle() is False
+
+
+def test_failed_statements_do_not_skew_later_timings(tmp_path):
+    engine = create_engine("sqlite://")
+    profiler = CycleProfiler(enabled=True, output_dir=tmp_path)
+    profiler.attach_to_engine(engine)
+
+    with profiler.profile("cycle"):
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+            assert conn.info["profile_query_start"] == []
+            conn.execute(text("SELECT 1"))
+            assert conn.info["profile_query_start"] == []
+
+    assert [entry["statement"] for entry in profiler.queries.summary()["top"]] == ["SELECT 1"]
+
+
+def test_statements_finishing_after_the_cycle_are_not_recorded(tmp_path):
+    engine = create_engine("sqlite://")
+    profiler = CycleProfiler(enabled=True, output_dir=tmp_path)
+    profiler.attach_to_engine(engine)
+
+    with engine.connect() as conn:
+        with profiler.profile("cycle"):
+            profiler._before_cursor_execute(conn, None, "SELECT 1", (), None, False)
+        profiler._after_cursor_execute(conn, None, "SELECT 1", (), None, False)
+
+        assert conn.info["profile_query_start"] == []
+    assert profiler.queries.summary()["statements"] == 0
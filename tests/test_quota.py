@@ -0,0 +1,23 @@
+from app.services.quota import DailyQuota, LocalQuotaLedger
+
+
+def test_workers_sharing_a_ledger_share_the_budget():
+    ledger = LocalQuotaLedger()
+    first = DailyQuota(daily_limit=100, reserve=20, ledger=ledger)
+    second = DailyQuota(daily_limit=100, reserve=20, ledger=ledger)
+
+    first.spend(30)
+    second.spend(25)
+
+    assert first.spent == second.spent == 55
+    assert second.spare() == 25
+
+
+def test_mark_exhausted_leaves_no_spare_quota():
+    quota = DailyQuota(daily_limit=100, reserve=20)
+    quota.spend(10)
+
+    quota.mark_exhausted()
+
+    assert quota.remaining() == 0
+    assert quota.spare() == 0
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('scipy')
+
+from analysis import rec_graph  # noqa: E402
+from analysis.rec_graph import RecommendationGraph, update_recommendation_graph  # noqa: E402
+
+START = datetime(2025, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+def graph(edges):
+    g = RecommendationGraph()
+    g.add_edges([s for s, _ in edges], [t for _, t in edges])
+    return g
+
+
+def edge_weights(g):
+    matrix = g.adjacency.tocoo()
+    return {(g.nodes[s], g.nodes[t]): w for s, t, w in zip(matrix.row, matrix.col, matrix.data)}
+
+
+def dense_pagerank(matrix, damping=0.85, iterations=200):
+    size = len(matrix)
+    out = matrix.sum(axis=1, keepdims=True)
+    # Dangling rows link to every node
+    transition = np.where(out > 0, matrix / np.where(out > 0, out, 1), 1 / size)
+    rank = np.full(size, 1 / size)
+    for _ in range(iterations):
+        rank = damping * rank @ transition + (1 - damping) / size
+    return rank
+
+
+def test_duplicate_edges_are_weighted_and_seeds_become_nodes():
+    g = graph([(None, 'a'), ('a', 'b'), ('a', 'b'), ('b', 'c'), ('a', 'c')])
+
+    degrees = g.degrees().set_index('video_id')
+
+    assert list(g.nodes) == ['a', 'b', 'c']
+    assert g.adjacency.nnz == 3
+    assert degrees.loc['a', 'out_degree'] == 2
+    assert degrees.loc['a', 'recommends'] == 3
+    assert degrees.loc['b', 'recommended'] == 2
+    assert degrees.loc['c', 'in_degree'] == 2
+
+
+def test_pagerank_matches_dense_power_iteration():
+    rng = np.random.default_rng(0)
+    edges = [(f"v{s}", f"v{t}") for s, t in rng.integers(0, 30, (200, 2))]
+    g = graph(edges)
+
+    ranks = g.pagerank()
+
+    expected = dense_pagerank(g.adjacency.toarray())
+    assert ranks.sum() == pytest.approx(1.0)
+    assert ranks.to_numpy() == pytest.approx(expected, abs=1e-8)
+
+
+def test_hops_to_targets_and_strong_components():
+    # a -> b -> c -> a is a cycle; d -> a leads into it; e is isolated
+    g = graph([('a', 'b'), ('b', 'c'), ('c', 'a'), ('d', 'a'), (None, 'e'), ('c', 'p')])
+
+    hops = g.hops_to(['p'], max_hops=2)
+    components = g.strongly_connected_components().set_index('video_id')
+
+    assert hops.fillna(-1).to_dict() == {'a': -1, 'b': 2, 'c': 1, 'd': -1, 'e': -1, 'p': 0}
+    assert components.loc[['a', 'b', 'c'], 'component'].nunique() == 1
+    assert components.loc['a', 'component_size'] == 3
+    assert components.loc[['d', 'e', 'p'], 'component_size'].tolist() == [1, 1, 1]
+
+
+def test_incremental_build_equals_one_shot_build_and_survives_save(tmp_path):
+    rng = np.random.default_rng(1)
+    edges = [(f"v{s}", f"v{t}") for s, t in rng.integers(0, 50, (300, 2))]
+
+    one_shot = graph(edges)
+    incremental = graph(edges[:120])
+    incremental.adjacency
+    incremental.add_edges([s for s, _ in edges[120:]], [t for _, t in edges[120:]])
+    incremental.save(tmp_path)
+    loaded = RecommendationGraph.load(tmp_path)
+
+    assert list(loaded.nodes) == list(incremental.nodes)
+    assert sorted(loaded.nodes) == sorted(one_shot.nodes)
+    assert edge_weights(loaded) == edge_weights(one_shot)
+
+
+def events(rows):
+    return pd.DataFrame({
+        'id': [row[0] for row in rows],
+        'source_video_id': [row[1] for row in rows],
+        'video_id': [row[2] for row in rows],
+        'collected_at': pd.to_datetime([START + timedelta(minutes=row[0]) for row in rows], utc=True),
+    })
+
+
+def test_update_adds_late_rows_once(tmp_path):
+    with patch.object(rec_graph, 'iter_rec_events') as iter_rec_events:
+        iter_rec_events.return_value = [events([(1, None, 'a'), (3, 'a', 'b')])]
+        update_recommendation_graph(engine=object(), path=tmp_path)
+
+        # id 2 committed after id 3 was counted; id 3 comes back from the re-scan window
+        iter_rec_events.return_value = [events([(2, 'a', 'b'), (3, 'a', 'b')])]
+        g = update_recommendation_graph(engine=object(), path=tmp_path)
+
+    assert iter_rec_events.call_args.kwargs['newer_than_id'] == 3
+    assert g.adjacency[g.codes(['a'])[0], g.codes(['b'])[0]] == 2
+    assert rec_graph.read_manifest(tmp_path)['events'] == 3
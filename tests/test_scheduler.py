@@ -0,0 +1,76 @@
+import random
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.instrumentation import metrics
+from app.services.scheduler import CycleScheduler
+
+
+def _scheduler(remaining=10_000, seconds_to_reset=36_000, **kwargs):
+    quota = MagicMock()
+    quota.remaining.return_value = remaining
+    return CycleScheduler(
+        quota_tracker=quota,
+        reset_clock=lambda: seconds_to_reset,
+        rng=random.Random(0),
+        **kwargs,
+    )
+
+
+def test_continues_immediately_with_spare_quota():
+    scheduler = _scheduler(min_gap_seconds=0)
+
+    decision = scheduler.after_success(duration_seconds=120, api_units=2)
+
+    assert decision.delay_seconds == 0
+    assert decision.reason == "continue"
+
+
+def test_paces_to_target_rate():
+    scheduler = _scheduler(target_cycles_per_hour=12, min_gap_seconds=0)
+
+    decision = scheduler.after_success(duration_seconds=100, api_units=2)
+
+    assert decision.delay_seconds == pytest.approx(200)
+    assert decision.reason == "target_rate"
+
+
+def test_paces_to_make_quota_last_until_reset():
+    scheduler = _scheduler(remaining=100, seconds_to_reset=3600, min_gap_seconds=0)
+
+    decision = scheduler.after_success(duration_seconds=60, api_units=10)
+
+    assert decision.delay_seconds == pytest.approx(300)
+    assert decision.reason == "quota_pacing"
+
+
+def test_failures_back_off_exponentially_with_jitter():
+    scheduler = _scheduler(backoff_base_seconds=10, backoff_max_seconds=60)
+
+    delays = [scheduler.after_failure().delay_seconds for _ in range(5)]
+
+    for delay, ceiling in zip(delays, [10, 20, 40, 60, 60]):
+        assert ceiling / 2 <= delay <= ceiling
+    assert scheduler.after_success(60, 1).reason == "continue"
+    assert scheduler.consecutive_failures == 0
+
+
+def test_quota_error_waits_for_reset_and_records_decision():
+    scheduler = _scheduler(seconds_to_reset=7200, backoff_base_seconds=10)
+    before = metrics.counter_value("scheduler_decisions", reason="quota_reset")
+
+    decision = scheduler.after_quota_exceeded()
+
+    assert 7200 <= decision.delay_seconds <= 7210
+    assert metrics.counter_value("scheduler_decisions", reason="quota_reset") == before + 1
+
+
+def test_each_worker_paces_against_its_share_of_remaining_quota():
+    scheduler = _scheduler(remaining=100, seconds_to_reset=3600, min_gap_seconds=0, worker_count=lambda: 4)
+
+    decision = scheduler.after_success(duration_seconds=60, api_units=10)
+
+    # 25 units per worker last 2.5 cycles, one every 1440 s
+    assert decision.delay_seconds == pytest.approx(1380)
+    assert decision.reason == "quota_pacing"
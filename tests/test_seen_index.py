@@ -0,0 +1,61 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.services.seen_index import BloomFilter, load_or_build_seen_index, partition_video_ids
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=5_000, error_rate=0.01)
+    ids = [f"video_{i:06d}" for i in range(5_000)]
+    bloom.update(ids)
+
+    assert all(video_id in bloom for video_id in ids)
+    assert bloom.count == 5_000
+
+
+def test_bloom_filter_false_positive_rate_is_near_target():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    bloom.update(f"stored_{i}" for i in range(10_000))
+
+    false_positives = sum(f"unseen_{i}" in bloom for i in range(20_000))
+
+    assert false_positives / 20_000 < 0.02
+    assert bloom.estimated_false_positive_rate() == pytest.approx(0.01, rel=0.2)
+
+
+def test_bloom_filter_roundtrips_to_disk(tmp_path):
+    bloom = BloomFilter(capacity=1_000, error_rate=0.001)
+    bloom.update(["lV_QcwbTlZU", "dQw4w9WgXcQ"])
+    path = tmp_path / "seen.bloom"
+
+    bloom.save(path)
+    loaded = BloomFilter.load(path)
+
+    assert "lV_QcwbTlZU" in loaded
+    assert "dQw4w9WgXcQ" in loaded
+    assert loaded.stats() == bloom.stats()
+
+
+def test_partition_video_ids():
+    bloom = BloomFilter(capacity=100, error_rate=0.001)
+    bloom.add("known_video")
+
+    new, maybe_known = partition_video_ids(bloom, ["known_video", "new_video"])
+
+    assert new == {"new_video"}
+    assert maybe_known == {"known_video"}
+
+
+@patch('app.services.seen_index.iter_video_ids', return_value=iter(["a", "b", "c"]))
+@patch('app.services.seen_index.count_videos', return_value=3)
+def test_stale_index_is_rebuilt(mock_count, mock_iter, tmp_path):
+    path = tmp_path / "seen.bloom"
+    stale = BloomFilter(capacity=100)
+    stale.add("a")
+    stale.save(path)
+
+    index = load_or_build_seen_index(MagicMock(), path=path)
+
+    assert index.count == 3
+    assert "c" in index
+    assert BloomFilter.load(path).count == 3
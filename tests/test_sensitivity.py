@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.load_data import compact_dataset
+from analysis.sensitivity import add_uncertainty, cluster_bootstrap, threshold_sensitivity
+
+
+def _events(seed=0, runs=30, per_run=40):
+    rng = np.random.default_rng(seed)
+    rows = runs * per_run
+    video = rng.integers(0, 80, rows)
+    signal_count = rng.integers(0, 6, 80)
+    df = pd.DataFrame({
+        'run_id': [f"run-{i // per_run:02d}" for i in range(rows)],
+        'iteration_rec': np.tile(np.arange(per_run) // 4, runs),
+        'video_id': [f"v{v:02d}" for v in video],
+        'position': pd.array([None if i % 9 == 0 else i % 12 for i in range(rows)], dtype='Int32'),
+        'signal_count': signal_count[video],
+    })
+    df['is_political'] = df['signal_count'] >= 2
+    return df
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_threshold_sensitivity_matches_per_threshold_filtering(compact):
+    df = _events()
+    if compact:
+        df = compact_dataset(df)
+
+    result = threshold_sensitivity(df, max_threshold=6)
+
+    for row in result.itertuples():
+        is_political = df['signal_count'] >= row.threshold
+        assert row.political_count == is_political.sum()
+        assert row.political_percentage == pytest.approx(is_political.mean() * 100)
+        assert row.unique_videos == df.loc[is_political, 'video_id'].nunique()
+
+
+def test_bootstrap_interval_brackets_point_estimate_and_is_reproducible():
+    df = _events()
+
+    first = cluster_bootstrap(df, 'iteration_rec', 'iteration', replicates=500, seed=1)
+    second = cluster_bootstrap(df, 'iteration_rec', 'iteration', replicates=500, seed=1)
+
+    pd.testing.assert_frame_equal(first, second)
+    expected = df.groupby('iteration_rec')['is_political'].mean() * 100
+    assert first['political_percentage'].to_numpy() == pytest.approx(expected.to_numpy())
+    assert (first['ci_low'] <= first['political_percentage']).all()
+    assert (first['political_percentage'] <= first['ci_high']).all()
+    assert (first['runs'] == 30).all()
+
+
+def test_bootstrap_interval_collapses_when_runs_agree():
+    # Every run has the same political share at every iteration
+    df = pd.DataFrame({
+        'run_id': np.repeat(['a', 'b', 'c', 'd'], 4),
+        'iteration_rec': np.tile([0, 0, 1, 1], 4),
+        'is_political': np.tile([True, False, True, True], 4),
+    })
+
+    result = cluster_bootstrap(df, 'iteration_rec', replicates=200)
+
+    assert result['ci_low'].tolist() == pytest.approx([50.0, 100.0])
+    assert result['ci_high'].tolist() == pytest.approx([50.0, 100.0])
+
+
+def test_uncertainty_is_added_to_summary():
+    summary = add_uncertainty({}, _events(), replicates=100, max_position=10)
+
+    assert summary['thresholds']['threshold'].tolist() == [1, 2, 3, 4, 5, 6]
+    assert summary['by_iteration_ci']['iteration'].tolist() == list(range(10))
+    assert summary['by_position_ci']['position'].tolist() == list(range(10))
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.metrics import compute_exposure_summary
+from analysis.streaming import ExposureAccumulator, histogram_median
+
+
+def _details(videos):
+    def load(video_ids):
+        selected = videos[videos['video_id'].isin(video_ids)]
+        return selected[['video_id', 'title', 'view_count']].assign(category=selected['category_name'])
+    return load
+
+
+def _streamed(videos, events, chunk_rows):
+    flags = videos.assign(is_political=videos['signal_count'] >= 2)
+    accumulator = ExposureAccumulator(flags[['video_id', 'channel_id', 'channel_title', 'is_political']])
+    events = events[['run_id', 'iteration', 'video_id', 'position']]
+    for start in range(0, len(events), chunk_rows):
+        accumulator.add(events.iloc[start:start + chunk_rows])
+    return accumulator.summary(_details(videos))
+
+
+@pytest.mark.parametrize('ties', [False, True])
+@pytest.mark.parametrize('chunk_rows', [7, 64, 1000])
+def test_streaming_summary_matches_in_memory(exposure_data, exposure_frame, chunk_rows, ties):
+    videos, events = exposure_data(ties=ties)
+
+    streamed = _streamed(videos, events, chunk_rows)
+    expected = compute_exposure_summary(exposure_frame(videos, events))
+
+    assert streamed['overall'] == pytest.approx(expected['overall'])
+    for key in ['by_iteration', 'by_position', 'by_run', 'top_videos', 'top_channels']:
+        pd.testing.assert_frame_equal(
+            streamed[key].reset_index(drop=True), expected[key].reset_index(drop=True), check_dtype=False
+        )
+
+
+def test_events_out_of_run_order_are_rejected(exposure_data):
+    videos, events = exposure_data()
+    flags = videos.assign(is_political=videos['signal_count'] >= 2)
+    accumulator = ExposureAccumulator(flags[['video_id', 'channel_id', 'channel_title', 'is_political']])
+    events = events[['run_id', 'iteration', 'video_id', 'position']]
+
+    accumulator.add(events[events['run_id'] == 'run-0'])
+    accumulator.add(events[events['run_id'] == 'run-1'])
+    with pytest.raises(ValueError, match='ordered by run_id'):
+        accumulator.add(events[events['run_id'] == 'run-0'])
+
+
+def test_histogram_median_matches_pandas():
+    for values in ([3], [1, 2], [0, 0, 5, 7], [2, 2, 2, 9, 9]):
+        assert histogram_median(np.bincount(values)) == pd.Series(values).median()
@@ -0,0 +1,66 @@
+import json
+import pytest
+
+from app.services.video_decoder import VideoRow, decode_video_response
+from app.services.video_processing import build_video_row
+
+
+@pytest.fixture
+def video_item():
+    return {
+        "id": "test_video_id",
+        "snippet": {
+            "publishedAt": "2025-10-18T22:00:00Z",
+            "channelId": "test_channel_id",
+            "title": "Test Video Title",
+            "description": "Test video description.",
+            "tags": ["tag1", "tag2"],
+            "categoryId": "25",
+            "channelTitle": "Test Channel Title",
+            "defaultAudioLanguage": "en"
+        },
+        "contentDetails": {"duration": "PT10M5S"},
+        "statistics": {"viewCount": "100", "likeCount": "10"},
+        "topicDetails": {"topicCategories": ["https://en.wikipedia.org/wiki/Music"]}
+    }
+
+
+def test_decoded_rows_match_build_video_row(video_item):
+    rows = decode_video_response(json.dumps({"items": [video_item]}).encode())
+
+    assert rows == [VideoRow(**build_video_row(video_item))]
+    assert rows[0].comment_count == 0
+    assert rows[0].language == "en"
+
+
+def test_decode_accepts_parsed_dict(video_item):
+    rows = decode_video_response({"items": [video_item]})
+
+    assert rows[0]._asdict() == build_video_row(video_item)
+
+
+def test_invalid_items_are_dropped_individually(video_item):
+    missing_title = json.loads(json.dumps(video_item))
+    missing_title["id"] = "missing_title"
+    del missing_title["snippet"]["title"]
+    missing_statistics = {"id": "missing_statistics", "snippet": video_item["snippet"], "contentDetails": {}}
+
+    rows = decode_video_response(json.dumps({"items": [missing_title, video_item, missing_statistics]}))
+
+    assert [row.video_id for row in rows] == ["test_video_id"]
+
+
+def test_empty_optional_values_match_per_item_path(video_item):
+    video_item["snippet"]["categoryId"] = ""
+    video_item["statistics"]["viewCount"] = ""
+    del video_item["topicDetails"]
+
+    row = decode_video_response({"items": [video_item]})[0]
+
+    assert row._asdict() == build_video_row(video_item)
+    assert row.category_id is None
+    assert row.view_count == 0
+
+
+def test_empty_response_decodes_to_no_rows():
+    assert decode_video_response(b'{"kind": "youtube#videoListResponse"}') == []
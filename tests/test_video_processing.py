@@ -1,7 +1,10 @@
 import pytest
 from unittest.mock import MagicMock, patch
 from datetime import datetime, timezone
-from app.services.video_processing import process_and_insert_video_from_json
+from sqlalchemy.exc import DataError, OperationalError
+
+from app.services.video_decoder import VideoRow
+from app.services.video_processing import drop_unknown_category, process_and_insert_video_from_json, store_video_rows
 
 @pytest.fixture
 def mock_session():
@@ -66,3 +69,55 @@ def test_process_and_insert_video_from_empty_json(mock_session):
     with patch('app.services.video_processing.logger.warning') as mock_logger:
         process_and_insert_video_from_json(mock_session, None)
         mock_logger.assert_called_once_with("Received empty video JSON, skipping.")
+
+
+def _row(video_id):
+    return VideoRow(
+        video_id=video_id, title="Title", description=None, channel_id="UC1", channel_title="Channel",
+        tags=None, topic_categories=None, category_id=None, published_at=None, language=None,
+        duration_iso=None, view_count=0, like_count=0, comment_count=0,
+    )
+
+
+@pytest.mark.parametrize('error', [
+    DataError("INSERT", {}, Exception("value too long")),
+    OperationalError("INSERT", {}, Exception("connection reset")),
+])
+@patch('app.services.video_processing.upsert_video')
+@patch('app.services.video_processing.bulk_upsert_videos')
+def test_store_video_rows_falls_back_to_per_row_on_any_bulk_failure(mock_bulk, mock_upsert, mock_session, error):
+    mock_bulk.side_effect = error
+    mock_upsert.side_effect = [None, DataError("INSERT", {}, Exception("bad row"))]
+
+    stored = store_video_rows(mock_session, [_row("a"), _row("b")])
+
+    assert stored == ["a"]
+    assert mock_upsert.call_count == 2
+
+
+@pytest.mark.parametrize('known_after_sync, sync_ok, expected', [
+    (True, True, 30),    # the sync added the category
+    (False, True, None),  # the API doesn't list it either
+    (False, False, 30),   # sync failed: keep it and let the foreign key decide
+])
+@patch('app.services.video_processing.resync_categories')
+@patch('app.services.video_processing.id_cache.is_known_category_id')
+def test_unknown_category_is_resynced_before_being_dropped(mock_known, mock_resync, mock_session,
+                                                          known_after_sync, sync_ok, expected):
+    mock_known.side_effect = [False, known_after_sync]
+    mock_resync.return_value = sync_ok
+
+    video_data = drop_unknown_category(mock_session, {"video_id": "a", "category_id": 30})
+
+    assert video_data["category_id"] == expected
+    mock_resync.assert_called_once_with(mock_session)
+
+
+@patch('app.services.video_processing.bulk_upsert_videos')
+@patch('app.services.video_processing.bulk_insert_new_videos')
+def test_store_video_rows_inserts_new_rows_and_upserts_the_rest(mock_insert, mock_upsert, mock_session):
+    stored = store_video_rows(mock_session, [_row("new"), _row("known")], new_ids={"new"})
+
+    assert stored == ["new", "known"]
+    assert [record["video_id"] for record in mock_insert.call_args.args[1]] == ["new"]
+    assert [record["video_id"] for record in mock_upsert.call_args.args[1]] == ["known"]
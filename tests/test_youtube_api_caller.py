@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import patch, MagicMock
 from app.services import youtube_api_caller
+from app.services.instrumentation import metrics
 
 def test_get_video_id_from_url():
     assert youtube_api_caller.get_video_id_from_url("https://www.youtube.com/watch?v=lV_QcwbTlZU") == "lV_QcwbTlZU"
@@ -81,3 +82,20 @@ def test_call_youtube_api_multiple_with_chunking(mock_get):
 
     assert mock_get.call_count == 2
     assert len(video_data["items"]) == 51
+
+@patch('app.services.youtube_api_caller.requests.get')
+def test_api_units_are_labeled_by_spend_source(mock_get):
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = {"items": []}
+    mock_get.return_value = mock_response
+    crawl = metrics.counter_value("api_units", source="crawl")
+    refresh = metrics.counter_value("api_units", source="refresh")
+
+    youtube_api_caller.fetch_video_data("lV_QcwbTlZU")
+    with youtube_api_caller.api_spend_source("refresh"):
+        youtube_api_caller.fetch_video_data("dQw4w9WgXcQ")
+    youtube_api_caller.fetch_video_data("lV_QcwbTlZU")
+
+    assert metrics.counter_value("api_units", source="crawl") == crawl + 2
+    assert metrics.counter_value("api_units", source="refresh") == refresh + 1